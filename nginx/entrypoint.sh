@@ -3,6 +3,8 @@ set -e
 
 export SSL_CERT_PATH=$SSL_CERT_PATH
 export SSL_CERT_KEY=$SSL_CERT_KEY
+export MEDIA_FOLDER=${MEDIA_FOLDER:-/app/data}
+export X_ACCEL_REDIRECT_PREFIX=${X_ACCEL_REDIRECT_PREFIX:-/protected-media}
 
 # Подставляем переменные в шаблон
 envsubst "$(env | cut -d= -f1 | sed 's/^/$/')" < /etc/nginx/nginx.conf.template > /etc/nginx/nginx.conf
@@ -0,0 +1,3 @@
+from .membership import MembershipCache, Membership, membership_cache
+from .unread_events import UnreadEventsLog, unread_events_log
+from .upload_sessions import UploadSessionsStore, upload_sessions_store
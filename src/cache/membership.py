@@ -0,0 +1,116 @@
+import time
+import json
+from collections import OrderedDict
+
+from database import run_after_transaction
+from dependencies import redis_client
+from repository import select_user_memberships
+from utilities import ConversationMemberRoles, ConversationTypes, generic_settings
+
+
+Membership = tuple[ConversationMemberRoles, ConversationTypes]
+
+
+class MembershipCache:
+    _EMPTY_MARKER = "-"
+    INVALIDATION_CHANNEL = "memberships:invalidate_events"
+
+    def __init__(self, ttl: int, max_users: int):
+        self._ttl = ttl
+        self._max_users = max_users
+        self._local: OrderedDict[int, tuple[float, dict[int, Membership]]] = OrderedDict()
+
+    @staticmethod
+    def _redis_key(user_id: int) -> str:
+        return f"user:{user_id}:memberships"
+
+    def _get_local(self, user_id: int) -> dict[int, Membership] | None:
+        cached = self._local.get(user_id)
+        if cached is None:
+            return None
+
+        expires_at, memberships = cached
+        if expires_at < time.monotonic():
+            del self._local[user_id]
+            return None
+
+        self._local.move_to_end(user_id)
+        return memberships
+
+    def _set_local(self, user_id: int, memberships: dict[int, Membership]) -> None:
+        self._local[user_id] = (time.monotonic() + self._ttl, memberships)
+        self._local.move_to_end(user_id)
+        while len(self._local) > self._max_users:
+            self._local.popitem(last=False)
+
+    async def _get_redis(self, user_id: int) -> dict[int, Membership] | None:
+        raw_data = await redis_client.hgetall(self._redis_key(user_id))
+        if not raw_data:
+            return None
+
+        memberships = dict()
+        for conversation_id, value in raw_data.items():
+            conversation_id = conversation_id.decode()
+            if conversation_id == self._EMPTY_MARKER:
+                continue
+            role, conversation_type = value.decode().split(":")
+            memberships[int(conversation_id)] = (
+                ConversationMemberRoles(role),
+                ConversationTypes(conversation_type)
+            )
+
+        return memberships
+
+    async def _set_redis(self, user_id: int, memberships: dict[int, Membership]) -> None:
+        mapping = {self._EMPTY_MARKER: ""}
+        for conversation_id, (role, conversation_type) in memberships.items():
+            mapping[str(conversation_id)] = f"{role.value}:{conversation_type.value}"
+
+        key = self._redis_key(user_id)
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping=mapping)
+            pipe.expire(key, self._ttl)
+            await pipe.execute()
+
+    async def get_memberships(self, user_id: int) -> dict[int, Membership]:
+        memberships = self._get_local(user_id)
+        if memberships is not None:
+            return memberships
+
+        memberships = await self._get_redis(user_id)
+        if memberships is None:
+            memberships = {
+                conversation_id: (role, conversation_type)
+                for conversation_id, role, conversation_type in await select_user_memberships(user_id=user_id)
+            }
+            await self._set_redis(user_id, memberships)
+
+        self._set_local(user_id, memberships)
+        return memberships
+
+    async def get_membership(self, user_id: int, conversation_id: int) -> Membership | None:
+        return (await self.get_memberships(user_id)).get(conversation_id)
+
+    def drop_local(self, data: bytes) -> None:
+        for user_id in json.loads(data):
+            self._local.pop(user_id, None)
+
+    async def invalidate(self, users_ids: list[int]) -> None:
+        if not users_ids:
+            return None
+
+        await self._drop(users_ids=users_ids)
+        await run_after_transaction(lambda: self._drop(users_ids=users_ids))
+
+    async def _drop(self, users_ids: list[int]) -> None:
+        for user_id in users_ids:
+            self._local.pop(user_id, None)
+        await redis_client.delete(*[self._redis_key(user_id) for user_id in users_ids])
+        await redis_client.publish(self.INVALIDATION_CHANNEL, json.dumps(users_ids))
+
+
+membership_cache = MembershipCache(
+    ttl=generic_settings.MEMBERSHIP_CACHE_TTL,
+    max_users=generic_settings.MEMBERSHIP_CACHE_MAX_USERS
+)
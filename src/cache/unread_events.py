@@ -0,0 +1,66 @@
+import json
+
+from dependencies import redis_client
+from utilities import generic_settings
+
+
+class UnreadEventsLog:
+    _APPEND_SCRIPT = """
+        if redis.call('EXISTS', KEYS[3]) == 1 then
+            return false
+        end
+        local sequence = redis.call('INCR', KEYS[1])
+        redis.call('ZADD', KEYS[2], sequence, cjson.encode({sequence = sequence, event = cjson.decode(ARGV[1])}))
+        redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -(tonumber(ARGV[2]) + 1))
+        redis.call('EXPIRE', KEYS[1], ARGV[3])
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+        redis.call('SET', KEYS[3], sequence, 'EX', ARGV[3])
+        return sequence
+    """
+
+    def __init__(self, history_size: int, ttl: int):
+        self._history_size = history_size
+        self._ttl = ttl
+        self._append = redis_client.register_script(self._APPEND_SCRIPT)
+
+    @staticmethod
+    def _sequence_key(user_id: int) -> str:
+        return f"user:{user_id}:unread_sequence"
+
+    @staticmethod
+    def _events_key(user_id: int) -> str:
+        return f"user:{user_id}:unread_events"
+
+    @staticmethod
+    def _event_key(user_id: int, event: dict) -> str:
+        return f"user:{user_id}:unread_event:{event['op']}:{event['id']}"
+
+    async def append(self, user_id: int, event: dict) -> int | None:
+        return await self._append(
+            keys=[self._sequence_key(user_id), self._events_key(user_id), self._event_key(user_id, event)],
+            args=[json.dumps(event), self._history_size, self._ttl]
+        )
+
+    async def current_sequence(self, user_id: int) -> int:
+        sequence = await redis_client.get(self._sequence_key(user_id))
+        return 0 if sequence is None else int(sequence)
+
+    async def fetch_since(self, user_id: int, sequence: int) -> list[dict] | None:
+        current_sequence = await self.current_sequence(user_id)
+        if sequence > current_sequence:
+            return None
+        if sequence == current_sequence:
+            return []
+
+        raw_events = await redis_client.zrangebyscore(self._events_key(user_id), f"({sequence}", "+inf")
+        events = [json.loads(raw_event) for raw_event in raw_events]
+        if not events or events[0]["sequence"] != sequence + 1:
+            return None
+
+        return events
+
+
+unread_events_log = UnreadEventsLog(
+    history_size=generic_settings.UNREAD_EVENTS_HISTORY_SIZE,
+    ttl=generic_settings.UNREAD_EVENTS_HISTORY_TTL
+)
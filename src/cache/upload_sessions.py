@@ -0,0 +1,89 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from datetime import datetime, timedelta
+from typing import AsyncIterator
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError, RedisError
+
+from dependencies import redis_client
+from schemas import UploadSession
+from utilities import UploadSessionLocked, generic_settings
+
+
+class UploadSessionsStore:
+    _LOCK_TIMEOUT = 600
+    _LOCK_RENEW_INTERVAL = 60
+
+    def __init__(self, ttl: int):
+        self._ttl = ttl
+
+    @staticmethod
+    def _session_key(upload_id: str) -> str:
+        return f"upload:{upload_id}"
+
+    @staticmethod
+    def _lock_key(upload_id: str) -> str:
+        return f"upload:{upload_id}:lock"
+
+    async def save(self, upload_session: UploadSession) -> UploadSession:
+        upload_session.expires_at = datetime.utcnow() + timedelta(seconds=self._ttl)
+        await redis_client.set(
+            self._session_key(upload_session.id),
+            upload_session.model_dump_json(),
+            ex=self._ttl
+        )
+        return upload_session
+
+    async def get(self, upload_id: str) -> UploadSession | None:
+        raw_session = await redis_client.get(self._session_key(upload_id))
+        if raw_session is None:
+            return None
+
+        return UploadSession.model_validate_json(raw_session)
+
+    async def delete(self, upload_id: str) -> None:
+        await redis_client.delete(self._session_key(upload_id))
+
+    async def select_existing(self, uploads_ids: list[str]) -> set[str]:
+        async with redis_client.pipeline(transaction=False) as pipeline:
+            for upload_id in uploads_ids:
+                pipeline.exists(self._session_key(upload_id))
+            existed = await pipeline.execute()
+
+        return {upload_id for upload_id, is_existed in zip(uploads_ids, existed) if is_existed}
+
+    @asynccontextmanager
+    async def locked(self, upload_id: str) -> AsyncIterator[asyncio.Event]:
+        lock = redis_client.lock(self._lock_key(upload_id), timeout=self._LOCK_TIMEOUT, blocking=False)
+        if not await lock.acquire():
+            raise UploadSessionLocked()
+
+        lock_lost = asyncio.Event()
+        renewal = asyncio.create_task(self._renew_lock(lock=lock, lock_lost=lock_lost))
+        try:
+            yield lock_lost
+        finally:
+            renewal.cancel()
+            with suppress(LockError):
+                await lock.release()
+
+    async def _renew_lock(self, lock: Lock, lock_lost: asyncio.Event) -> None:
+        while True:
+            await asyncio.sleep(self._LOCK_RENEW_INTERVAL)
+            try:
+                await lock.reacquire()
+            except LockError:
+                lock_lost.set()
+                return None
+            except RedisError:
+                continue
+
+    @staticmethod
+    async def guard_stream(data_stream: AsyncIterator[bytes], lock_lost: asyncio.Event) -> AsyncIterator[bytes]:
+        async for chunk in data_stream:
+            if lock_lost.is_set():
+                raise UploadSessionLocked()
+            yield chunk
+
+
+upload_sessions_store = UploadSessionsStore(ttl=generic_settings.UPLOAD_SESSION_TTL)
@@ -1 +1,15 @@
-from .postgresql import session, engine, OrmBase
+from .postgresql import (
+    session,
+    session_factory,
+    engine,
+    OrmBase,
+    any_of,
+    array_of,
+    build_connect_args,
+    UnitOfWorkSession,
+    open_unit_of_work,
+    commit_unit_of_work,
+    run_compensation,
+    run_after_transaction
+)
+from .pool import PoolMonitor, MonitoredQueuePool, pool_monitor
@@ -0,0 +1,100 @@
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from utilities import db_settings
+
+
+class PoolMonitor:
+    def __init__(self):
+        self._engine: AsyncEngine | None = None
+        self._connections: dict[int, float] = dict()
+        self._checkouts = 0
+        self._checkout_timeouts = 0
+        self._connects = 0
+        self._disconnects = 0
+        self._invalidations = 0
+        self._wait = {"count": 0, "total": 0.0, "max": 0.0}
+        self._hold = {"count": 0, "total": 0.0, "max": 0.0}
+
+    def attach(self, engine: AsyncEngine) -> None:
+        self._engine = engine
+        event.listen(engine.sync_engine, "connect", self._on_connect)
+        event.listen(engine.sync_engine, "close", self._on_close)
+        event.listen(engine.sync_engine, "invalidate", self._on_invalidate)
+        event.listen(engine.sync_engine, "checkout", self._on_checkout)
+        event.listen(engine.sync_engine, "checkin", self._on_checkin)
+
+    def record_wait(self, duration: float, timed_out: bool) -> None:
+        self._checkout_timeouts += int(timed_out)
+        self._wait["count"] += 1
+        self._wait["total"] += duration
+        self._wait["max"] = max(self._wait["max"], duration)
+
+    def stats(self) -> dict:
+        pool = self._engine.pool
+        now = time.monotonic()
+        connections_ages = [now - connected_at for connected_at in self._connections.values()]
+        return {
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": db_settings.DB_MAX_OVERFLOW,
+            "checkouts": self._checkouts,
+            "checkout_timeouts": self._checkout_timeouts,
+            "wait_total_seconds": self._wait["total"],
+            "wait_avg_seconds": self._wait["total"] / self._wait["count"] if self._wait["count"] else 0.0,
+            "wait_max_seconds": self._wait["max"],
+            "hold_avg_seconds": self._hold["total"] / self._hold["count"] if self._hold["count"] else 0.0,
+            "hold_max_seconds": self._hold["max"],
+            "connects": self._connects,
+            "disconnects": self._disconnects,
+            "invalidations": self._invalidations,
+            "connections": len(connections_ages),
+            "connection_age_avg_seconds": sum(connections_ages) / len(connections_ages) if connections_ages else 0.0,
+            "connection_age_max_seconds": max(connections_ages, default=0.0)
+        }
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self._connects += 1
+        self._connections[id(dbapi_connection)] = time.monotonic()
+
+    def _on_close(self, dbapi_connection, connection_record) -> None:
+        self._disconnects += 1
+        self._connections.pop(id(dbapi_connection), None)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self._invalidations += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self._checkouts += 1
+        connection_record.info["checked_out_at"] = time.monotonic()
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is None:
+            return None
+
+        duration = time.monotonic() - checked_out_at
+        self._hold["count"] += 1
+        self._hold["total"] += duration
+        self._hold["max"] = max(self._hold["max"], duration)
+
+
+pool_monitor = PoolMonitor()
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        started_at = time.monotonic()
+        timed_out = False
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            timed_out = True
+            raise
+        finally:
+            pool_monitor.record_wait(duration=time.monotonic() - started_at, timed_out=timed_out)
@@ -1,21 +1,176 @@
 import sys
-from sqlalchemy import MetaData
-from sqlalchemy.ext.asyncio.engine import create_async_engine
-from sqlalchemy.ext.asyncio.session import async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import uuid
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Awaitable, Callable
+from sqlalchemy import MetaData, Integer, any_, literal, event
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio.engine import create_async_engine, AsyncEngine
+from sqlalchemy.ext.asyncio.session import async_sessionmaker, AsyncSession
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
+from sqlalchemy.engine import Connection
 
 from utilities import db_settings, AppModes, generic_settings
+from .pool import MonitoredQueuePool, pool_monitor
+
+
+def build_connect_args(url: str) -> dict:
+    if not db_settings.DB_PGBOUNCER_MODE:
+        return dict()
+
+    match make_url(url).get_driver_name():
+        case "asyncpg":
+            return {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__"
+            }
+        case "psycopg":
+            return {"prepare_threshold": None}
+        case _:
+            return dict()
+
+
+def build_engine(url: str) -> AsyncEngine:
+    return create_async_engine(
+        url,
+        poolclass=MonitoredQueuePool,
+        pool_size=db_settings.DB_POOL_SIZE,
+        max_overflow=db_settings.DB_MAX_OVERFLOW,
+        pool_timeout=db_settings.DB_POOL_TIMEOUT,
+        pool_recycle=db_settings.DB_POOL_RECYCLE,
+        pool_pre_ping=db_settings.DB_POOL_PRE_PING,
+        connect_args=build_connect_args(url)
+    )
 
 
 if generic_settings.MODE == AppModes.PRODUCTION.value or generic_settings.MODE == AppModes.DEVELOPMENT.value:
-    engine = create_async_engine(db_settings.sqlalchemy_postgresql_url)
+    engine = build_engine(db_settings.sqlalchemy_postgresql_url)
 elif generic_settings.MODE == AppModes.TESTING.value:
-    engine = create_async_engine(db_settings.test_sqlalchemy_postgresql_url)
+    engine = build_engine(db_settings.test_sqlalchemy_postgresql_url)
 else:
     sys.exit("Invalid launch mode specified! Only production, development and testing are supported!")
 
-session = async_sessionmaker(bind=engine)
+pool_monitor.attach(engine)
+
+
+class UnitOfWorkSession(AsyncSession):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._completion_callbacks: list[Callable[[], Awaitable[None]]] = list()
+        self._borrowers = 0
+
+    async def commit(self) -> None:
+        await self.flush()
+
+    @asynccontextmanager
+    async def borrow(self) -> AsyncIterator["UnitOfWorkSession"]:
+        self._borrowers += 1
+        try:
+            yield self
+        finally:
+            self._borrowers -= 1
+            if not self._borrowers:
+                self.expunge_all()
+
+    def after_completion(self, callback: Callable[[], Awaitable[None]]) -> None:
+        self._completion_callbacks.append(callback)
+
+    async def complete(self) -> None:
+        try:
+            await super().commit()
+        finally:
+            await self._run_completion_callbacks()
+
+    async def abort(self) -> None:
+        try:
+            await self.rollback()
+        finally:
+            await self._run_completion_callbacks()
+
+    async def _run_completion_callbacks(self) -> None:
+        callbacks, self._completion_callbacks = self._completion_callbacks, list()
+        for callback in callbacks:
+            await callback()
+
+
+session_factory = async_sessionmaker(bind=engine)
+unit_of_work_factory = async_sessionmaker(bind=engine, class_=UnitOfWorkSession, expire_on_commit=False)
+current_unit_of_work: ContextVar[UnitOfWorkSession | None] = ContextVar("current_unit_of_work", default=None)
+
+
+def _set_transaction_read_only(sync_session: Session, transaction: SessionTransaction, connection: Connection) -> None:
+    connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+
+
+@asynccontextmanager
+async def session() -> AsyncIterator[AsyncSession]:
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is not None:
+        async with unit_of_work.borrow() as cursor:
+            yield cursor
+        return
+
+    async with session_factory() as new_session:
+        yield new_session
+
+
+@asynccontextmanager
+async def open_unit_of_work(read_only: bool = False) -> AsyncIterator[UnitOfWorkSession]:
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is not None:
+        yield unit_of_work
+        return
+
+    async with unit_of_work_factory() as unit_of_work:
+        if read_only:
+            event.listen(unit_of_work.sync_session, "after_begin", _set_transaction_read_only)
+
+        token = current_unit_of_work.set(unit_of_work)
+        try:
+            yield unit_of_work
+        except BaseException:
+            await unit_of_work.abort()
+            raise
+        else:
+            await unit_of_work.complete()
+        finally:
+            current_unit_of_work.reset(token)
+
+
+async def commit_unit_of_work() -> None:
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is not None:
+        await unit_of_work.complete()
+
+
+async def run_compensation(callback: Callable[[], Awaitable[None]]) -> None:
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is None:
+        await callback()
+        return None
+
+    await unit_of_work.abort()
+    await callback()
+    await unit_of_work.complete()
+
+
+async def run_after_transaction(callback: Callable[[], Awaitable[None]]) -> None:
+    unit_of_work = current_unit_of_work.get()
+    if unit_of_work is None:
+        await callback()
+    else:
+        unit_of_work.after_completion(callback)
 
 
 class OrmBase(DeclarativeBase):
     metadata = MetaData(schema=db_settings.DB_SCHEMA)
+
+
+def array_of(values: list[int]):
+    return literal(values, ARRAY(Integer))
+
+
+def any_of(values: list[int]):
+    return any_(array_of(values))
@@ -1,4 +1,6 @@
-from .auth import verify_token, verify_token_ws
+from .auth import verify_token, verify_token_ws, verify_metrics_token
 from .redis import redis_client
+from .hub import ConnectionHub, HubConnection, connection_hub
 from .celery import celery_client
 from .user import update_last_online
+from .database import unit_of_work, read_only_unit_of_work
@@ -1,8 +1,9 @@
+import secrets
 from typing import Annotated
-from fastapi import Depends
+from fastapi import Depends, Header
 from jose import JWTError
 
-from utilities import oauth2_scheme, JWT, InvalidCredentials
+from utilities import oauth2_scheme, JWT, InvalidCredentials, AccessDeniedError, generic_settings
 
 
 async def verify_token(token: Annotated[str, Depends(oauth2_scheme)]) -> int:
@@ -27,3 +28,12 @@ async def verify_token_ws(token: str) -> int | None:
         return None
 
     return user_id
+
+
+async def verify_metrics_token(x_metrics_token: Annotated[str | None, Header()] = None) -> None:
+    if (
+        not generic_settings.METRICS_TOKEN
+        or x_metrics_token is None
+        or not secrets.compare_digest(x_metrics_token, generic_settings.METRICS_TOKEN)
+    ):
+        raise AccessDeniedError()
@@ -0,0 +1,13 @@
+from typing import AsyncIterator
+
+from database import UnitOfWorkSession, open_unit_of_work
+
+
+async def unit_of_work() -> AsyncIterator[UnitOfWorkSession]:
+    async with open_unit_of_work() as cursor:
+        yield cursor
+
+
+async def read_only_unit_of_work() -> AsyncIterator[UnitOfWorkSession]:
+    async with open_unit_of_work(read_only=True) as cursor:
+        yield cursor
@@ -0,0 +1,161 @@
+import os
+import asyncio
+from typing import Iterable, Callable
+from redis.exceptions import RedisError
+
+from .redis import redis_client
+from utilities import generic_settings, WebsocketConnectionClosed
+
+
+class HubConnection:
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.channels: set[str] = set()
+        self.queue: asyncio.Queue[tuple[str, bytes] | None] = asyncio.Queue(maxsize=queue_size)
+        self.dropped = False
+
+    @property
+    def delete_channel(self) -> str:
+        return f"user:{self.user_id}:delete_events"
+
+    async def receive(self) -> tuple[str, bytes]:
+        event = await self.queue.get()
+        if event is None:
+            raise WebsocketConnectionClosed(code=1013, reason="Slow consumer")
+
+        channel, data = event
+        if channel == self.delete_channel:
+            raise WebsocketConnectionClosed(code=1008, reason="User deleted")
+
+        return channel, data
+
+
+class ConnectionHub:
+    def __init__(self, queue_size: int):
+        self._queue_size = queue_size
+        self._pubsub = None
+        self._reader_task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._subscribers: dict[str, set[HubConnection]] = dict()
+        self._listeners: dict[str, list[Callable[[bytes], None]]] = dict()
+        self._connections: set[HubConnection] = set()
+        self._delivered_events = 0
+        self._dropped_connections = 0
+
+    async def register(self, user_id: int, channels: Iterable[str]) -> HubConnection:
+        connection = HubConnection(user_id=user_id, queue_size=self._queue_size)
+        self._connections.add(connection)
+        await self.subscribe(connection=connection, channels=[connection.delete_channel, *channels])
+        return connection
+
+    async def unregister(self, connection: HubConnection) -> None:
+        self._connections.discard(connection)
+        await self.unsubscribe(connection=connection, channels=list(connection.channels))
+
+    async def add_listener(self, channel: str, callback: Callable[[bytes], None]) -> None:
+        async with self._lock:
+            is_new_channel = channel not in self._subscribers and channel not in self._listeners
+            self._listeners.setdefault(channel, list()).append(callback)
+            if is_new_channel:
+                await self._redis_subscribe([channel])
+
+    async def subscribe(self, connection: HubConnection, channels: Iterable[str]) -> None:
+        async with self._lock:
+            new_channels = list()
+            for channel in channels:
+                if channel not in self._subscribers:
+                    self._subscribers[channel] = set()
+                    if channel not in self._listeners:
+                        new_channels.append(channel)
+                self._subscribers[channel].add(connection)
+                connection.channels.add(channel)
+
+            if new_channels:
+                await self._redis_subscribe(new_channels)
+
+    async def unsubscribe(self, connection: HubConnection, channels: Iterable[str]) -> None:
+        async with self._lock:
+            idle_channels = list()
+            for channel in channels:
+                connection.channels.discard(channel)
+                connections = self._subscribers.get(channel)
+                if connections is None:
+                    continue
+
+                connections.discard(connection)
+                if not connections:
+                    del self._subscribers[channel]
+                    if channel not in self._listeners:
+                        idle_channels.append(channel)
+
+            if idle_channels and self._pubsub is not None:
+                await self._pubsub.unsubscribe(*idle_channels)
+
+    def stats(self) -> dict[str, int]:
+        queues_depths = [connection.queue.qsize() for connection in self._connections]
+        return {
+            "pid": os.getpid(),
+            "sockets": len(self._connections),
+            "users": len({connection.user_id for connection in self._connections}),
+            "channels": len(self._subscribers.keys() | self._listeners.keys()),
+            "queues_depth_total": sum(queues_depths),
+            "queues_depth_max": max(queues_depths, default=0),
+            "queue_size": self._queue_size,
+            "delivered_events": self._delivered_events,
+            "dropped_connections": self._dropped_connections
+        }
+
+    async def close(self) -> None:
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        self._pubsub = None
+        self._reader_task = None
+        self._subscribers.clear()
+        self._listeners.clear()
+        self._connections.clear()
+
+    async def _redis_subscribe(self, channels: list[str]) -> None:
+        if self._pubsub is None:
+            self._pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(*channels)
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.create_task(self._read_messages())
+
+    def _drop(self, connection: HubConnection) -> None:
+        connection.dropped = True
+        self._dropped_connections += 1
+        while not connection.queue.empty():
+            connection.queue.get_nowait()
+        connection.queue.put_nowait(None)
+
+    def _dispatch(self, channel: str, data: bytes) -> None:
+        for callback in self._listeners.get(channel, ()):
+            callback(data)
+
+        for connection in tuple(self._subscribers.get(channel, ())):
+            if connection.dropped:
+                continue
+            try:
+                connection.queue.put_nowait((channel, data))
+            except asyncio.QueueFull:
+                self._drop(connection)
+                continue
+            self._delivered_events += 1
+
+    async def _read_messages(self) -> None:
+        while True:
+            try:
+                message = await self._pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+            except RedisError:
+                await asyncio.sleep(1)
+                continue
+
+            if message is None or message["type"] != "message":
+                continue
+
+            self._dispatch(channel=message["channel"].decode(), data=message["data"])
+
+
+connection_hub = ConnectionHub(queue_size=generic_settings.WEBSOCKET_QUEUE_SIZE)
@@ -1,5 +1,4 @@
 import asyncio
-
 from fastapi import FastAPI, status, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -7,25 +6,26 @@ from contextlib import asynccontextmanager
 
 from triggers import (
     setup_unread_messages_changes_trigger,
-    setup_unread_messages_changes_listener,
     setup_recipients_change_trigger,
-    setup_recipients_change_listener,
     setup_user_delete_trigger,
     setup_conversation_delete_trigger,
     setup_messages_delete_trigger,
-    setup_user_delete_listener,
-    setup_conversation_delete_listener,
-    setup_messages_delete_listener
+    setup_media_blobs_trigger,
+    notifications_listener
 )
-from repository import create_tables, create_schema
+from repository import create_tables, create_schema, create_search_indexes, verify_search_language
 from routes import (
     authorization_router,
     users_router,
     conversations_router,
     anonymous_users_router,
-    messages_router
+    messages_router,
+    metrics_router
 )
-from storage import FileManager
+from storage import FileManager, s3_client, image_processor
+from services import uploads_garbage_collector
+from dependencies import connection_hub
+from cache import membership_cache
 from utilities import (
     UserNotFoundError,
     ConversationNotFoundError,
@@ -38,6 +38,7 @@ from utilities import (
     InvalidFileType,
     FIleToBig,
     ImageCorrupted,
+    ImageDimensionsExceeded,
     ChatAlreadyExists,
     SameUsersIds,
     FileNotFound,
@@ -45,7 +46,13 @@ from utilities import (
     MessageNotFound,
     UserNotInConversation,
     FileRangeError,
-    UnreadMessageAlreadyExists,
+    InvalidCursorError,
+    UploadSessionNotFound,
+    UploadOffsetMismatch,
+    UploadSessionLocked,
+    UploadLengthExceeded,
+    UploadIncomplete,
+    ObjectStorageError,
     generic_settings
 )
 
@@ -53,20 +60,29 @@ from utilities import (
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     await create_schema()
+    await verify_search_language()
     await create_tables()
+    await create_search_indexes()
+    await setup_media_blobs_trigger()
     await setup_unread_messages_changes_trigger()
     await setup_recipients_change_trigger()
     await setup_user_delete_trigger()
     await setup_conversation_delete_trigger()
     await setup_messages_delete_trigger()
-    asyncio.create_task(setup_unread_messages_changes_listener())
-    asyncio.create_task(setup_recipients_change_listener())
-    asyncio.create_task(setup_user_delete_listener())
-    asyncio.create_task(setup_conversation_delete_listener())
-    asyncio.create_task(setup_messages_delete_listener())
+    notifications_listener.start()
+    await connection_hub.add_listener(
+        channel=membership_cache.INVALIDATION_CHANNEL,
+        callback=membership_cache.drop_local
+    )
 
     FileManager.create_folders_structure()
+    uploads_collector = asyncio.create_task(uploads_garbage_collector())
     yield
+    uploads_collector.cancel()
+    await notifications_listener.close()
+    await connection_hub.close()
+    await s3_client.close()
+    image_processor.shutdown()
 
 app = FastAPI(
     title="ChatWave",
@@ -82,6 +98,15 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Next-Cursor",
+        "Location",
+        "Upload-Offset",
+        "Upload-Length",
+        "Content-Range",
+        "Accept-Ranges",
+        "ETag"
+    ],
 )
 
 
@@ -144,6 +169,11 @@ async def image_corrupted_handler(request: Request, exc: ImageCorrupted):
     return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
 
 
+@app.exception_handler(ImageDimensionsExceeded)
+async def image_dimensions_exceeded_handler(request: Request, exc: ImageDimensionsExceeded):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
 @app.exception_handler(ChatAlreadyExists)
 async def chat_already_exists_handler(request: Request, exc: ChatAlreadyExists):
     return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
@@ -176,14 +206,52 @@ async def user_not_in_conversation_handler(request: Request, exc: UserNotInConve
 
 @app.exception_handler(FileRangeError)
 async def file_range_error_handler(request: Request, exc: FileRangeError):
-    return JSONResponse(status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE, content={"detail": str(exc)})
+    return JSONResponse(
+        status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+        content={"detail": str(exc)},
+        headers=None if exc.file_size is None else {"Content-Range": f"bytes */{exc.file_size}"}
+    )
+
+
+@app.exception_handler(InvalidCursorError)
+async def invalid_cursor_handler(request: Request, exc: InvalidCursorError):
+    return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content={"detail": str(exc)})
+
+
+
+@app.exception_handler(UploadSessionNotFound)
+async def upload_session_not_found_handler(request: Request, exc: UploadSessionNotFound):
+    return JSONResponse(status_code=status.HTTP_404_NOT_FOUND, content={"detail": str(exc)})
+
+
+@app.exception_handler(UploadOffsetMismatch)
+async def upload_offset_mismatch_handler(request: Request, exc: UploadOffsetMismatch):
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": str(exc)},
+        headers={"Upload-Offset": str(exc.offset)}
+    )
 
 
-@app.exception_handler(UnreadMessageAlreadyExists)
-async def unread_message_already_exists_handler(request: Request, exc: UnreadMessageAlreadyExists):
+@app.exception_handler(UploadSessionLocked)
+async def upload_session_locked_handler(request: Request, exc: UploadSessionLocked):
+    return JSONResponse(status_code=status.HTTP_423_LOCKED, content={"detail": str(exc)})
+
+
+@app.exception_handler(UploadLengthExceeded)
+async def upload_length_exceeded_handler(request: Request, exc: UploadLengthExceeded):
+    return JSONResponse(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, content={"detail": str(exc)})
+
+
+@app.exception_handler(UploadIncomplete)
+async def upload_incomplete_handler(request: Request, exc: UploadIncomplete):
     return JSONResponse(status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)})
 
 
+@app.exception_handler(ObjectStorageError)
+async def object_storage_error_handler(request: Request, exc: ObjectStorageError):
+    return JSONResponse(status_code=status.HTTP_502_BAD_GATEWAY, content={"detail": str(exc)})
+
 app.include_router(authorization_router)
 
 app.include_router(anonymous_users_router)
@@ -192,3 +260,5 @@ app.include_router(users_router)
 app.include_router(conversations_router)
 
 app.include_router(messages_router)
+
+app.include_router(metrics_router)
@@ -84,6 +84,9 @@ def run_migrations_online() -> None:
         with context.begin_transaction():
             context.run_migrations()
 
+    for callback in config.attributes.pop("after_commit", []):
+        callback()
+
 
 if context.is_offline_mode():
     run_migrations_offline()
@@ -0,0 +1,70 @@
+"""add messages search indexes
+
+Revision ID: 3b7e2f9d6c10
+Revises: 8d4f6a1c2b57
+Create Date: 2026-10-18 21:07:45.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from utilities import generic_settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2f9d6c10'
+down_revision: Union[str, None] = '8d4f6a1c2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    language_exists = op.get_bind().scalar(
+        sa.text("SELECT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = :language)"),
+        {"language": generic_settings.MESSAGES_SEARCH_LANGUAGE}
+    )
+    if not language_exists:
+        raise ValueError(
+            f"Text search configuration {generic_settings.MESSAGES_SEARCH_LANGUAGE} does not exist"
+        )
+
+    op.add_column(
+        'messages',
+        sa.Column(
+            'search_vector',
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                f"to_tsvector('{generic_settings.MESSAGES_SEARCH_LANGUAGE}'::regconfig, coalesce(content, ''))",
+                persisted=True
+            ),
+            nullable=True
+        ),
+        schema='chatwave'
+    )
+    op.create_index(
+        'ix_messages_search_vector',
+        'messages',
+        ['search_vector'],
+        unique=False,
+        schema='chatwave',
+        postgresql_using='gin'
+    )
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_messages_content_trgm',
+        'messages',
+        ['content'],
+        unique=False,
+        schema='chatwave',
+        postgresql_using='gin',
+        postgresql_ops={'content': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_content_trgm', table_name='messages', schema='chatwave')
+    op.drop_index('ix_messages_search_vector', table_name='messages', schema='chatwave')
+    op.drop_column('messages', 'search_vector', schema='chatwave')
@@ -0,0 +1,51 @@
+"""add unique indexes for unread messages
+
+Revision ID: 5f2c9d3e8b14
+Revises: a062edd91c09
+Create Date: 2026-10-18 14:21:07.513092
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2c9d3e8b14'
+down_revision: Union[str, None] = 'a062edd91c09'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(
+        """
+        DELETE FROM chatwave.unread_messages AS duplicate
+        USING chatwave.unread_messages AS original
+        WHERE duplicate.user_id = original.user_id
+          AND (duplicate.message_id = original.message_id OR duplicate.call_id = original.call_id)
+          AND duplicate.id > original.id
+        """
+    )
+    op.create_index(
+        'ux_unread_messages_user_id_message_id',
+        'unread_messages',
+        ['user_id', 'message_id'],
+        unique=True,
+        schema='chatwave',
+        postgresql_where=sa.text('message_id IS NOT NULL')
+    )
+    op.create_index(
+        'ux_unread_messages_user_id_call_id',
+        'unread_messages',
+        ['user_id', 'call_id'],
+        unique=True,
+        schema='chatwave',
+        postgresql_where=sa.text('call_id IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_unread_messages_user_id_call_id', table_name='unread_messages', schema='chatwave')
+    op.drop_index('ux_unread_messages_user_id_message_id', table_name='unread_messages', schema='chatwave')
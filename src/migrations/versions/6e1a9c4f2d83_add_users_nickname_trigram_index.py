@@ -0,0 +1,34 @@
+"""add users nickname trigram index
+
+Revision ID: 6e1a9c4f2d83
+Revises: 3b7e2f9d6c10
+Create Date: 2026-10-18 22:16:03.472915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1a9c4f2d83'
+down_revision: Union[str, None] = '3b7e2f9d6c10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index(
+        'ix_users_nickname_trgm',
+        'users',
+        ['nickname'],
+        unique=False,
+        schema='chatwave',
+        postgresql_using='gin',
+        postgresql_ops={'nickname': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_nickname_trgm', table_name='users', schema='chatwave')
@@ -0,0 +1,132 @@
+"""add media blobs table
+
+Revision ID: 8d4f6a1c2b57
+Revises: c41e7b2a9f03
+Create Date: 2026-10-18 19:41:12.530118
+
+"""
+import os
+import uuid
+import shutil
+import hashlib
+from pathlib import Path
+from typing import Callable, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from utilities import MediaPatches
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4f6a1c2b57'
+down_revision: Union[str, None] = 'c41e7b2a9f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+MEDIA_REFERENCES = (
+    ('messages', 'file_content_name', MediaPatches.MEDIA_MESSAGES_FOLDER.value),
+    ('users', 'avatar_name', MediaPatches.USERS_AVATARS_FOLDER.value),
+    ('conversations', 'avatar_name', MediaPatches.GROUPS_AVATARS_FOLDER.value)
+)
+
+
+def get_blob_path(digest: str) -> Path:
+    return MediaPatches.MEDIA_BLOBS_FOLDER.value / digest[:2] / digest
+
+
+def run_after_commit(callback: Callable[[], None]) -> None:
+    op.get_context().config.attributes.setdefault("after_commit", []).append(callback)
+
+
+def link_blob(file_path: Path, blob_path: Path) -> None:
+    if blob_path.is_file():
+        return None
+
+    blob_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = blob_path.with_name(f".{blob_path.name}.{uuid.uuid4()}")
+    try:
+        os.link(file_path, temp_path)
+    except OSError:
+        shutil.copyfile(file_path, temp_path)
+    os.replace(temp_path, blob_path)
+
+
+def remove_files(files_paths: list[Path]) -> None:
+    for file_path in files_paths:
+        file_path.unlink(missing_ok=True)
+
+
+def hash_file(file_path: Path) -> str:
+    hasher = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        while chunk := file.read(1024 * 1024):
+            hasher.update(chunk)
+
+    return hasher.hexdigest()
+
+
+def upgrade() -> None:
+    op.create_table(
+        'media_blobs',
+        sa.Column('digest', sa.String(), nullable=False),
+        sa.Column('refcount', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text("TIMEZONE('utc', now())"), nullable=False),
+        sa.PrimaryKeyConstraint('digest'),
+        schema='chatwave'
+    )
+
+    connection = op.get_bind()
+    migrated_files_paths = list()
+    for table_name, column_name, folder in MEDIA_REFERENCES:
+        rows = connection.execute(
+            sa.text(f"SELECT id, {column_name} FROM chatwave.{table_name} WHERE {column_name} IS NOT NULL")
+        ).all()
+        for row_id, file_name in rows:
+            file_path = folder / file_name
+            if not file_path.is_file():
+                continue
+
+            digest = hash_file(file_path)
+            link_blob(file_path=file_path, blob_path=get_blob_path(digest))
+            migrated_files_paths.append(file_path)
+            connection.execute(
+                sa.text(f"UPDATE chatwave.{table_name} SET {column_name} = :digest WHERE id = :id"),
+                {"digest": digest, "id": row_id}
+            )
+            connection.execute(
+                sa.text(
+                    """
+                    INSERT INTO chatwave.media_blobs (digest, refcount) VALUES (:digest, 1)
+                    ON CONFLICT (digest) DO UPDATE SET refcount = chatwave.media_blobs.refcount + 1
+                    """
+                ),
+                {"digest": digest}
+            )
+
+    run_after_commit(lambda: remove_files(migrated_files_paths))
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+    digests = connection.execute(sa.text("SELECT digest FROM chatwave.media_blobs")).scalars().all()
+    for table_name, column_name, folder in MEDIA_REFERENCES:
+        folder.mkdir(parents=True, exist_ok=True)
+        rows = connection.execute(
+            sa.text(f"SELECT id, {column_name} FROM chatwave.{table_name} WHERE {column_name} = ANY(:digests)"),
+            {"digests": digests}
+        ).all()
+        for row_id, digest in rows:
+            if not get_blob_path(digest).is_file():
+                continue
+
+            file_name = str(row_id) if table_name == 'messages' else str(uuid.uuid4())
+            shutil.copyfile(get_blob_path(digest), folder / file_name)
+            connection.execute(
+                sa.text(f"UPDATE chatwave.{table_name} SET {column_name} = :file_name WHERE id = :id"),
+                {"file_name": file_name, "id": row_id}
+            )
+
+    op.drop_table('media_blobs', schema='chatwave')
+    run_after_commit(lambda: shutil.rmtree(MediaPatches.MEDIA_BLOBS_FOLDER.value, ignore_errors=True))
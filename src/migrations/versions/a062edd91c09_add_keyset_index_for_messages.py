@@ -0,0 +1,32 @@
+"""add keyset index for messages
+
+Revision ID: a062edd91c09
+Revises: 98b3db371ae1
+Create Date: 2026-10-18 12:04:31.218803
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a062edd91c09'
+down_revision: Union[str, None] = '98b3db371ae1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_messages_conversation_id_created_at_id',
+        'messages',
+        ['conversation_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        schema='chatwave'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_messages_conversation_id_created_at_id', table_name='messages', schema='chatwave')
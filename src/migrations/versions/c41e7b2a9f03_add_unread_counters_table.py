@@ -0,0 +1,44 @@
+"""add unread counters table
+
+Revision ID: c41e7b2a9f03
+Revises: 5f2c9d3e8b14
+Create Date: 2026-10-18 15:02:44.870215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41e7b2a9f03'
+down_revision: Union[str, None] = '5f2c9d3e8b14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'unread_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('conversation_id', sa.Integer(), nullable=False),
+        sa.Column('unread_count', sa.Integer(), nullable=False),
+        sa.Column('last_unread_message_id', sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(['conversation_id'], ['chatwave.conversations.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['chatwave.users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'conversation_id'),
+        schema='chatwave'
+    )
+    op.execute(
+        """
+        INSERT INTO chatwave.unread_counters (user_id, conversation_id, unread_count, last_unread_message_id)
+        SELECT user_id, conversation_id, count(*), max(message_id)
+        FROM chatwave.unread_messages
+        GROUP BY user_id, conversation_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('unread_counters', schema='chatwave')
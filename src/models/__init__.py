@@ -2,6 +2,8 @@ from .users import Users
 from .calls import Calls
 from .messages import Messages
 from .unreaded_messages import UnreadMessages
+from .unread_counters import UnreadCounters
 from .conversations import Conversations
 from .conversations_members import ConversationMembers
 
+from .media_blobs import MediaBlobs
@@ -0,0 +1,11 @@
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import OrmBase
+from utilities import datetime_auto_set
+
+
+class MediaBlobs(OrmBase):
+    __tablename__ = 'media_blobs'
+    digest: Mapped[str] = mapped_column(primary_key=True)
+    refcount: Mapped[int] = mapped_column(nullable=False, default=0)
+    created_at: Mapped[datetime_auto_set]
@@ -1,4 +1,5 @@
-from sqlalchemy import Index, ForeignKey
+from sqlalchemy import Index, ForeignKey, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database import OrmBase
@@ -8,7 +9,8 @@ from utilities import (
     text_not_required_type,
     MessagesTypes,
     datetime_auto_set,
-    datetime_auto_update
+    datetime_auto_update,
+    generic_settings
 )
 
 
@@ -30,6 +32,14 @@ class Messages(OrmBase):
     file_content_type: Mapped[text_not_required_type]
     created_at: Mapped[datetime_auto_set]
     updated_at: Mapped[datetime_auto_update]
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{generic_settings.MESSAGES_SEARCH_LANGUAGE}'::regconfig, coalesce(content, ''))",
+            persisted=True
+        ),
+        deferred=True
+    )
 
     conversation: Mapped["Conversations"] = relationship(
         back_populates="messages"
@@ -39,8 +49,14 @@ class Messages(OrmBase):
     )
     unread_messages: Mapped[list["UnreadMessages"]] = relationship()
 
-    __table_args = (
-        Index("ix_messages_created_at_content", "created_at", "content"),
+    __table_args__ = (
+        Index(
+            "ix_messages_conversation_id_created_at_id",
+            "conversation_id",
+            text("created_at DESC"),
+            text("id DESC")
+        ),
+        Index("ix_messages_search_vector", "search_vector", postgresql_using="gin"),
     )
 
 
@@ -0,0 +1,18 @@
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database import OrmBase
+
+
+class UnreadCounters(OrmBase):
+    __tablename__ = 'unread_counters'
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    conversation_id: Mapped[int] = mapped_column(
+        ForeignKey("conversations.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    unread_count: Mapped[int] = mapped_column(nullable=False, default=0)
+    last_unread_message_id: Mapped[int] = mapped_column(nullable=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey, UniqueConstraint
+from sqlalchemy import ForeignKey, Index, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from database import OrmBase
@@ -23,11 +23,19 @@ class UnreadMessages(OrmBase):
         nullable=True
     )
 
-    __table_args = (
-        UniqueConstraint(
-            "conversation_id",
+    __table_args__ = (
+        Index(
+            "ux_unread_messages_user_id_message_id",
             "user_id",
             "message_id",
+            unique=True,
+            postgresql_where=text("message_id IS NOT NULL")
+        ),
+        Index(
+            "ux_unread_messages_user_id_call_id",
+            "user_id",
             "call_id",
-            name="unread_messages_conversation_id_user_id_message_id_call_id"),
+            unique=True,
+            postgresql_where=text("call_id IS NOT NULL")
+        ),
     )
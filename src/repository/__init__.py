@@ -1,4 +1,4 @@
-from .init_db import create_tables, delete_tables, create_schema
+from .init_db import create_tables, delete_tables, create_schema, create_search_indexes, verify_search_language
 from .users import (
     select_user_by_username,
     insert_user,
@@ -9,16 +9,18 @@ from .users import (
     select_users_last_online,
     update_user_last_online,
     is_user_exists,
+    select_existed_users_ids,
     delete_user_avatar,
     delete_user,
     is_user_avatar_uuid_existed
 )
 from .conversations import (
-    select_conversation,
+    insert_conversation,
     select_conversation_by_id,
     select_conversations,
     update_conversation,
     is_conversation_exists,
+    select_existed_conversations_ids,
     select_conversation_type,
     delete_conversation_avatar,
     delete_conversation,
@@ -30,29 +32,42 @@ from .conversations_members import (
     delete_conversation_members,
     select_conversation_members_quantity,
     select_conversation_members,
+    select_conversation_members_ids,
     select_conversation_admin_members,
-    update_conversation_member
+    update_conversation_member,
+    select_user_memberships
 )
 from .messages import (
     insert_text_message,
     insert_empty_message,
     insert_media_message,
     is_message_exists,
+    select_existed_messages_ids,
     select_message,
     update_message,
     select_messages,
     select_filtered_messages,
+    select_messages_by_cursor,
     delete_conversation_messages,
     delete_messages,
     delete_sender_messages,
     select_messages_by_content,
     select_message_status,
     update_message_status,
+    update_messages_read_status,
+    update_messages_delivered_status,
     select_last_message
 )
 from .unread_messages import (
     select_unread_messages,
-    is_unread_messages_exists,
     insert_unread_messages,
-    delete_unread_messages
+    delete_unread_messages,
+    delete_members_unread_messages,
+    select_unread_counters
+)
+from .media_blobs import (
+    acquire_media_blob,
+    release_media_blob,
+    select_media_blob_refcount,
+    delete_unreferenced_media_blob
 )
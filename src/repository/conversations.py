@@ -2,7 +2,7 @@ from sqlalchemy import select, update, delete, insert
 from sqlalchemy.orm import selectinload
 
 from models import Conversations
-from database import session
+from database import session, any_of
 from schemas import EditConversationDB, CreateEmptyConversation, CreateGroupDB
 from utilities import ConversationTypes
 
@@ -20,6 +20,16 @@ async def is_conversation_exists(conversation_id: int) -> bool:
         return False
 
 
+async def select_existed_conversations_ids(conversations_ids: list[int]) -> list[int]:
+    async with session() as cursor:
+        query = (
+            select(Conversations.id)
+            .filter(Conversations.id == any_of(conversations_ids))
+        )
+        result = await cursor.execute(query)
+        return result.scalars().all()
+
+
 async def select_conversation_type(conversation_id: int) -> ConversationTypes:
     async with session() as cursor:
         query = (
@@ -30,17 +40,18 @@ async def select_conversation_type(conversation_id: int) -> ConversationTypes:
         return result.scalar()
 
 
-async def select_conversation(conversation_obj: CreateEmptyConversation | CreateGroupDB) -> Conversations.id:
+async def insert_conversation(conversation_obj: CreateEmptyConversation | CreateGroupDB) -> Conversations:
     async with session() as cursor:
         query = (
-            insert(Conversations).returning(Conversations.id)
+            insert(Conversations).returning(Conversations)
             .values(
                 **conversation_obj.model_dump(exclude_none=True)
             )
         )
         raw_data = await cursor.execute(query)
-        await cursor.commit()
         raw_data = raw_data.scalar()
+        cursor.expunge(raw_data)
+        await cursor.commit()
 
         return raw_data
 
@@ -1,7 +1,8 @@
-from sqlalchemy import select, delete, and_, func, update, asc, insert
-from models import ConversationMembers
-from utilities import ConversationMemberRoles
-from database import session
+from sqlalchemy import select, delete, and_, func, update, asc, literal, Integer
+from sqlalchemy.dialects.postgresql import insert
+from models import ConversationMembers, Conversations
+from utilities import ConversationMemberRoles, ConversationTypes
+from database import session, any_of, array_of
 
 
 async def insert_members_to_conversation(
@@ -10,17 +11,19 @@ async def insert_members_to_conversation(
         role: ConversationMemberRoles
 ) -> None:
     async with session() as cursor:
-        for user_id in users_ids:
-            query = (
-                insert(ConversationMembers)
-                .values(
-                    user_id=user_id,
-                    conversation_id=conversation_id,
-                    role=role,
+        query = (
+            insert(ConversationMembers)
+            .from_select(
+                ["user_id", "conversation_id", "role"],
+                select(
+                    func.unnest(array_of(users_ids)),
+                    literal(conversation_id, Integer),
+                    literal(role, ConversationMembers.role.type)
                 )
             )
-            await cursor.execute(query)
-
+            .on_conflict_do_nothing()
+        )
+        await cursor.execute(query)
         await cursor.commit()
 
 
@@ -68,6 +71,21 @@ async def select_conversation_member_role(user_id: int, conversation_id: int) ->
         return result.scalar()
 
 
+async def select_conversation_members_ids(conversation_id: int, users_ids: list[int]) -> list[int]:
+    async with session() as cursor:
+        query = (
+            select(ConversationMembers.user_id)
+            .filter(
+                and_(
+                    ConversationMembers.conversation_id == conversation_id,
+                    ConversationMembers.user_id == any_of(users_ids)
+                )
+            )
+        )
+        result = await cursor.execute(query)
+        return result.scalars().all()
+
+
 async def select_conversation_members_quantity(conversation_id: int) -> int:
     async with session() as cursor:
         query = (
@@ -103,3 +121,14 @@ async def select_conversation_admin_members(conversation_id: int) -> list[Conver
         )
         result = await cursor.execute(query)
         return result.scalars().all()
+
+
+async def select_user_memberships(user_id: int) -> list[tuple[int, ConversationMemberRoles, ConversationTypes]]:
+    async with session() as cursor:
+        query = (
+            select(ConversationMembers.conversation_id, ConversationMembers.role, Conversations.type)
+            .join(Conversations, Conversations.id == ConversationMembers.conversation_id)
+            .filter(ConversationMembers.user_id == user_id)
+        )
+        result = await cursor.execute(query)
+        return result.all()
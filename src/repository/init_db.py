@@ -1,7 +1,8 @@
+import sys
 from sqlalchemy import text
 
 from database import engine, OrmBase, session
-from utilities import db_settings
+from utilities import db_settings, generic_settings
 import models # noqa
 
 
@@ -18,6 +19,54 @@ async def create_tables() -> None:
         await connection.run_sync(OrmBase.metadata.create_all)
 
 
+async def verify_search_language() -> None:
+    language = generic_settings.MESSAGES_SEARCH_LANGUAGE
+    async with engine.connect() as connection:
+        language_exists = await connection.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = :language)"),
+            {"language": language}
+        )
+        search_vector_expression = await connection.scalar(
+            text("""
+                SELECT generation_expression
+                FROM information_schema.columns
+                WHERE table_schema = :schema AND table_name = 'messages' AND column_name = 'search_vector'
+            """),
+            {"schema": db_settings.DB_SCHEMA}
+        )
+
+    if not language_exists:
+        sys.exit(f"Invalid MESSAGES_SEARCH_LANGUAGE specified! Text search configuration {language} does not exist!")
+    if search_vector_expression is not None and f"'{language}'::regconfig" not in search_vector_expression:
+        sys.exit(
+            f"MESSAGES_SEARCH_LANGUAGE {language} does not match the messages search_vector column "
+            f"({search_vector_expression})! Rebuild the column with a migration before changing it."
+        )
+
+
+async def create_search_indexes() -> None:
+    async with engine.begin() as connection:
+        trigram_available = await connection.scalar(
+            text("SELECT EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm')")
+        )
+        if not trigram_available:
+            return None
+
+        await connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm;"))
+        await connection.execute(
+            text(f"""
+                CREATE INDEX IF NOT EXISTS ix_messages_content_trgm
+                ON {db_settings.DB_SCHEMA}.messages USING gin (content gin_trgm_ops);
+            """)
+        )
+        await connection.execute(
+            text(f"""
+                CREATE INDEX IF NOT EXISTS ix_users_nickname_trgm
+                ON {db_settings.DB_SCHEMA}.users USING gin (nickname gin_trgm_ops);
+            """)
+        )
+
+
 async def delete_tables() -> None:
     async with engine.begin() as connection:
         await connection.run_sync(OrmBase.metadata.drop_all)
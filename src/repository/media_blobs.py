@@ -0,0 +1,49 @@
+from sqlalchemy import select, func, text
+from sqlalchemy.dialects.postgresql import insert
+from typing import Awaitable, Callable
+
+from models import MediaBlobs
+from database import session
+
+
+async def acquire_media_blob(digest: str) -> None:
+    async with session() as cursor:
+        await cursor.execute(select(func.pg_advisory_xact_lock(func.hashtext(digest))))
+        query = (
+            insert(MediaBlobs)
+            .values(digest=digest, refcount=1)
+            .on_conflict_do_update(
+                index_elements=[MediaBlobs.digest],
+                set_={"refcount": MediaBlobs.refcount + 1}
+            )
+        )
+        await cursor.execute(query)
+        await cursor.commit()
+
+
+async def release_media_blob(digest: str) -> None:
+    async with session() as cursor:
+        await cursor.execute(text("SELECT release_media_blob(:digest)"), {"digest": digest})
+        await cursor.commit()
+
+
+async def select_media_blob_refcount(digest: str) -> int:
+    async with session() as cursor:
+        query = (
+            select(MediaBlobs.refcount)
+            .filter_by(digest=digest)
+        )
+        raw_data = await cursor.execute(query)
+        return raw_data.scalar() or 0
+
+
+async def delete_unreferenced_media_blob(digest: str, delete_file: Callable[[], Awaitable[None]]) -> bool:
+    async with session() as cursor:
+        await cursor.execute(select(func.pg_advisory_xact_lock(func.hashtext(digest))))
+        raw_data = await cursor.execute(select(MediaBlobs.digest).filter_by(digest=digest))
+        is_referenced = raw_data.scalar() is not None
+        if not is_referenced:
+            await delete_file()
+        await cursor.commit()
+
+        return not is_referenced
@@ -1,10 +1,11 @@
-from sqlalchemy import select, update, insert, and_, delete, text
+from sqlalchemy import select, update, insert, and_, delete, text, tuple_, func, cast, literal, null, Float
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import selectinload
 
-from models import Messages
-from database import session
-from schemas import CreateTextMessageDB, CreateMediaMessageDB
-from utilities import MessagesStatus
+from models import Messages, UnreadMessages, ConversationMembers
+from database import session, any_of
+from schemas import CreateTextMessageDB, CreateMediaMessageDB, MessagesCursor, MessagesSearchCursor
+from utilities import MessagesStatus, PaginationDirections, SearchModes, SnippetMarkers, generic_settings
 
 
 async def is_message_exists(message_id: int) -> bool:
@@ -34,6 +35,69 @@ async def update_message_status(message_id: int, status: MessagesStatus) -> None
         await cursor.commit()
 
 
+async def update_messages_delivered_status(messages_ids: list[int]) -> None:
+    if not messages_ids:
+        return None
+
+    async with session() as cursor:
+        query = (
+            update(Messages)
+            .filter(
+                and_(
+                    Messages.id == any_of(messages_ids),
+                    Messages.status == MessagesStatus.SENT
+                )
+            )
+            .values(
+                status=MessagesStatus.DELIVERED,
+                updated_at=text("updated_at"),
+            )
+        )
+        await cursor.execute(query)
+        await cursor.commit()
+
+
+async def select_existed_messages_ids(messages_ids: list[int]) -> list[int]:
+    async with session() as cursor:
+        query = (
+            select(Messages.id)
+            .filter(Messages.id == any_of(messages_ids))
+        )
+        result = await cursor.execute(query)
+        return result.scalars().all()
+
+
+async def update_messages_read_status(user_id: int, messages_ids: list[int]) -> None:
+    if not messages_ids:
+        return None
+
+    messages_ids_array = any_of(messages_ids)
+    async with session() as cursor:
+        await cursor.execute(
+            update(Messages)
+            .filter(
+                and_(
+                    Messages.id == messages_ids_array,
+                    Messages.status != MessagesStatus.READ
+                )
+            )
+            .values(
+                status=MessagesStatus.READ,
+                updated_at=text("updated_at"),
+            )
+        )
+        await cursor.execute(
+            delete(UnreadMessages)
+            .filter(
+                and_(
+                    UnreadMessages.user_id == user_id,
+                    UnreadMessages.message_id == messages_ids_array
+                )
+            )
+        )
+        await cursor.commit()
+
+
 async def insert_empty_message(sender_id: int, conversation_id: int) -> int:
     async with session() as cursor:
         query = (
@@ -52,10 +116,10 @@ async def insert_empty_message(sender_id: int, conversation_id: int) -> int:
         return message_id
 
 
-async def insert_text_message(sender_id: int, conversation_id: int, message_data: CreateTextMessageDB) -> int:
+async def insert_text_message(sender_id: int, conversation_id: int, message_data: CreateTextMessageDB) -> Messages:
     async with session() as cursor:
         query = (
-            insert(Messages).returning(Messages.id)
+            insert(Messages).returning(Messages)
             .values(
                 sender_id=sender_id,
                 conversation_id=conversation_id,
@@ -63,12 +127,14 @@ async def insert_text_message(sender_id: int, conversation_id: int, message_data
             )
         )
         raw_data = await cursor.execute(query)
+        raw_data = raw_data.scalar()
+        cursor.expunge(raw_data)
         await cursor.commit()
 
-        return raw_data.scalar()
+        return raw_data
 
 
-async def insert_media_message(message_id: int, message_data: CreateMediaMessageDB) -> None:
+async def insert_media_message(message_id: int, message_data: CreateMediaMessageDB) -> Messages | None:
     async with session() as cursor:
         query = (
             update(Messages)
@@ -77,10 +143,18 @@ async def insert_media_message(message_id: int, message_data: CreateMediaMessage
                 updated_at=None,
                 **message_data.model_dump(exclude_none=True)
             )
+            .returning(Messages)
         )
-        await cursor.execute(query)
+        raw_data = await cursor.execute(query)
+        raw_data = raw_data.scalar()
+        if raw_data is None:
+            return None
+
+        cursor.expunge(raw_data)
         await cursor.commit()
 
+        return raw_data
+
 
 async def update_message(message_id: int, content: str) -> None:
     async with session() as cursor:
@@ -134,7 +208,7 @@ async def select_filtered_messages(conversation_id: int, limit: int, offset: int
                     Messages.status != MessagesStatus.CREATED
                 )
             )
-            .order_by(Messages.created_at.desc())
+            .order_by(Messages.created_at.desc(), Messages.id.desc())
             .limit(limit)
             .offset(offset)
         )
@@ -144,6 +218,46 @@ async def select_filtered_messages(conversation_id: int, limit: int, offset: int
         return result
 
 
+async def select_messages_by_cursor(
+        conversation_id: int,
+        limit: int,
+        messages_cursor: MessagesCursor
+) -> list[Messages]:
+    cursor_key = tuple_(messages_cursor.created_at, messages_cursor.message_id)
+    messages_key = tuple_(Messages.created_at, Messages.id)
+
+    async with session() as cursor:
+        query = (
+            select(Messages)
+            .filter(
+                and_(
+                    Messages.conversation_id == conversation_id,
+                    Messages.status != MessagesStatus.CREATED
+                )
+            )
+            .limit(limit)
+        )
+        if messages_cursor.direction == PaginationDirections.BEFORE:
+            query = (
+                query
+                .filter(messages_key < cursor_key)
+                .order_by(Messages.created_at.desc(), Messages.id.desc())
+            )
+        else:
+            query = (
+                query
+                .filter(messages_key > cursor_key)
+                .order_by(Messages.created_at.asc(), Messages.id.asc())
+            )
+
+        result = await cursor.execute(query)
+        result = list(result.scalars().all())
+        if messages_cursor.direction == PaginationDirections.AFTER:
+            result.reverse()
+
+        return result
+
+
 async def select_last_message(conversation_id: int) -> Messages:
     async with session() as cursor:
         query = (
@@ -163,16 +277,69 @@ async def select_last_message(conversation_id: int) -> Messages:
         return result
 
 
-async def select_messages_by_content(conversation_id: int, search_query: str, limit: int) -> list[Messages]:
+async def select_messages_by_content(
+        search_query: str,
+        limit: int,
+        mode: SearchModes,
+        conversation_id: int | None = None,
+        user_id: int | None = None,
+        search_cursor: MessagesSearchCursor | None = None
+) -> list[tuple[Messages, float | None, str | None]]:
+    language = cast(literal(generic_settings.MESSAGES_SEARCH_LANGUAGE), REGCONFIG)
+    ts_query = func.websearch_to_tsquery(language, search_query)
+
+    matches = select(Messages.id.label("message_id")).filter(Messages.status != MessagesStatus.CREATED)
+    if conversation_id is not None:
+        matches = matches.filter(Messages.conversation_id == conversation_id)
+    if user_id is not None:
+        matches = matches.filter(
+            Messages.conversation_id.in_(
+                select(ConversationMembers.conversation_id).filter_by(user_id=user_id)
+            )
+        )
+
+    if mode == SearchModes.WORDS:
+        rank = func.ts_rank_cd(Messages.search_vector, ts_query)
+        matches = (
+            matches
+            .add_columns(rank.label("rank"))
+            .filter(Messages.search_vector.op("@@")(ts_query))
+            .order_by(rank.desc(), Messages.id.desc())
+        )
+        if search_cursor is not None:
+            matches = matches.filter(
+                tuple_(cast(rank, Float), Messages.id) < tuple_(search_cursor.rank, search_cursor.message_id)
+            )
+    else:
+        matches = (
+            matches
+            .add_columns(null().label("rank"))
+            .filter(Messages.content.icontains(search_query, autoescape=True))
+            .order_by(Messages.id.desc())
+        )
+        if search_cursor is not None:
+            matches = matches.filter(Messages.id < search_cursor.message_id)
+
+    page = matches.limit(limit).subquery()
+    snippet = null()
+    if mode == SearchModes.WORDS:
+        snippet_words = generic_settings.MESSAGES_SEARCH_SNIPPET_WORDS
+        snippet = func.ts_headline(
+            language,
+            func.translate(Messages.content, SnippetMarkers.START.value + SnippetMarkers.STOP.value, ""),
+            ts_query,
+            f'StartSel="{SnippetMarkers.START.value}", StopSel="{SnippetMarkers.STOP.value}", '
+            f"MaxWords={snippet_words}, MinWords={max(snippet_words // 2, 1)}, MaxFragments=2"
+        )
+
     async with session() as cursor:
         query = (
-            select(Messages)
-            .filter_by(conversation_id=conversation_id)
-            .filter(Messages.content.icontains(search_query))
-            .limit(limit)
+            select(Messages, page.c.rank, snippet)
+            .join(page, Messages.id == page.c.message_id)
+            .order_by(page.c.rank.desc().nulls_last(), Messages.id.desc())
         )
         result = await cursor.execute(query)
-        return result.scalars().all()
+        return result.tuples().all()
 
 
 async def delete_conversation_messages(conversation_id: int) -> None:
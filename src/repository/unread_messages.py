@@ -1,23 +1,10 @@
-from sqlalchemy import select, insert, func, delete
+from sqlalchemy import select, func, delete, literal, Integer
+from sqlalchemy.dialects.postgresql import insert
 
-from models import UnreadMessages
-from database import session
+from models import UnreadMessages, UnreadCounters
+from database import session, any_of, array_of
 from schemas import FilterUnreadMessages
-from schemas.unread_messages import UnreadMessageExistedDTO, AddUnreadMessagesDB
-
-
-async def is_unread_messages_exists(filter_conditions: UnreadMessageExistedDTO) -> bool:
-    async with session() as cursor:
-        query = (
-            select(func.count())
-            .select_from(UnreadMessages)
-            .filter_by(**filter_conditions.model_dump(exclude_none=True))
-        )
-        raw_data = await cursor.execute(query)
-        if raw_data.scalar() > 0:
-            return True
-
-        return False
+from schemas.unread_messages import AddUnreadMessagesDB
 
 
 async def select_unread_messages(filter_conditions: FilterUnreadMessages) -> list[UnreadMessages]:
@@ -32,16 +19,20 @@ async def select_unread_messages(filter_conditions: FilterUnreadMessages) -> lis
 
 async def insert_unread_messages(unread_messages_data: AddUnreadMessagesDB) -> None:
     async with session() as cursor:
-        for user_id in unread_messages_data.users_ids:
-            query = (
-                insert(UnreadMessages)
-                .values(
-                    user_id=user_id,
-                    **unread_messages_data.model_dump(exclude_none=True, exclude={"users_ids"})
+        query = (
+            insert(UnreadMessages)
+            .from_select(
+                ["user_id", "conversation_id", "message_id", "call_id"],
+                select(
+                    func.unnest(array_of(unread_messages_data.users_ids)),
+                    literal(unread_messages_data.conversation_id, Integer),
+                    literal(unread_messages_data.message_id, Integer),
+                    literal(unread_messages_data.call_id, Integer)
                 )
             )
-            await cursor.execute(query)
-
+            .on_conflict_do_nothing()
+        )
+        await cursor.execute(query)
         await cursor.commit()
 
 
@@ -53,3 +44,26 @@ async def delete_unread_messages(filter_conditions: FilterUnreadMessages) -> Non
         )
         await cursor.execute(query)
         await cursor.commit()
+
+
+async def delete_members_unread_messages(conversation_id: int, users_ids: list[int]) -> None:
+    async with session() as cursor:
+        query = (
+            delete(UnreadMessages)
+            .where(
+                UnreadMessages.conversation_id == conversation_id,
+                UnreadMessages.user_id == any_of(users_ids)
+            )
+        )
+        await cursor.execute(query)
+        await cursor.commit()
+
+
+async def select_unread_counters(user_id: int) -> list[UnreadCounters]:
+    async with session() as cursor:
+        query = (
+            select(UnreadCounters)
+            .where(UnreadCounters.user_id == user_id)
+        )
+        raw_data = await cursor.execute(query)
+        return raw_data.scalars().all()
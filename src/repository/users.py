@@ -1,10 +1,10 @@
 from datetime import datetime
-from sqlalchemy import select, insert, update, text, delete
+from sqlalchemy import select, insert, update, text, delete, case, func, tuple_
 from sqlalchemy.orm import selectinload
 
 from models import Users, Conversations
-from database import session
-from schemas import CreateUserDB, UpdateUserDB
+from database import session, any_of
+from schemas import CreateUserDB, UpdateUserDB, UsersSearchCursor
 
 
 async def is_user_exists(user_id: int) -> bool:
@@ -20,6 +20,16 @@ async def is_user_exists(user_id: int) -> bool:
         return False
 
 
+async def select_existed_users_ids(users_ids: list[int]) -> list[int]:
+    async with session() as cursor:
+        query = (
+            select(Users.id)
+            .filter(Users.id == any_of(users_ids))
+        )
+        result = await cursor.execute(query)
+        return result.scalars().all()
+
+
 async def select_user_by_username(username: str) -> tuple[int, str]:
     async with session() as cursor:
         query = (
@@ -68,29 +78,34 @@ async def select_users(users_ids: list[int]) -> list[Users]:
         return raw_data
 
 
-async def select_users_by_nickname(search_query: str, limit: int | None) -> list[Users]:
+async def select_users_by_nickname(
+        search_query: str,
+        limit: int,
+        search_cursor: UsersSearchCursor | None = None
+) -> list[tuple[Users, int]]:
+    rank = case(
+        (func.lower(Users.nickname) == search_query.lower(), 0),
+        (Users.nickname.istartswith(search_query, autoescape=True), 1),
+        (Users.nickname.icontains(f" {search_query}", autoescape=True), 2),
+        else_=3
+    )
+    nickname_length = func.length(Users.nickname)
 
-    async def query_builder():
-        if limit is None:
-            _query = (
-                select(Users)
-                .filter(Users.nickname.icontains(search_query))
-            )
-        else:
-            _query = (
-                select(Users)
-                .filter(Users.nickname.icontains(search_query))
-                .limit(limit)
+    async with session() as cursor:
+        query = (
+            select(Users, rank)
+            .filter(Users.nickname.icontains(search_query, autoescape=True))
+            .order_by(rank, nickname_length, Users.id)
+            .limit(limit)
+        )
+        if search_cursor is not None:
+            query = query.filter(
+                tuple_(rank, nickname_length, Users.id)
+                > tuple_(search_cursor.rank, search_cursor.nickname_length, search_cursor.user_id)
             )
 
-        return _query
-
-    async with session() as cursor:
-        query = await query_builder()
         raw_data = await cursor.execute(query)
-        raw_data = raw_data.scalars().all()
-
-        return raw_data
+        return raw_data.tuples().all()
 
 
 async def update_user(user_id: int, user_data: UpdateUserDB) -> None:
@@ -2,3 +2,4 @@ from .authentication import authorization_router
 from .users import users_router, anonymous_users_router
 from .conversations import conversations_router
 from .messages import messages_router
+from .metrics import metrics_router
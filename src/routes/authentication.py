@@ -2,13 +2,15 @@ from fastapi import APIRouter, Depends, status
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
 from typing import Annotated
 
+from dependencies import unit_of_work
 from schemas import CreateUser
 from services import get_access_token, create_user
 
 
 authorization_router = APIRouter(
     tags=['Authorization'],
-    prefix="/auth"
+    prefix="/auth",
+    dependencies=[Depends(unit_of_work)]
 )
 
 
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, status, UploadFile, File, Query, Body, Form
+from fastapi import APIRouter, Depends, status, UploadFile, File, Query, Body, Form, Response, Request, Header
 from fastapi.responses import StreamingResponse
 from typing import Annotated, Optional
+from datetime import datetime
 
-from dependencies import verify_token, update_last_online
+from dependencies import verify_token, update_last_online, unit_of_work
 from schemas.unread_messages import AddUnreadMessages
-from utilities import EntitiesTypes
+from utilities import EntitiesTypes, SearchModes
 from validators import verify_current_user_is_existed
 from services import (
     create_private_conversation,
@@ -19,11 +20,19 @@ from services import (
     delete_conversation_by_id,
     search_conversation_messages,
     fetch_messages,
+    fetch_messages_by_cursor,
+    build_messages_cursor,
     delete_all_messages,
     create_media_message,
     create_text_message,
     add_unread_messages,
-    fetch_last_message
+    fetch_last_message,
+    create_upload_session,
+    fetch_upload_session,
+    append_upload_data,
+    finalize_upload_session,
+    remove_upload_session,
+    stream_file
 )
 from schemas import (
     CreateGroup,
@@ -31,34 +40,62 @@ from schemas import (
     UsersIds,
     DeleteGroupMembers,
     GetMessage,
-    ConversationsIds,
+    FoundMessage,
+    ConversationsAvatars,
     GetConversations,
     Avatar,
     CreateMediaMessage,
-    CreateTextMessage
+    CreateTextMessage,
+    CreateUploadSession,
+    GetUploadSession
 )
-from storage import FileManager
+from storage import get_file_manager
 
 conversations_router = APIRouter(
     tags=["Conversations"],
     prefix="/conversations",
-    dependencies=[Depends(update_last_online), Depends(verify_current_user_is_existed)],
+    dependencies=[Depends(update_last_online), Depends(unit_of_work), Depends(verify_current_user_is_existed)],
 )
 
 
 @conversations_router.get("/{conversation_id}/messages", status_code=status.HTTP_200_OK, response_model=list[GetMessage])
 async def get_messages_from_conversation(
+        response: Response,
         current_user_id: Annotated[int, Depends(verify_token)],
         conversation_id: int,
         limit: int = Query(10, ge=1, le=1000),
         offset: int = Query(0, ge=0),
+        cursor: Optional[str] = Query(None, max_length=512),
+        before_id: Optional[int] = Query(None, ge=1),
+        before_created_at: Optional[datetime] = Query(None),
+        after_id: Optional[int] = Query(None, ge=1),
+        after_created_at: Optional[datetime] = Query(None)
 ):
-    messages_objs = await fetch_messages(
+    messages_cursor = await build_messages_cursor(
+        cursor=cursor,
+        before_id=before_id,
+        before_created_at=before_created_at,
+        after_id=after_id,
+        after_created_at=after_created_at
+    )
+    if messages_cursor is None:
+        messages_objs = await fetch_messages(
+            sender_id=current_user_id,
+            conversation_id=conversation_id,
+            limit=limit,
+            offset=offset
+        )
+        return messages_objs
+
+    messages_objs, next_cursor = await fetch_messages_by_cursor(
         sender_id=current_user_id,
         conversation_id=conversation_id,
         limit=limit,
-        offset=offset
+        messages_cursor=messages_cursor
     )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     return messages_objs
 
 
@@ -74,19 +111,27 @@ async def get_last_message_from_conversation(
     return message_obj
 
 
-@conversations_router.get("/{conversation_id}/messages/search", status_code=status.HTTP_200_OK, response_model=list[GetMessage])
+@conversations_router.get("/{conversation_id}/messages/search", status_code=status.HTTP_200_OK, response_model=list[FoundMessage])
 async def search_messages_in_conversation(
+        response: Response,
         current_user_id: Annotated[int, Depends(verify_token)],
         conversation_id: int,
         search_query: str = Query(min_length=3, max_length=128),
-        limit: int = Query(10, ge=1, le=1000)
+        limit: int = Query(10, ge=1, le=1000),
+        mode: SearchModes = Query(SearchModes.WORDS),
+        cursor: Optional[str] = Query(None, max_length=512)
 ):
-    messages_objs = await search_conversation_messages(
+    messages_objs, next_cursor = await search_conversation_messages(
         user_id=current_user_id,
         conversations_id=conversation_id,
         search_query=search_query,
-        limit=limit
+        limit=limit,
+        mode=mode,
+        cursor=cursor
     )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     return messages_objs
 
 
@@ -94,22 +139,34 @@ async def search_messages_in_conversation(
 async def get_group_avatar(
         current_user_id: Annotated[int, Depends(verify_token)],
         group_id: int,
-        avatar_uuid: str
+        avatar_uuid: str,
+        size: int | None = Query(None, gt=0),
+        if_none_match: str | None = Header(None)
 ):
-    metadata = await fetch_group_avatar_metadata(user_id=current_user_id, group_id=group_id, avatar_uuid=avatar_uuid)
-    return StreamingResponse(metadata["file_path"].open("rb"))
+    metadata = await fetch_group_avatar_metadata(
+        user_id=current_user_id,
+        group_id=group_id,
+        avatar_uuid=avatar_uuid,
+        size=size
+    )
+    return await stream_file(
+        file_path=metadata["file_path"],
+        file_type=metadata["file_type"],
+        if_none_match=if_none_match
+    )
 
 
 @conversations_router.get("/avatars", status_code=status.HTTP_200_OK)
 async def get_groups_avatars(
         current_user_id: Annotated[int, Depends(verify_token)],
-        conversation_id: ConversationsIds = Query()
+        conversation_id: ConversationsAvatars = Query()
 ):
     avatars_paths = await fetch_group_avatars_paths(
         user_id=current_user_id,
-        conversations_ids=conversation_id.conversations_ids
+        conversations_ids=conversation_id.conversations_ids,
+        size=conversation_id.size
     )
-    zip_obj = await FileManager().archive_files(avatars_paths)
+    zip_obj = await get_file_manager().archive_files(avatars_paths)
     return StreamingResponse(zip_obj, media_type="application/zip")
 
 
@@ -163,7 +220,7 @@ async def send_media_message(
         file: UploadFile = File()
 ):
     new_message_obj = CreateMediaMessage(
-        file=file.file.read(),
+        file=file,
         file_name=file.filename,
         file_type=file.content_type,
         caption=caption,
@@ -177,6 +234,88 @@ async def send_media_message(
     return new_message_obj
 
 
+@conversations_router.post(
+    "/{conversation_id}/uploads",
+    status_code=status.HTTP_201_CREATED,
+    response_model=GetUploadSession
+)
+async def start_media_upload(
+        response: Response,
+        current_user_id: Annotated[int, Depends(verify_token)],
+        conversation_id: int,
+        request: CreateUploadSession
+):
+    upload_session = await create_upload_session(
+        user_id=current_user_id,
+        conversation_id=conversation_id,
+        session_data=request
+    )
+    response.headers["Location"] = f"/conversations/{conversation_id}/uploads/{upload_session.id}"
+    response.headers["Upload-Offset"] = str(upload_session.offset)
+    response.headers["Upload-Length"] = str(upload_session.file_size)
+    return upload_session
+
+
+@conversations_router.head("/{conversation_id}/uploads/{upload_id}", status_code=status.HTTP_200_OK)
+async def get_media_upload_offset(
+        current_user_id: Annotated[int, Depends(verify_token)],
+        conversation_id: int,
+        upload_id: str
+):
+    upload_session = await fetch_upload_session(
+        user_id=current_user_id,
+        conversation_id=conversation_id,
+        upload_id=upload_id
+    )
+    return Response(
+        status_code=status.HTTP_200_OK,
+        headers={
+            "Upload-Offset": str(upload_session.offset),
+            "Upload-Length": str(upload_session.file_size),
+            "Cache-Control": "no-store"
+        }
+    )
+
+
+@conversations_router.patch("/{conversation_id}/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def upload_media_chunk(
+        request: Request,
+        current_user_id: Annotated[int, Depends(verify_token)],
+        conversation_id: int,
+        upload_id: str,
+        upload_offset: int = Header(ge=0)
+):
+    upload_session = await append_upload_data(
+        user_id=current_user_id,
+        conversation_id=conversation_id,
+        upload_id=upload_id,
+        offset=upload_offset,
+        data_stream=request.stream()
+    )
+    return Response(
+        status_code=status.HTTP_204_NO_CONTENT,
+        headers={"Upload-Offset": str(upload_session.offset)}
+    )
+
+
+@conversations_router.post(
+    "/{conversation_id}/uploads/{upload_id}/finalize",
+    status_code=status.HTTP_200_OK,
+    response_model=GetMessage
+)
+async def finalize_media_upload(
+        current_user_id: Annotated[int, Depends(verify_token)],
+        conversation_id: int,
+        upload_id: str
+):
+    new_message_obj = await finalize_upload_session(
+        user_id=current_user_id,
+        conversation_id=conversation_id,
+        upload_id=upload_id
+    )
+    return new_message_obj
+
+
 @conversations_router.post("/{conversation_id}/entities/{entity_id}", status_code=status.HTTP_200_OK)
 async def create_unread_messages(
         current_user_id: Annotated[int, Depends(verify_token)],
@@ -249,6 +388,19 @@ async def delete_conversation(
     await delete_conversation_by_id(user_id=current_user_id, conversation_id=conversation_id)
 
 
+@conversations_router.delete("/{conversation_id}/uploads/{upload_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_media_upload(
+        current_user_id: Annotated[int, Depends(verify_token)],
+        conversation_id: int,
+        upload_id: str
+):
+    await remove_upload_session(
+        user_id=current_user_id,
+        conversation_id=conversation_id,
+        upload_id=upload_id
+    )
+
+
 @conversations_router.delete("/{conversation_id}/messages", status_code=status.HTTP_202_ACCEPTED)
 async def delete_conversation_messages(
         current_user_id: Annotated[int, Depends(verify_token)],
@@ -1,68 +1,83 @@
-from fastapi import APIRouter, Depends, status, Query, Body, Header
+from fastapi import APIRouter, Depends, status, Query, Body, Header, Response
 from fastapi.responses import StreamingResponse
-from typing import Annotated
+from typing import Annotated, Optional
 
-from dependencies import verify_token, update_last_online
-from utilities import FileRangeError
+from dependencies import verify_token, update_last_online, unit_of_work
 from validators import verify_current_user_is_existed
-from storage import FileManager
+from storage import get_file_manager
 from services import (
     update_user_message,
     fetch_message_media_metadata,
     fetch_messages_media_paths,
     remove_messages,
-    parse_bytes_file_range,
+    search_user_messages,
     stream_file
 )
-from schemas import MessagesIds, CreateTextMessage
+from schemas import MessagesIds, MessagesMedia, CreateTextMessage, FoundMessage
+from utilities import SearchModes
 
 messages_router = APIRouter(
     prefix="/messages",
     tags=["Messages"],
-    dependencies=[Depends(update_last_online), Depends(verify_current_user_is_existed)]
+    dependencies=[Depends(update_last_online), Depends(unit_of_work), Depends(verify_current_user_is_existed)]
 )
 
 
+@messages_router.get("/search", status_code=status.HTTP_200_OK, response_model=list[FoundMessage])
+async def search_messages(
+        response: Response,
+        current_user_id: Annotated[int, Depends(verify_token)],
+        search_query: str = Query(min_length=3, max_length=128),
+        limit: int = Query(10, ge=1, le=1000),
+        mode: SearchModes = Query(SearchModes.WORDS),
+        cursor: Optional[str] = Query(None, max_length=512)
+):
+    messages_objs, next_cursor = await search_user_messages(
+        user_id=current_user_id,
+        search_query=search_query,
+        limit=limit,
+        mode=mode,
+        cursor=cursor
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return messages_objs
+
+
 @messages_router.get("/{message_id}/media", status_code=status.HTTP_200_OK)
 async def get_message_media(
         current_user_id: Annotated[int, Depends(verify_token)],
         message_id: int,
+        size: int | None = Query(None, gt=0),
         range: str | None = Header(None),
+        if_range: str | None = Header(None),
+        if_none_match: str | None = Header(None)
 ):
-    metadata = await fetch_message_media_metadata(sender_id=current_user_id, message_id=message_id)
-
-    if range:
-        file_size = await FileManager().check_file_size(metadata["file_path"])
-        start_byte, end_byte = await parse_bytes_file_range(bytes_range=range, file_size=file_size)
-        if start_byte > file_size:
-            raise FileRangeError()
-
-        return await stream_file(
-            file_path=metadata["file_path"],
-            file_type=metadata["file_type"],
-            file_size=file_size,
-            start_byte=start_byte,
-            end_byte=end_byte,
-        )
+    metadata = await fetch_message_media_metadata(sender_id=current_user_id, message_id=message_id, size=size)
 
     return await stream_file(
         file_path=metadata["file_path"],
-        file_type=metadata["file_type"]
+        file_type=metadata["file_type"],
+        bytes_range=range,
+        if_range=if_range,
+        if_none_match=if_none_match
     )
 
 
 @messages_router.get("/media", status_code=status.HTTP_200_OK)
 async def get_messages_medias(
         current_user_id: Annotated[int, Depends(verify_token)],
-        message_id: MessagesIds = Query()
+        message_id: MessagesMedia = Query()
 ):
     messages_media_paths = await fetch_messages_media_paths(
         sender_id=current_user_id,
-        messages_ids=message_id.messages_ids
+        messages_ids=message_id.messages_ids,
+        size=message_id.size
     )
-    files_generator_obj = await FileManager().file_chunk_generator(file_paths=messages_media_paths)
+    zip_obj = await get_file_manager().archive_files(messages_media_paths)
 
-    return StreamingResponse(files_generator_obj, media_type="application/octet-stream")
+    return StreamingResponse(zip_obj, media_type="application/zip")
 
 
 @messages_router.patch("/{message_id}", status_code=status.HTTP_202_ACCEPTED)
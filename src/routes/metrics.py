@@ -0,0 +1,38 @@
+from fastapi import APIRouter, Depends, status
+
+from database import pool_monitor
+from dependencies import verify_metrics_token, connection_hub
+from schemas import HubStats, NotificationsListenerStats, StorageStats, ImageProcessingStats, DatabasePoolStats
+from storage import file_io_executor, image_processor
+from triggers import notifications_listener
+
+metrics_router = APIRouter(
+    prefix="/metrics",
+    tags=["Metrics"],
+    dependencies=[Depends(verify_metrics_token)]
+)
+
+
+@metrics_router.get("/hub", status_code=status.HTTP_200_OK, response_model=HubStats)
+async def get_hub_stats():
+    return connection_hub.stats()
+
+
+@metrics_router.get("/notifications", status_code=status.HTTP_200_OK, response_model=NotificationsListenerStats)
+async def get_notifications_listener_stats():
+    return notifications_listener.stats()
+
+
+@metrics_router.get("/storage", status_code=status.HTTP_200_OK, response_model=StorageStats)
+async def get_storage_stats():
+    return file_io_executor.stats()
+
+
+@metrics_router.get("/images", status_code=status.HTTP_200_OK, response_model=ImageProcessingStats)
+async def get_image_processing_stats():
+    return image_processor.stats()
+
+
+@metrics_router.get("/database", status_code=status.HTTP_200_OK, response_model=DatabasePoolStats)
+async def get_database_pool_stats():
+    return pool_monitor.stats()
@@ -7,10 +7,12 @@ from fastapi import (
     File,
     Query,
     Body,
+    Header,
+    Response,
     WebSocket
 )
 from fastapi.responses import StreamingResponse
-from typing import Annotated
+from typing import Annotated, Optional
 
 from repository import is_user_exists
 from schemas import (
@@ -19,12 +21,14 @@ from schemas import (
     PublicUser,
     Avatar,
     UsersIds,
+    UsersAvatars,
     UserOnline,
     GetConversationsWithMembers,
-    GetUnreadMessages
+    GetUnreadMessages,
+    GetUnreadSummary
 )
-from dependencies import verify_token, update_last_online, verify_token_ws
-from storage import FileManager
+from dependencies import verify_token, update_last_online, verify_token_ws, unit_of_work, read_only_unit_of_work
+from storage import get_file_manager
 from validators import verify_current_user_is_existed
 from services import (
     fetch_private_user,
@@ -39,16 +43,19 @@ from services import (
     remove_user_account,
     leave_group,
     fetch_user_unread_messages,
+    fetch_user_unread_summary,
     fetch_user_recipients_last_online,
     fetch_users_online_status,
     user_last_online_listener,
-    unread_messages_listener
+    unread_messages_listener,
+    unread_summary_listener,
+    stream_file
 )
 
 users_router = APIRouter(
     tags=["Users"],
     prefix="/users",
-    dependencies=[Depends(update_last_online), Depends(verify_current_user_is_existed)]
+    dependencies=[Depends(update_last_online), Depends(unit_of_work), Depends(verify_current_user_is_existed)]
 )
 
 anonymous_users_router = APIRouter(
@@ -65,7 +72,12 @@ async def get_current_user(
     return profile_data
 
 
-@anonymous_users_router.get("", status_code=status.HTTP_200_OK, response_model=list[PublicUser])
+@anonymous_users_router.get(
+    "",
+    status_code=status.HTTP_200_OK,
+    response_model=list[PublicUser],
+    dependencies=[Depends(read_only_unit_of_work)]
+)
 async def get_users(
         user_id: UsersIds = Query()
 ):
@@ -73,29 +85,57 @@ async def get_users(
     return users_objects
 
 
-@anonymous_users_router.get("/search", status_code=status.HTTP_200_OK, response_model=list[PublicUser])
+@anonymous_users_router.get(
+    "/search",
+    status_code=status.HTTP_200_OK,
+    response_model=list[PublicUser],
+    dependencies=[Depends(read_only_unit_of_work)]
+)
 async def search_users(
+        response: Response,
         search_query: str = Query(min_length=3, max_length=128),
-        limit: int | None = Query(None, ge=1, le=1000),
+        limit: int = Query(20, ge=1, le=100),
+        cursor: Optional[str] = Query(None, max_length=512)
 ):
-    users_objects = await search_users_by_nickname(search_query=search_query, limit=limit)
+    users_objects, next_cursor = await search_users_by_nickname(
+        search_query=search_query,
+        limit=limit,
+        cursor=cursor
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+
     return users_objects
 
 
-@anonymous_users_router.get("/avatar/{avatar_uuid}", status_code=status.HTTP_200_OK)
+@anonymous_users_router.get(
+    "/avatar/{avatar_uuid}",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(read_only_unit_of_work)]
+)
 async def get_user_avatar(
-        avatar_uuid: str
+        avatar_uuid: str,
+        size: int | None = Query(None, gt=0),
+        if_none_match: str | None = Header(None)
 ):
-    metadata = await fetch_user_avatar_metadata(avatar_uuid=avatar_uuid)
-    return StreamingResponse(metadata["file_path"].open("rb"))
+    metadata = await fetch_user_avatar_metadata(avatar_uuid=avatar_uuid, size=size)
+    return await stream_file(
+        file_path=metadata["file_path"],
+        file_type=metadata["file_type"],
+        if_none_match=if_none_match
+    )
 
 
-@anonymous_users_router.get("/avatars", status_code=status.HTTP_200_OK)
+@anonymous_users_router.get(
+    "/avatars",
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(read_only_unit_of_work)]
+)
 async def get_users_avatars(
-        user_id: UsersIds = Query()
+        user_id: UsersAvatars = Query()
 ):
-    avatars_paths = await fetch_users_avatars_paths(users_ids=user_id.users_ids)
-    zip_obj = await FileManager().archive_files(avatars_paths)
+    avatars_paths = await fetch_users_avatars_paths(users_ids=user_id.users_ids, size=user_id.size)
+    zip_obj = await get_file_manager().archive_files(avatars_paths)
     return StreamingResponse(zip_obj, media_type="application/zip")
 
 
@@ -139,8 +179,32 @@ async def get_current_user_unread_messages(
     return unread_messages_objs
 
 
+@users_router.get("/messages/unread/summary", status_code=status.HTTP_200_OK, response_model=GetUnreadSummary)
+async def get_current_user_unread_summary(
+        current_user_id: Annotated[int, Depends(verify_token)]
+):
+    unread_summary_obj = await fetch_user_unread_summary(user_id=current_user_id)
+    return unread_summary_obj
+
+
 @anonymous_users_router.websocket("/ws/messages/unread")
 async def get_current_user_unread_messages_ws(
+        websocket: WebSocket,
+        current_user_id: Annotated[str, Depends(verify_token_ws)],
+        sequence: Annotated[int | None, Query(ge=0)] = None
+):
+    await websocket.accept()
+    if current_user_id is None:
+        await websocket.close(code=1008)
+    elif not (await is_user_exists(user_id=current_user_id)):
+        await websocket.close(code=1008)
+
+    task = asyncio.create_task(unread_messages_listener(current_user_id, websocket, sequence))
+    await task
+
+
+@anonymous_users_router.websocket("/ws/messages/unread/summary")
+async def get_current_user_unread_summary_ws(
         websocket: WebSocket,
         current_user_id: Annotated[str, Depends(verify_token_ws)]
 ):
@@ -150,7 +214,7 @@ async def get_current_user_unread_messages_ws(
     elif not (await is_user_exists(user_id=current_user_id)):
         await websocket.close(code=1008)
 
-    task = asyncio.create_task(unread_messages_listener(current_user_id, websocket))
+    task = asyncio.create_task(unread_summary_listener(current_user_id, websocket))
     await task
 
 
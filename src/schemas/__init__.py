@@ -8,6 +8,8 @@ from .users import (
     Avatar,
     UserOnline,
     UsersIds,
+    UsersAvatars,
+    UsersSearchCursor,
     UserRole
 )
 from .conversations import (
@@ -18,6 +20,7 @@ from .conversations import (
     GetConversationsWithMembers,
     DeleteGroupMembers,
     ConversationsIds,
+    ConversationsAvatars,
     CreateEmptyConversation,
     CreateGroupDB
 )
@@ -27,11 +30,19 @@ from .messages import (
     CreateMediaMessage,
     CreateMediaMessageDB,
     GetMessage,
-    MessagesIds
+    MessagesIds,
+    MessagesMedia,
+    MessagesCursor,
+    FoundMessage,
+    MessagesSearchCursor
 )
 from .unread_messages import (
     GetUnreadMessages,
     FilterUnreadMessages,
-    UnreadMessageExistedDTO,
-    AddUnreadMessagesDB
+    AddUnreadMessagesDB,
+    GetUnreadCounter,
+    GetUnreadSummary
 )
+from .metrics import HubStats, NotificationsListenerStats, StorageStats, ImageProcessingStats, DatabasePoolStats
+from .storage import StoredFile, FileMetadata, ImageInspection
+from .uploads import CreateUploadSession, UploadSession, GetUploadSession
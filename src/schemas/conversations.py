@@ -14,6 +14,10 @@ class ConversationsIds(BaseModel):
         return request_limit(values)
 
 
+class ConversationsAvatars(ConversationsIds):
+    size: Optional[int] = Field(None, gt=0)
+
+
 class CreateEmptyConversation(BaseModel):
     creator_id: int
     type: ConversationTypes
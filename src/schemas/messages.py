@@ -1,8 +1,9 @@
+from fastapi import UploadFile
 from typing import Annotated, Optional
 from pydantic import BaseModel, Field, field_validator
 from datetime import datetime
 
-from utilities import MessagesStatus, MessagesTypes, request_limit
+from utilities import MessagesStatus, MessagesTypes, PaginationDirections, SearchModes, request_limit
 
 
 class MessagesIds(BaseModel):
@@ -13,6 +14,10 @@ class MessagesIds(BaseModel):
         return request_limit(values)
 
 
+class MessagesMedia(MessagesIds):
+    size: Optional[int] = Field(None, gt=0)
+
+
 class CreateTextMessage(BaseModel):
     content: str = Field(max_length=8192)
 
@@ -24,7 +29,7 @@ class CreateTextMessageDB(BaseModel):
 
 
 class CreateMediaMessage(BaseModel):
-    file: bytes
+    file: UploadFile
     file_name: str
     file_type: str
     caption: Annotated[Optional[str], Field(max_length=8192)]
@@ -50,3 +55,20 @@ class GetMessage(BaseModel):
     file_content_type: Optional[str]
     created_at: Optional[datetime]
     updated_at: Optional[datetime]
+
+
+class MessagesCursor(BaseModel):
+    direction: PaginationDirections
+    message_id: int
+    created_at: datetime
+
+
+class FoundMessage(GetMessage):
+    rank: Optional[float] = None
+    snippet: Optional[str] = None
+
+
+class MessagesSearchCursor(BaseModel):
+    mode: SearchModes
+    message_id: int
+    rank: Optional[float] = None
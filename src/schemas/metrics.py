@@ -0,0 +1,79 @@
+from pydantic import BaseModel
+
+
+class HubStats(BaseModel):
+    pid: int
+    sockets: int
+    users: int
+    channels: int
+    queues_depth_total: int
+    queues_depth_max: int
+    queue_size: int
+    delivered_events: int
+    dropped_connections: int
+
+
+class NotificationsListenerStats(BaseModel):
+    pid: int
+    is_leader: bool
+    paused: bool
+    workers: int
+    queues_depth_total: int
+    queues_depth_max: int
+    queue_size: int
+    received_notifications: int
+    handled_notifications: int
+    failed_notifications: int
+    reconnects: int
+    pauses: int
+
+
+class StorageOperationStats(BaseModel):
+    count: int
+    errors: int
+    total_seconds: float
+    avg_seconds: float
+    max_seconds: float
+
+
+class StorageStats(BaseModel):
+    workers: int
+    in_flight: int
+    operations: dict[str, StorageOperationStats]
+
+
+class ImageProcessingStats(BaseModel):
+    workers: int
+    in_flight: int
+    queued: int
+    processed: int
+    corrupted: int
+    rejected: int
+    timeouts: int
+    queue_wait_total_seconds: float
+    queue_wait_avg_seconds: float
+    queue_wait_max_seconds: float
+    decode_total_seconds: float
+    decode_avg_seconds: float
+    decode_max_seconds: float
+
+
+class DatabasePoolStats(BaseModel):
+    pool_size: int
+    checked_out: int
+    checked_in: int
+    overflow: int
+    max_overflow: int
+    checkouts: int
+    checkout_timeouts: int
+    wait_total_seconds: float
+    wait_avg_seconds: float
+    wait_max_seconds: float
+    hold_avg_seconds: float
+    hold_max_seconds: float
+    connects: int
+    disconnects: int
+    invalidations: int
+    connections: int
+    connection_age_avg_seconds: float
+    connection_age_max_seconds: float
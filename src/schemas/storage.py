@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+from utilities import ImageInspectionStatus
+
+
+class StoredFile(BaseModel):
+    size: int
+    sha256: str
+
+
+class FileMetadata(BaseModel):
+    size: int
+    modified_at: datetime
+    etag: str
+
+
+class ImageInspection(BaseModel):
+    status: ImageInspectionStatus
+    width: Optional[int] = None
+    height: Optional[int] = None
+    format: Optional[str] = None
+    metadata_stripped: bool = False
+    decode_seconds: float = 0
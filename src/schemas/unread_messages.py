@@ -15,11 +15,6 @@ class GetUnreadMessages(UnreadMessageBase):
     call_id: Optional[int]
 
 
-class UnreadMessageExistedDTO(UnreadMessageBase):
-    message_id: Annotated[Optional[int], Field(None)]
-    call_id: Annotated[Optional[int], Field(None)]
-
-
 class FilterUnreadMessages(BaseModel):
     user_id: Annotated[Optional[int], Field(None)]
     conversation_id: Annotated[Optional[int], Field(None)]
@@ -41,3 +36,14 @@ class AddUnreadMessagesDB(BaseModel):
     conversation_id: int
     message_id: Annotated[Optional[int], Field(None)]
     call_id: Annotated[Optional[int], Field(None)]
+
+
+class GetUnreadCounter(BaseModel):
+    conversation_id: int
+    unread_count: int
+    last_unread_message_id: Optional[int]
+
+
+class GetUnreadSummary(BaseModel):
+    total_count: int
+    conversations: list[GetUnreadCounter]
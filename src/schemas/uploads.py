@@ -0,0 +1,34 @@
+from typing import Annotated, Optional
+from pydantic import BaseModel, Field
+from datetime import datetime
+
+
+class CreateUploadSession(BaseModel):
+    file_name: str = Field(max_length=255)
+    file_type: str = Field(max_length=255)
+    file_size: int = Field(gt=0)
+    caption: Annotated[Optional[str], Field(max_length=8192)] = None
+    is_voice_message: bool = False
+
+
+class UploadSession(BaseModel):
+    id: str
+    user_id: int
+    conversation_id: int
+    file_name: str
+    file_type: str
+    file_size: int
+    offset: int
+    caption: Optional[str]
+    is_voice_message: bool
+    expires_at: Optional[datetime] = None
+
+
+class GetUploadSession(BaseModel):
+    id: str
+    conversation_id: int
+    file_name: str
+    file_type: str
+    file_size: int
+    offset: int
+    expires_at: datetime
@@ -12,6 +12,16 @@ class UsersIds(BaseModel):
         return request_limit(values)
 
 
+class UsersAvatars(UsersIds):
+    size: Optional[int] = Field(None, gt=0)
+
+
+class UsersSearchCursor(BaseModel):
+    rank: int
+    nickname_length: int
+    user_id: int
+
+
 class CreateUser(BaseModel):
     nickname: Annotated[str, Field(min_length=3, max_length=128)]
     username: Annotated[str, Field(min_length=3, max_length=64)]
@@ -13,8 +13,10 @@ from .users import (
     fetch_user_conversations,
     remove_user_account,
     fetch_user_unread_messages,
+    fetch_user_unread_summary,
     user_last_online_listener,
-    unread_messages_listener
+    unread_messages_listener,
+    unread_summary_listener
 )
 from .conversations import (
     create_private_conversation,
@@ -33,15 +35,37 @@ from .conversations import (
 from .messages import (
     create_text_message,
     create_media_message,
+    insert_media_message_with_file,
     update_user_message,
     fetch_messages,
+    fetch_messages_by_cursor,
+    build_messages_cursor,
     fetch_message_media_metadata,
     fetch_messages_media_paths,
     remove_messages,
     search_conversation_messages,
+    search_user_messages,
     mark_message_delivered,
+    mark_messages_delivered,
     parse_bytes_file_range,
     stream_file,
     fetch_last_message
 )
 from .unread_messages import add_unread_messages
+from .uploads import (
+    create_upload_session,
+    fetch_upload_session,
+    append_upload_data,
+    finalize_upload_session,
+    remove_upload_session,
+    collect_expired_uploads,
+    uploads_garbage_collector
+)
+from .media import (
+    save_media_blob,
+    save_media_blob_data,
+    schedule_thumbnails,
+    select_thumbnail_size,
+    resolve_media_file,
+    resolve_archive_files
+)
@@ -1,22 +1,23 @@
 from pathlib import Path
 
 from validators import (
-    validate_user_in_conversation,
     validate_user_can_manage_conversation,
     validate_user_in_group,
     validate_user_in_groups,
     validate_users_in_same_chat,
-    get_conversations_ids_from_user_obj,
+    validate_users_in_conversation,
+    validate_users_not_in_conversation,
     conversation_is_group,
-    verify_user_is_existed
+    verify_user_is_existed,
+    verify_users_is_existed
 )
+from database import commit_unit_of_work, run_compensation
 from repository import (
-    select_conversation,
+    insert_conversation,
     insert_members_to_conversation,
     select_conversation_by_id,
     update_conversation,
     select_conversations,
-    select_user,
     delete_conversation_avatar,
     select_conversation_member_role,
     delete_conversation_members,
@@ -28,20 +29,19 @@ from repository import (
     update_conversation_member,
     delete_conversation_messages,
     delete_unread_messages,
-    is_group_avatar_uuid_existed
+    delete_members_unread_messages,
+    release_media_blob
 )
-from storage import FileManager
+from cache import membership_cache
+from storage import FileManager, get_file_manager
+from .media import save_media_blob_data, schedule_thumbnails, resolve_media_file, resolve_archive_files
 from utilities import (
-    UserNotFoundError,
     ConversationTypes,
     SameUsersIds,
     ConversationMemberRoles,
     FileNotFound,
-    UserAlreadyInConversation,
     MessagesTypes,
-    sqlalchemy_to_pydantic,
-    MediaPatches,
-    generate_uuid
+    sqlalchemy_to_pydantic
 )
 from schemas import (
     CreateGroup,
@@ -64,17 +64,17 @@ async def create_private_conversation(user_id: int, recipient_id: int) -> GetCon
         creator_id=user_id,
         type=ConversationTypes.PRIVATE,
     )
-    new_conversation_id = await select_conversation(new_conversation_obj)
-    raw_new_conversation = await select_conversation_by_id(conversation_id=new_conversation_id)
+    raw_new_conversation = await insert_conversation(new_conversation_obj)
     new_conversation_obj = await sqlalchemy_to_pydantic(
         sqlalchemy_model=raw_new_conversation,
         pydantic_model=GetConversations
     )
     await insert_members_to_conversation(
         users_ids=[user_id, recipient_id],
-        conversation_id=new_conversation_id,
+        conversation_id=new_conversation_obj.id,
         role=ConversationMemberRoles.MEMBER
     )
+    await membership_cache.invalidate(users_ids=[user_id, recipient_id])
 
     return new_conversation_obj
 
@@ -86,17 +86,17 @@ async def create_group_conversation(user_id: int, group_data: CreateGroup) -> Ge
         **group_data.model_dump()
     )
 
-    new_conversation_id = await select_conversation(new_conversation_obj)
-    raw_new_conversation = await select_conversation_by_id(conversation_id=new_conversation_id)
+    raw_new_conversation = await insert_conversation(new_conversation_obj)
     new_conversation_obj = await sqlalchemy_to_pydantic(
         sqlalchemy_model=raw_new_conversation,
         pydantic_model=GetConversations
     )
     await insert_members_to_conversation(
         users_ids=[user_id],
-        conversation_id=new_conversation_id,
+        conversation_id=new_conversation_obj.id,
         role=ConversationMemberRoles.CREATOR
     )
+    await membership_cache.invalidate(users_ids=[user_id])
 
     return new_conversation_obj
 
@@ -116,83 +116,87 @@ async def add_group_members(user_id: int, group_id: int, users_ids: list[int]) -
     await validate_user_can_manage_conversation(user_id=user_id, conversation_id=group_id)
     await conversation_is_group(conversation_id=group_id)
 
-    members_ids = list()
-    for member_id in users_ids:
-        member_obj = await select_user(user_id=member_id)
-        if member_obj is None:
-            raise UserNotFoundError(user_id=member_id)
-
-        member_conversations_ids = await get_conversations_ids_from_user_obj(member_obj)
-        if group_id in member_conversations_ids:
-            raise UserAlreadyInConversation(
-                user_id=member_id,
-                conversation_id=group_id
-            )
-
-        members_ids.append(member_obj.id)
+    members_ids = list(dict.fromkeys(users_ids))
+    await verify_users_is_existed(users_ids=members_ids)
+    await validate_users_not_in_conversation(users_ids=members_ids, conversation_id=group_id)
 
     await insert_members_to_conversation(
         users_ids=members_ids,
         conversation_id=group_id,
         role=ConversationMemberRoles.MEMBER
     )
+    await membership_cache.invalidate(users_ids=members_ids)
 
 
 async def upload_group_avatar(user_id: int, group_id: int, avatar_data: Avatar) -> None:
-
-    async def save_avatar_to_file():
-        await FileManager().validate_file(
-            file_content=avatar_data.file,
-            file_type=avatar_data.content_type,
-            file_type_filter=MessagesTypes.IMAGE
-        )
-        avatar_save_path = MediaPatches.GROUPS_AVATARS_FOLDER.value / avatar_name
-        await FileManager().write_file(file_path=avatar_save_path, file_data=avatar_data.file)
-
     await validate_user_can_manage_conversation(user_id=user_id, conversation_id=group_id)
     await conversation_is_group(conversation_id=group_id)
+    await commit_unit_of_work()
 
-    avatar_name = generate_uuid()
-    while await is_group_avatar_uuid_existed(avatar_uuid=avatar_name):
-        avatar_name = generate_uuid()
-
-    await save_avatar_to_file()
-    await update_conversation(
-        conversation_id=group_id,
-        conversation_obj=EditConversationDB(
-            avatar_name=avatar_name,
-            avatar_type=avatar_data.content_type
-        )
+    avatar_file = await get_file_manager().validate_file(
+        file_content=avatar_data.file,
+        file_type=avatar_data.content_type,
+        file_type_filter=MessagesTypes.IMAGE
     )
+    avatar_name = await save_media_blob_data(file_data=avatar_file)
+
+    try:
+        await update_conversation(
+            conversation_id=group_id,
+            conversation_obj=EditConversationDB(
+                avatar_name=avatar_name,
+                avatar_type=avatar_data.content_type
+            )
+        )
+    except Exception:
+        await run_compensation(lambda: release_media_blob(digest=avatar_name))
+        raise
 
+    await schedule_thumbnails(digest=avatar_name, file_type=avatar_data.content_type)
 
-async def fetch_group_avatar_metadata(user_id: int, group_id: int, avatar_uuid: str) -> dict[str, any]:
+
+async def fetch_group_avatar_metadata(
+        user_id: int,
+        group_id: int,
+        avatar_uuid: str | None,
+        size: int | None = None
+) -> dict[str, any]:
     await validate_user_in_group(user_id=user_id, group_id=group_id)
 
-    filepath = MediaPatches.GROUPS_AVATARS_FOLDER.value / avatar_uuid
-    if not (await FileManager().file_exists(file_path=filepath)):
+    group_data = await select_conversation_by_id(conversation_id=group_id)
+    if avatar_uuid is None or group_data.avatar_name != avatar_uuid:
+        raise FileNotFound()
+
+    filepath = FileManager.get_blob_path(digest=avatar_uuid)
+    if not (await get_file_manager().file_exists(file_path=filepath)):
         raise FileNotFound()
 
+    filepath, file_type = await resolve_media_file(file_path=filepath, file_type=None, size=size)
     return {
-        "file_path": filepath
+        "file_path": filepath,
+        "file_type": file_type
     }
 
 
-async def fetch_group_avatars_paths(user_id: int, conversations_ids: list[int]) -> list[Path]:
+async def fetch_group_avatars_paths(
+        user_id: int,
+        conversations_ids: list[int],
+        size: int | None = None
+) -> dict[str, Path]:
     await validate_user_in_groups(user_id=user_id, groups_ids=conversations_ids)
 
-    avatars_paths = list()
+    avatars_files = list()
     groups_objects = await select_conversations(conversations_ids=conversations_ids)
     for group_obj in groups_objects:
         if group_obj.avatar_name is None:
             continue
 
-        avatars_paths.append(MediaPatches.GROUPS_AVATARS_FOLDER.value / group_obj.avatar_name)
+        avatars_files.append((group_obj.id, FileManager.get_blob_path(digest=group_obj.avatar_name), group_obj.avatar_type))
 
-    if not avatars_paths:
+    if not avatars_files:
         raise FileNotFound()
 
-    return avatars_paths
+    return await resolve_archive_files(files=avatars_files, size=size)
 
 
 async def remove_group_avatar(user_id: int, group_id: int) -> None:
@@ -200,14 +204,12 @@ async def remove_group_avatar(user_id: int, group_id: int) -> None:
     await conversation_is_group(conversation_id=group_id)
 
     group_data = await select_conversation_by_id(conversation_id=group_id)
-    avatar_path = await fetch_group_avatar_metadata(user_id=user_id, group_id=group_id, avatar_uuid=group_data.avatar_name)
+    await fetch_group_avatar_metadata(user_id=user_id, group_id=group_id, avatar_uuid=group_data.avatar_name)
 
-    await FileManager().delete_file(file_path=avatar_path["file_path"])
     await delete_conversation_avatar(conversation_id=group_id)
 
 
 async def remove_group_members(user_id: int, group_id: int, members_data: list[DeleteGroupMembers]) -> None:
-    members_ids_to_delete_messages = list()
     members_ids = [member.user_id for member in members_data]
 
     if user_id in members_ids:
@@ -215,27 +217,20 @@ async def remove_group_members(user_id: int, group_id: int, members_data: list[D
     await validate_user_can_manage_conversation(user_id=user_id, conversation_id=group_id)
     await conversation_is_group(conversation_id=group_id)
 
-    for member_obj in members_data:
-        await verify_user_is_existed(user_id=member_obj.user_id)
-        await validate_user_in_conversation(user_id=member_obj.user_id, conversation_id=group_id)
-        await delete_unread_messages(
-            filter_conditions=FilterUnreadMessages(
-                user_id=member_obj.user_id,
-                conversation_id=group_id,
-            )
-        )
-
-        if not member_obj.delete_messages:
-            continue
-        members_ids_to_delete_messages.append(member_obj.user_id)
+    await verify_users_is_existed(users_ids=members_ids)
+    await validate_users_in_conversation(users_ids=members_ids, conversation_id=group_id)
+    await delete_members_unread_messages(conversation_id=group_id, users_ids=members_ids)
 
+    members_ids_to_delete_messages = [member.user_id for member in members_data if member.delete_messages]
     await delete_conversation_members(conversation_id=group_id, members_ids=members_ids)
+    await membership_cache.invalidate(users_ids=members_ids)
     await delete_sender_messages(conversation_id=group_id, members_ids=members_ids_to_delete_messages)
 
 
 async def delete_conversation_by_id(user_id: int, conversation_id: int) -> None:
     await validate_user_can_manage_conversation(user_id=user_id, conversation_id=conversation_id)
     await delete_conversation(conversation_id=conversation_id)
+    await membership_cache.invalidate(users_ids=[user_id])
 
 
 async def leave_group(user_id: int, group_id: int, delete_messages: bool = False) -> None:
@@ -252,6 +247,7 @@ async def leave_group(user_id: int, group_id: int, delete_messages: bool = False
     group_members_quantity = await select_conversation_members_quantity(conversation_id=group_id)
     if group_members_quantity == 1:
         await delete_conversation(conversation_id=group_id)
+        await membership_cache.invalidate(users_ids=[user_id])
     else:
         user_group_role = await select_conversation_member_role(user_id=user_id, conversation_id=group_id)
         if user_group_role != ConversationMemberRoles.MEMBER:
@@ -264,6 +260,7 @@ async def leave_group(user_id: int, group_id: int, delete_messages: bool = False
                     member_id=new_admin_user_id,
                     role=ConversationMemberRoles.ADMIN
                 )
+                await membership_cache.invalidate(users_ids=[new_admin_user_id])
 
         await delete_unread_messages(
             filter_conditions=FilterUnreadMessages(
@@ -276,6 +273,7 @@ async def leave_group(user_id: int, group_id: int, delete_messages: bool = False
             await delete_sender_messages(conversation_id=group_id, members_ids=[user_id])
 
         await delete_conversation_members(conversation_id=group_id, members_ids=[user_id])
+        await membership_cache.invalidate(users_ids=[user_id])
 
 
 async def delete_all_messages(user_id: int, conversation_id: int):
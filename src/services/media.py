@@ -0,0 +1,79 @@
+import asyncio
+import hashlib
+import logging
+import mimetypes
+from pathlib import Path
+
+from database import commit_unit_of_work, run_compensation
+from repository import acquire_media_blob, release_media_blob
+from storage import FileManager, StorageUtils, get_file_manager
+from tasks import generate_thumbnails
+from utilities import MediaPatches, generate_uuid, generic_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+async def save_media_blob(staged_file_path: Path, digest: str) -> str:
+    await acquire_media_blob(digest=digest)
+    await commit_unit_of_work()
+    try:
+        await get_file_manager().store_blob(source_path=staged_file_path, digest=digest)
+    except Exception:
+        await run_compensation(lambda: release_media_blob(digest=digest))
+        raise
+
+    return digest
+
+
+async def save_media_blob_data(file_data: bytes) -> str:
+    staged_file_path = MediaPatches.MEDIA_UPLOADS_FOLDER.value / generate_uuid()
+    await get_file_manager().write_file(file_path=staged_file_path, file_data=file_data)
+
+    return await save_media_blob(staged_file_path=staged_file_path, digest=hashlib.sha256(file_data).hexdigest())
+
+
+async def schedule_thumbnails(digest: str, file_type: str | None) -> None:
+    if not StorageUtils.is_thumbnail_supported(file_type=file_type):
+        return None
+
+    try:
+        await asyncio.to_thread(generate_thumbnails.delay, digest)
+    except Exception:
+        logger.exception("Failed to schedule thumbnails for blob %s", digest)
+
+
+def select_thumbnail_size(size: int | None) -> int | None:
+    if size is None:
+        return None
+
+    return min(
+        (thumbnail_size for thumbnail_size in generic_settings.THUMBNAIL_SIZES if thumbnail_size >= size),
+        default=None
+    )
+
+
+async def resolve_media_file(file_path: Path, file_type: str | None, size: int | None) -> tuple[Path, str | None]:
+    thumbnail_size = select_thumbnail_size(size=size)
+    if thumbnail_size is None:
+        return file_path, file_type
+
+    thumbnail_path = FileManager.get_thumbnail_path(digest=file_path.name, size=thumbnail_size)
+    if not await get_file_manager().file_exists(file_path=thumbnail_path):
+        return file_path, file_type
+
+    return thumbnail_path, f"image/{generic_settings.THUMBNAIL_FORMAT}"
+
+
+async def resolve_archive_files(files: list[tuple[int, Path, str | None]], size: int | None) -> dict[str, Path]:
+    archive_files = dict()
+    for entity_id, file_path, file_type in files:
+        resolved_file_path, resolved_file_type = await resolve_media_file(
+            file_path=file_path,
+            file_type=file_type,
+            size=size
+        )
+        extension = mimetypes.guess_extension(resolved_file_type or "") or ""
+        archive_files[f"{entity_id}{extension}"] = resolved_file_path
+
+    return archive_files
@@ -1,5 +1,12 @@
-from fastapi.responses import StreamingResponse
+import re
+import html
+from fastapi import Response, status
+from fastapi.responses import RedirectResponse
+from pydantic import ValidationError
+from datetime import datetime, timezone
+from email.utils import format_datetime
 from pathlib import Path
+from typing import Awaitable, Callable
 
 from validators import (
     validate_user_in_conversation,
@@ -8,28 +15,36 @@ from validators import (
     validate_user_have_access_to_messages,
     validate_user_can_manage_messages
 )
+from database import commit_unit_of_work, run_compensation
 from repository import (
     insert_text_message,
     insert_empty_message,
     insert_media_message,
     update_message,
     select_filtered_messages,
+    select_messages_by_cursor,
     select_message,
     select_messages,
     delete_messages,
     select_message_status,
     update_message_status,
     select_messages_by_content,
-    delete_unread_messages,
-    select_last_message
+    update_messages_read_status,
+    update_messages_delivered_status,
+    select_last_message,
+    release_media_blob
 )
 from schemas import (
     CreateTextMessageDB,
     CreateMediaMessage,
     CreateMediaMessageDB,
-    GetMessage, FilterUnreadMessages
+    GetMessage,
+    MessagesCursor,
+    FoundMessage,
+    MessagesSearchCursor
 )
-from storage import FileManager
+from storage import FileManager, get_file_manager, StorageUtils, MediaFileResponse, AccelRedirectResponse
+from .media import save_media_blob, schedule_thumbnails, resolve_media_file, resolve_archive_files
 from utilities import (
     MessagesStatus,
     MessagesTypes,
@@ -37,7 +52,17 @@ from utilities import (
     sqlalchemy_to_pydantic,
     FileNotFound,
     MediaPatches,
-    MessageNotFound
+    MediaDeliveryModes,
+    MessageNotFound,
+    PaginationDirections,
+    SearchModes,
+    InvalidCursorError,
+    FileRangeError,
+    encode_cursor,
+    decode_cursor,
+    generate_uuid,
+    SnippetMarkers,
+    generic_settings
 )
 
 
@@ -49,12 +74,11 @@ async def create_text_message(sender_id: int, conversation_id: int, content: str
         status=MessagesStatus.SENT,
         type=MessagesTypes.TEXT,
     )
-    new_message_id = await insert_text_message(
+    raw_message = await insert_text_message(
         sender_id=sender_id,
         conversation_id=conversation_id,
         message_data=new_message_obj
     )
-    raw_message = await select_message(message_id=new_message_id)
     new_message_obj = await sqlalchemy_to_pydantic(
         sqlalchemy_model=raw_message,
         pydantic_model=GetMessage
@@ -63,53 +87,58 @@ async def create_text_message(sender_id: int, conversation_id: int, content: str
     return new_message_obj
 
 
-async def create_media_message(sender_id: int, conversation_id: int, content_data: CreateMediaMessage) -> GetMessage:
+async def insert_media_message_with_file(
+        sender_id: int,
+        conversation_id: int,
+        file_type: str,
+        caption: str | None,
+        is_voice_message: bool,
+        save_file: Callable[[MessagesTypes], Awaitable[str]]
+) -> GetMessage:
 
-    async def is_voice_message(_message_type):
+    async def detect_message_type(_message_type):
         if _message_type != MessagesTypes.AUDIO:
             new_message_type = _message_type
-        elif content_data.is_voice_message:
+        elif is_voice_message:
             new_message_type = MessagesTypes.VOICE
         else:
             new_message_type = MessagesTypes.AUDIO
 
         return new_message_type
 
-    async def get_message_type():
-        file_manager = FileManager()
-        _message_type = await file_manager.detect_file_type(file_type=content_data.file_type)
-        await file_manager.validate_file(
-            file_content=content_data.file,
-            file_type=content_data.file_type,
-            file_type_filter=_message_type
-        )
-        _message_type = await is_voice_message(_message_type)
+    async def discard_message(digest: str | None = None):
+        if digest is not None:
+            await release_media_blob(digest=digest)
+        await delete_messages(messages_ids=[message_id])
 
-        return _message_type
-
-    async def save_media_to_file():
-        avatar_save_path = MediaPatches.MEDIA_MESSAGES_FOLDER.value / file_name
-        await FileManager().write_file(file_path=avatar_save_path, file_data=content_data.file)
-
-    await validate_user_in_conversation(user_id=sender_id, conversation_id=conversation_id)
-
-    message_type = await get_message_type()
+    file_type_filter = await get_file_manager().detect_file_type(file_type=file_type)
+    message_type = await detect_message_type(file_type_filter)
     message_id = await insert_empty_message(sender_id=sender_id, conversation_id=conversation_id)
-    file_name = str(message_id)
+    await commit_unit_of_work()
+
+    try:
+        file_digest = await save_file(file_type_filter)
+    except Exception:
+        await run_compensation(discard_message)
+        raise
     new_message_obj = CreateMediaMessageDB(
-        file_content_name=file_name,
-        file_content_type=content_data.file_type,
+        file_content_name=file_digest,
+        file_content_type=file_type,
         status=MessagesStatus.SENT,
         type=message_type,
-        content=content_data.caption
-    )
-
-    await save_media_to_file()
-    await insert_media_message(
-        message_id=message_id,
-        message_data=new_message_obj
+        content=caption
     )
-    raw_message = await select_message(message_id=message_id)
+    try:
+        raw_message = await insert_media_message(
+            message_id=message_id,
+            message_data=new_message_obj
+        )
+        if raw_message is None:
+            raise MessageNotFound(message_id=message_id)
+    except Exception:
+        await run_compensation(lambda: discard_message(digest=file_digest))
+        raise
+    await schedule_thumbnails(digest=file_digest, file_type=file_type)
     new_message_obj = await sqlalchemy_to_pydantic(
         sqlalchemy_model=raw_message,
         pydantic_model=GetMessage
@@ -118,6 +147,33 @@ async def create_media_message(sender_id: int, conversation_id: int, content_dat
     return new_message_obj
 
 
+async def create_media_message(sender_id: int, conversation_id: int, content_data: CreateMediaMessage) -> GetMessage:
+
+    async def save_media_to_blob(file_type_filter: MessagesTypes) -> str:
+        staged_file_path = MediaPatches.MEDIA_UPLOADS_FOLDER.value / generate_uuid()
+        stored_file = await get_file_manager().write_file_stream(
+            file_path=staged_file_path,
+            file_stream=StorageUtils.iterate_upload_file(
+                upload_file=content_data.file,
+                chunk_size=generic_settings.upload_chunk_size_bytes
+            ),
+            file_type=content_data.file_type,
+            file_type_filter=file_type_filter
+        )
+        return await save_media_blob(staged_file_path=staged_file_path, digest=stored_file.sha256)
+
+    await validate_user_in_conversation(user_id=sender_id, conversation_id=conversation_id)
+
+    return await insert_media_message_with_file(
+        sender_id=sender_id,
+        conversation_id=conversation_id,
+        file_type=content_data.file_type,
+        caption=content_data.caption,
+        is_voice_message=content_data.is_voice_message,
+        save_file=save_media_to_blob
+    )
+
+
 async def update_user_message(sender_id: int, message_id: int, content: str):
     await validate_user_is_message_owner(user_id=sender_id, message_id=message_id)
 
@@ -132,15 +188,15 @@ async def mark_message_delivered(message_id: int):
         await update_message_status(message_id=message_id, status=MessagesStatus.DELIVERED)
 
 
-async def mark_message_read(user_id: int, message_id: int):
-    if (await select_message_status(message_id=message_id)) != MessagesStatus.READ:
-        await update_message_status(message_id=message_id, status=MessagesStatus.READ)
-        await delete_unread_messages(
-            filter_conditions=FilterUnreadMessages(
-                user_id=user_id,
-                message_id=message_id
-            )
-        )
+async def mark_messages_delivered(messages_ids: list[int | None]):
+    await update_messages_delivered_status(
+        messages_ids=[message_id for message_id in messages_ids if message_id is not None]
+    )
+
+
+async def mark_messages_read(user_id: int, messages_objs: list[GetMessage]):
+    messages_ids = [messages_obj.id for messages_obj in messages_objs if messages_obj.sender_id != user_id]
+    await update_messages_read_status(user_id=user_id, messages_ids=messages_ids)
 
 
 async def fetch_messages(sender_id: int, conversation_id: int, limit: int, offset: int) -> list[GetMessage]:
@@ -155,14 +211,90 @@ async def fetch_messages(sender_id: int, conversation_id: int, limit: int, offse
         sqlalchemy_models=raw_messages,
         pydantic_model=GetMessage
     )
-    for messages_obj in messages_objs:
-        if messages_obj.sender_id == sender_id:
-            continue
-        await mark_message_read(user_id=sender_id, message_id=messages_obj.id)
+    await mark_messages_read(user_id=sender_id, messages_objs=messages_objs)
 
     return messages_objs
 
 
+async def build_messages_cursor(
+        cursor: str | None = None,
+        before_id: int | None = None,
+        before_created_at: datetime | None = None,
+        after_id: int | None = None,
+        after_created_at: datetime | None = None
+) -> MessagesCursor | None:
+    bounds = {
+        PaginationDirections.BEFORE: (before_id, before_created_at),
+        PaginationDirections.AFTER: (after_id, after_created_at)
+    }
+    requested_bounds = {
+        direction: bound for direction, bound in bounds.items() if any(value is not None for value in bound)
+    }
+
+    if cursor is not None and requested_bounds:
+        raise InvalidCursorError()
+    if len(requested_bounds) > 1:
+        raise InvalidCursorError()
+
+    if cursor is not None:
+        try:
+            return MessagesCursor.model_validate(decode_cursor(cursor))
+        except ValidationError:
+            raise InvalidCursorError()
+
+    if not requested_bounds:
+        return None
+
+    direction, (message_id, created_at) = requested_bounds.popitem()
+    if message_id is None or created_at is None:
+        raise InvalidCursorError()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+
+    return MessagesCursor(
+        direction=direction,
+        message_id=message_id,
+        created_at=created_at
+    )
+
+
+async def fetch_messages_by_cursor(
+        sender_id: int,
+        conversation_id: int,
+        limit: int,
+        messages_cursor: MessagesCursor
+) -> tuple[list[GetMessage], str | None]:
+    await validate_user_in_conversation(user_id=sender_id, conversation_id=conversation_id)
+
+    raw_messages = await select_messages_by_cursor(
+        conversation_id=conversation_id,
+        limit=limit,
+        messages_cursor=messages_cursor
+    )
+    messages_objs = await many_sqlalchemy_to_pydantic(
+        sqlalchemy_models=raw_messages,
+        pydantic_model=GetMessage
+    )
+    await mark_messages_read(user_id=sender_id, messages_objs=messages_objs)
+
+    if messages_cursor.direction == PaginationDirections.BEFORE:
+        if len(messages_objs) < limit:
+            return messages_objs, None
+        boundary_message = messages_objs[-1]
+    else:
+        if not messages_objs:
+            return messages_objs, encode_cursor(messages_cursor.model_dump(mode="json"))
+        boundary_message = messages_objs[0]
+
+    next_cursor = MessagesCursor(
+        direction=messages_cursor.direction,
+        message_id=boundary_message.id,
+        created_at=boundary_message.created_at
+    )
+
+    return messages_objs, encode_cursor(next_cursor.model_dump(mode="json"))
+
+
 async def fetch_last_message(sender_id: int, conversation_id: int) -> GetMessage | None:
     await validate_user_in_conversation(user_id=sender_id, conversation_id=conversation_id)
 
@@ -178,77 +310,232 @@ async def fetch_last_message(sender_id: int, conversation_id: int) -> GetMessage
     return message_obj
 
 
-async def search_conversation_messages(user_id: int, conversations_id: int, search_query: str, limit: int) -> list[GetMessage]:
+async def build_search_cursor(cursor: str | None, mode: SearchModes) -> MessagesSearchCursor | None:
+    if cursor is None:
+        return None
+
+    try:
+        search_cursor = MessagesSearchCursor.model_validate(decode_cursor(cursor))
+    except ValidationError:
+        raise InvalidCursorError()
+    if search_cursor.mode != mode or (mode == SearchModes.WORDS and search_cursor.rank is None):
+        raise InvalidCursorError()
+
+    return search_cursor
+
+
+async def build_substring_snippet(content: str | None, search_query: str) -> str | None:
+    if not content:
+        return None
+
+    match = re.search(re.escape(search_query), content, flags=re.IGNORECASE)
+    if match is None:
+        return None
+
+    context_size = generic_settings.MESSAGES_SEARCH_SNIPPET_WORDS * 4
+    start, end = max(match.start() - context_size, 0), min(match.end() + context_size, len(content))
+    return "".join([
+        "..." if start > 0 else "",
+        html.escape(content[start:match.start()]),
+        f"<mark>{html.escape(match.group())}</mark>",
+        html.escape(content[match.end():end]),
+        "..." if end < len(content) else ""
+    ])
+
+
+async def render_headline_snippet(snippet: str | None) -> str | None:
+    if snippet is None:
+        return None
+
+    return (
+        html.escape(snippet)
+        .replace(SnippetMarkers.START.value, "<mark>")
+        .replace(SnippetMarkers.STOP.value, "</mark>")
+    )
+
+
+async def find_messages(
+        search_query: str,
+        limit: int,
+        mode: SearchModes,
+        cursor: str | None,
+        conversation_id: int | None = None,
+        user_id: int | None = None
+) -> tuple[list[FoundMessage], str | None]:
+    raw_results = await select_messages_by_content(
+        search_query=search_query,
+        limit=limit,
+        mode=mode,
+        conversation_id=conversation_id,
+        user_id=user_id,
+        search_cursor=await build_search_cursor(cursor=cursor, mode=mode)
+    )
+
+    found_messages = list()
+    for raw_message, rank, snippet in raw_results:
+        found_message = await sqlalchemy_to_pydantic(sqlalchemy_model=raw_message, pydantic_model=FoundMessage)
+        found_message.rank = rank
+        found_message.snippet = await render_headline_snippet(snippet=snippet)
+        if mode == SearchModes.SUBSTRING:
+            found_message.snippet = await build_substring_snippet(
+                content=found_message.content,
+                search_query=search_query
+            )
+        found_messages.append(found_message)
+
+    if len(found_messages) < limit:
+        return found_messages, None
+
+    next_cursor = MessagesSearchCursor(mode=mode, message_id=found_messages[-1].id, rank=found_messages[-1].rank)
+    return found_messages, encode_cursor(next_cursor.model_dump(mode="json"))
+
+
+async def search_conversation_messages(
+        user_id: int,
+        conversations_id: int,
+        search_query: str,
+        limit: int,
+        mode: SearchModes = SearchModes.WORDS,
+        cursor: str | None = None
+) -> tuple[list[FoundMessage], str | None]:
     await validate_user_in_conversation(user_id=user_id, conversation_id=conversations_id)
 
-    raw_messages = await select_messages_by_content(
-        conversation_id=conversations_id,
+    found_messages, next_cursor = await find_messages(
         search_query=search_query,
-        limit=limit
+        limit=limit,
+        mode=mode,
+        cursor=cursor,
+        conversation_id=conversations_id
     )
-    messages_objs = await many_sqlalchemy_to_pydantic(
-        sqlalchemy_models=raw_messages,
-        pydantic_model=GetMessage
+    await mark_messages_read(user_id=user_id, messages_objs=found_messages)
+
+    return found_messages, next_cursor
+
+
+async def search_user_messages(
+        user_id: int,
+        search_query: str,
+        limit: int,
+        mode: SearchModes = SearchModes.WORDS,
+        cursor: str | None = None
+) -> tuple[list[FoundMessage], str | None]:
+    return await find_messages(
+        search_query=search_query,
+        limit=limit,
+        mode=mode,
+        cursor=cursor,
+        user_id=user_id
     )
-    for messages_obj in messages_objs:
-        if messages_obj.sender_id == user_id:
-            continue
-        await mark_message_read(user_id=user_id, message_id=messages_obj.id)
 
-    return messages_objs
 
+async def parse_bytes_file_range(bytes_range: str, file_size: int) -> list[tuple[int, int]] | None:
+    unit, _, ranges_specs = bytes_range.partition("=")
+    ranges_specs = ranges_specs.split(",")
+    if unit.strip().lower() != "bytes" or len(ranges_specs) > generic_settings.MAX_BYTE_RANGES:
+        return None
 
-async def parse_bytes_file_range(bytes_range: str, file_size: int) -> tuple[int, int]:
-    byte_range = bytes_range.replace('bytes=', '').split('-')
-    start_byte = round(float(byte_range[0]))
-    end_byte = round(float(byte_range[1])) if byte_range[1] else file_size - 1
+    byte_ranges = list()
+    for range_spec in ranges_specs:
+        matched_range = re.fullmatch(r"\s*(\d*)-(\d*)\s*", range_spec, flags=re.ASCII)
+        if matched_range is None or not any(matched_range.groups()):
+            return None
 
-    return start_byte, end_byte
+        first_byte, last_byte = matched_range.groups()
+        if not first_byte:
+            if int(last_byte) > 0:
+                byte_ranges.append((max(file_size - int(last_byte), 0), file_size - 1))
+            continue
+        if last_byte and int(last_byte) < int(first_byte):
+            return None
+        if int(first_byte) < file_size:
+            byte_ranges.append((int(first_byte), min(int(last_byte), file_size - 1) if last_byte else file_size - 1))
+
+    if not byte_ranges:
+        raise FileRangeError(file_size=file_size)
+
+    merged_ranges = list()
+    for start_byte, end_byte in sorted(byte_ranges):
+        if merged_ranges and start_byte <= merged_ranges[-1][1] + 1:
+            merged_ranges[-1] = (merged_ranges[-1][0], max(merged_ranges[-1][1], end_byte))
+        else:
+            merged_ranges.append((start_byte, end_byte))
+
+    return merged_ranges
 
 
 async def stream_file(
         file_path: Path,
-        file_type: str,
-        file_size: int | None = None,
-        start_byte: int | None = None,
-        end_byte: int | None = None
-) -> StreamingResponse:
-    file_manager = FileManager()
-
-    if start_byte and end_byte:
-        headers = {"Content-Range": f"bytes {start_byte}-{end_byte}/{file_size}", "Accept-Ranges": "bytes"}
-        file_generator_obj = await file_manager.range_file_chunk_generator(
-            file_path=file_path,
-            start_byte=start_byte,
-            end_byte=end_byte
-        )
-        return StreamingResponse(file_generator_obj,
-                                 headers=headers,
-                                 media_type=file_type,
-                                 status_code=206)
-    else:
-        file_generator_obj = await file_manager.file_chunk_generator(file_paths=[file_path])
-        return StreamingResponse(file_generator_obj, media_type=file_type)
+        file_type: str | None = None,
+        bytes_range: str | None = None,
+        if_range: str | None = None,
+        if_none_match: str | None = None
+) -> Response:
+    file_manager = get_file_manager()
+    if generic_settings.MEDIA_DELIVERY_MODE == MediaDeliveryModes.PRESIGNED.value:
+        presigned_url = await file_manager.get_presigned_url(file_path=file_path, media_type=file_type)
+        if presigned_url is not None:
+            return RedirectResponse(url=presigned_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+
+    if (
+            generic_settings.MEDIA_DELIVERY_MODE == MediaDeliveryModes.X_ACCEL.value
+            and not file_manager.is_remote_file(file_path)
+    ):
+        return AccelRedirectResponse(file_path=file_path, media_type=file_type)
+
+    file_metadata = await file_manager.fetch_file_metadata(file_path=file_path)
+    last_modified = format_datetime(file_metadata.modified_at, usegmt=True)
+
+    if if_none_match is not None:
+        entity_tags = [entity_tag.strip().removeprefix("W/") for entity_tag in if_none_match.split(",")]
+        if "*" in entity_tags or file_metadata.etag in entity_tags:
+            return Response(
+                status_code=status.HTTP_304_NOT_MODIFIED,
+                headers={"ETag": file_metadata.etag, "Last-Modified": last_modified}
+            )
 
+    byte_ranges = None
+    if bytes_range and if_range in (None, file_metadata.etag, last_modified):
+        byte_ranges = await parse_bytes_file_range(bytes_range=bytes_range, file_size=file_metadata.size)
 
-async def fetch_message_media_metadata(sender_id: int, message_id: int) -> dict[str, any]:
+    return MediaFileResponse(
+        file_path=file_path,
+        media_type=file_type,
+        file_metadata=file_metadata,
+        ranges=byte_ranges,
+        file_manager=file_manager
+    )
+
+
+async def fetch_message_media_metadata(sender_id: int, message_id: int, size: int | None = None) -> dict[str, any]:
     await validate_user_have_access_to_message(user_id=sender_id, message_id=message_id)
 
     message_obj = await select_message(message_id=message_id)
-    filepath = MediaPatches.MEDIA_MESSAGES_FOLDER.value / f"{message_obj.file_content_name}"
-    if not (await FileManager().file_exists(file_path=filepath)):
+    if message_obj.file_content_name is None:
         raise FileNotFound()
 
+    filepath = FileManager.get_blob_path(digest=message_obj.file_content_name)
+    if not (await get_file_manager().file_exists(file_path=filepath)):
+        raise FileNotFound()
+
+    filepath, file_type = await resolve_media_file(
+        file_path=filepath,
+        file_type=message_obj.file_content_type,
+        size=size
+    )
     return {
         "file_path": filepath,
-        "file_type": message_obj.file_content_type
+        "file_type": file_type
     }
 
 
-async def fetch_messages_media_paths(sender_id: int, messages_ids: list[int]) -> list[Path]:
+async def fetch_messages_media_paths(
+        sender_id: int,
+        messages_ids: list[int],
+        size: int | None = None
+) -> dict[str, Path]:
     await validate_user_have_access_to_messages(user_id=sender_id, messages_ids=messages_ids)
 
-    messages_paths = list()
+    messages_files = list()
     raw_messages = await select_messages(
         messages_ids=messages_ids
     )
@@ -260,12 +547,16 @@ async def fetch_messages_media_paths(sender_id: int, messages_ids: list[int]) ->
         if message_obj.file_content_name is None:
             continue
 
-        messages_paths.append(MediaPatches.MEDIA_MESSAGES_FOLDER.value / message_obj.file_content_name)
+        messages_files.append((
+            message_obj.id,
+            FileManager.get_blob_path(digest=message_obj.file_content_name),
+            message_obj.file_content_type
+        ))
 
-    if not messages_paths:
+    if not messages_files:
         raise FileNotFound()
 
-    return messages_paths
+    return await resolve_archive_files(files=messages_files, size=size)
 
 
 async def remove_messages(user_id: int, messages_ids: list[int]):
@@ -0,0 +1,174 @@
+import time
+import asyncio
+import logging
+from pathlib import Path
+from typing import AsyncIterator
+
+from database import commit_unit_of_work
+from validators import validate_user_in_conversation
+from cache import upload_sessions_store
+from schemas import CreateUploadSession, UploadSession, GetUploadSession, GetMessage
+from storage import get_file_manager
+from utilities import (
+    MediaPatches,
+    MessagesTypes,
+    UploadSessionNotFound,
+    UploadOffsetMismatch,
+    UploadIncomplete,
+    generate_uuid,
+    generic_settings
+)
+from .messages import insert_media_message_with_file
+from .media import save_media_blob
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_upload_file_path(upload_id: str) -> Path:
+    return MediaPatches.MEDIA_UPLOADS_FOLDER.value / upload_id
+
+
+async def fetch_upload_session(user_id: int, conversation_id: int, upload_id: str) -> UploadSession:
+    upload_session = await upload_sessions_store.get(upload_id=upload_id)
+    if upload_session is None or upload_session.user_id != user_id or upload_session.conversation_id != conversation_id:
+        raise UploadSessionNotFound(upload_id=upload_id)
+
+    return upload_session
+
+
+async def create_upload_session(
+        user_id: int,
+        conversation_id: int,
+        session_data: CreateUploadSession
+) -> GetUploadSession:
+    await validate_user_in_conversation(user_id=user_id, conversation_id=conversation_id)
+    await get_file_manager().validate_file_length(file_size=session_data.file_size, file_type=session_data.file_type)
+
+    upload_session = UploadSession(
+        id=generate_uuid(),
+        user_id=user_id,
+        conversation_id=conversation_id,
+        offset=0,
+        **session_data.model_dump()
+    )
+    upload_session = await upload_sessions_store.save(upload_session=upload_session)
+    await get_file_manager().create_empty_file(file_path=get_upload_file_path(upload_session.id))
+
+    return GetUploadSession(**upload_session.model_dump())
+
+
+async def append_upload_data(
+        user_id: int,
+        conversation_id: int,
+        upload_id: str,
+        offset: int,
+        data_stream: AsyncIterator[bytes]
+) -> GetUploadSession:
+    await fetch_upload_session(user_id=user_id, conversation_id=conversation_id, upload_id=upload_id)
+
+    async with upload_sessions_store.locked(upload_id=upload_id) as lock_lost:
+        upload_session = await fetch_upload_session(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            upload_id=upload_id
+        )
+        if offset != upload_session.offset:
+            raise UploadOffsetMismatch(offset=upload_session.offset)
+
+        await commit_unit_of_work()
+        upload_file_path = get_upload_file_path(upload_id)
+        try:
+            await get_file_manager().append_file_stream(
+                file_path=upload_file_path,
+                offset=offset,
+                file_stream=upload_sessions_store.guard_stream(data_stream=data_stream, lock_lost=lock_lost),
+                max_file_size=upload_session.file_size
+            )
+        finally:
+            if not lock_lost.is_set():
+                upload_session.offset = await get_file_manager().check_file_size(file_path=upload_file_path)
+                upload_session = await upload_sessions_store.save(upload_session=upload_session)
+
+    return GetUploadSession(**upload_session.model_dump())
+
+
+async def finalize_upload_session(user_id: int, conversation_id: int, upload_id: str) -> GetMessage:
+
+    async def move_upload_to_blob(file_type_filter: MessagesTypes) -> str:
+        upload_file_path = get_upload_file_path(upload_id)
+        stored_file = await get_file_manager().validate_stored_file(
+            file_path=upload_file_path,
+            file_type=upload_session.file_type,
+            file_type_filter=file_type_filter
+        )
+        return await save_media_blob(staged_file_path=upload_file_path, digest=stored_file.sha256)
+
+    await fetch_upload_session(user_id=user_id, conversation_id=conversation_id, upload_id=upload_id)
+
+    async with upload_sessions_store.locked(upload_id=upload_id):
+        upload_session = await fetch_upload_session(
+            user_id=user_id,
+            conversation_id=conversation_id,
+            upload_id=upload_id
+        )
+        if upload_session.offset != upload_session.file_size:
+            raise UploadIncomplete(offset=upload_session.offset, file_size=upload_session.file_size)
+
+        await validate_user_in_conversation(user_id=user_id, conversation_id=conversation_id)
+        new_message_obj = await insert_media_message_with_file(
+            sender_id=user_id,
+            conversation_id=conversation_id,
+            file_type=upload_session.file_type,
+            caption=upload_session.caption,
+            is_voice_message=upload_session.is_voice_message,
+            save_file=move_upload_to_blob
+        )
+        await upload_sessions_store.delete(upload_id=upload_id)
+
+    return new_message_obj
+
+
+async def remove_upload_session(user_id: int, conversation_id: int, upload_id: str) -> None:
+    await fetch_upload_session(user_id=user_id, conversation_id=conversation_id, upload_id=upload_id)
+
+    async with upload_sessions_store.locked(upload_id=upload_id):
+        await upload_sessions_store.delete(upload_id=upload_id)
+        upload_file_path = get_upload_file_path(upload_id)
+        if await get_file_manager().file_exists(file_path=upload_file_path):
+            await get_file_manager().delete_file(file_path=upload_file_path)
+
+
+async def collect_expired_uploads() -> int:
+    expired_before = time.time() - generic_settings.UPLOAD_SESSION_TTL
+    uploads_files = {
+        file_path.name: file_path
+        for file_path, modified_at in await get_file_manager().list_files(folder=MediaPatches.MEDIA_UPLOADS_FOLDER.value)
+        if modified_at < expired_before
+    }
+    if not uploads_files:
+        return 0
+
+    existing_uploads_ids = await upload_sessions_store.select_existing(uploads_ids=list(uploads_files))
+    collected_files = 0
+    for upload_id, file_path in uploads_files.items():
+        if upload_id in existing_uploads_ids:
+            continue
+        try:
+            await get_file_manager().delete_file(file_path=file_path)
+            collected_files += 1
+        except FileNotFoundError:
+            pass
+
+    return collected_files
+
+
+async def uploads_garbage_collector() -> None:
+    while True:
+        try:
+            collected_files = await collect_expired_uploads()
+            if collected_files:
+                logger.info("Collected %s expired upload files", collected_files)
+        except Exception:
+            logger.exception("Failed to collect expired upload files")
+        await asyncio.sleep(generic_settings.UPLOAD_SESSIONS_GC_INTERVAL)
@@ -1,8 +1,11 @@
 import json
 from pathlib import Path
 from fastapi import WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
 
-from dependencies import redis_client
+from dependencies import connection_hub
+from cache import membership_cache, unread_events_log
+from database import commit_unit_of_work, run_compensation
 from repository import (
     update_user,
     select_users_by_nickname,
@@ -12,9 +15,11 @@ from repository import (
     select_users,
     delete_conversation,
     delete_user,
-    is_user_exists,
     select_conversation_member_role,
-    is_user_avatar_uuid_existed
+    is_user_avatar_uuid_existed,
+    select_unread_counters,
+    select_unread_messages,
+    release_media_blob
 )
 from validators import verify_user_is_existed, verify_users_is_existed
 from schemas import (
@@ -27,11 +32,16 @@ from schemas import (
     GetConversations,
     GetConversationsWithMembers,
     GetUnreadMessages,
+    FilterUnreadMessages,
+    GetUnreadCounter,
+    GetUnreadSummary,
+    UsersSearchCursor,
     UserRole
 )
-from .messages import mark_message_delivered
+from .messages import mark_message_delivered, mark_messages_delivered
 from .conversations import leave_group
-from storage import FileManager
+from .media import save_media_blob_data, schedule_thumbnails, resolve_media_file, resolve_archive_files
+from storage import FileManager, get_file_manager
 from utilities import (
     sqlalchemy_to_pydantic,
     many_sqlalchemy_to_pydantic,
@@ -39,8 +49,10 @@ from utilities import (
     FileNotFound,
     MessagesTypes,
     ConversationTypes,
-    MediaPatches,
-    generate_uuid
+    WebsocketConnectionClosed,
+    InvalidCursorError,
+    encode_cursor,
+    decode_cursor
 )
 
 
@@ -76,14 +88,37 @@ async def fetch_private_users(users_ids: list[int]) -> list[PrivateUser]:
     return users_objs
 
 
-async def search_users_by_nickname(search_query: str, limit: int | None) -> list[PublicUser]:
-    raw_users = await select_users_by_nickname(search_query=search_query, limit=limit)
+async def build_users_search_cursor(cursor: str | None) -> UsersSearchCursor | None:
+    if cursor is None:
+        return None
+
+    try:
+        return UsersSearchCursor.model_validate(decode_cursor(cursor))
+    except ValidationError:
+        raise InvalidCursorError()
+
+
+async def search_users_by_nickname(
+        search_query: str,
+        limit: int,
+        cursor: str | None = None
+) -> tuple[list[PublicUser], str | None]:
+    raw_users = await select_users_by_nickname(
+        search_query=search_query,
+        limit=limit,
+        search_cursor=await build_users_search_cursor(cursor=cursor)
+    )
     users_objs = await many_sqlalchemy_to_pydantic(
-        sqlalchemy_models=raw_users,
+        sqlalchemy_models=[raw_user for raw_user, _ in raw_users],
         pydantic_model=PublicUser
     )
 
-    return users_objs
+    if len(raw_users) < limit:
+        return users_objs, None
+
+    last_user, rank = raw_users[-1]
+    next_cursor = UsersSearchCursor(rank=rank, nickname_length=len(last_user.nickname), user_id=last_user.id)
+    return users_objs, encode_cursor(next_cursor.model_dump(mode="json"))
 
 
 async def fetch_user_conversations(user_id: int) -> list[GetConversationsWithMembers]:
@@ -136,42 +171,46 @@ async def update_user_profile(user_id: int, profile_data: UpdateUser) -> None:
 
 
 async def upload_user_avatar(user_id: int, avatar_data: Avatar) -> None:
+    await commit_unit_of_work()
+    avatar_file = await get_file_manager().validate_file(
+        file_content=avatar_data.file,
+        file_type=avatar_data.content_type,
+        file_type_filter=MessagesTypes.IMAGE
+    )
+    avatar_name = await save_media_blob_data(file_data=avatar_file)
 
-    async def save_avatar_to_file():
-        await FileManager().validate_file(
-            file_content=avatar_data.file,
-            file_type=avatar_data.content_type,
-            file_type_filter=MessagesTypes.IMAGE
-        )
-        avatar_save_path = MediaPatches.USERS_AVATARS_FOLDER.value / avatar_name
-        await FileManager().write_file(file_path=avatar_save_path, file_data=avatar_data.file)
-
-    avatar_name = generate_uuid()
-    while await is_user_avatar_uuid_existed(avatar_uuid=avatar_name):
-        avatar_name = generate_uuid()
-
-    await save_avatar_to_file()
-    await update_user(
-        user_id=user_id,
-        user_data=UpdateUserDB(
-            avatar_name=avatar_name,
-            avatar_type=avatar_data.content_type
+    try:
+        await update_user(
+            user_id=user_id,
+            user_data=UpdateUserDB(
+                avatar_name=avatar_name,
+                avatar_type=avatar_data.content_type
+            )
         )
-    )
+    except Exception:
+        await run_compensation(lambda: release_media_blob(digest=avatar_name))
+        raise
 
+    await schedule_thumbnails(digest=avatar_name, file_type=avatar_data.content_type)
 
-async def fetch_user_avatar_metadata(avatar_uuid: str) -> dict[str, any]:
-    filepath = MediaPatches.USERS_AVATARS_FOLDER.value / avatar_uuid
-    if not await FileManager().file_exists(file_path=filepath):
+
+async def fetch_user_avatar_metadata(avatar_uuid: str | None, size: int | None = None) -> dict[str, any]:
+    if avatar_uuid is None or not await is_user_avatar_uuid_existed(avatar_uuid=avatar_uuid):
+        raise FileNotFound()
+
+    filepath = FileManager.get_blob_path(digest=avatar_uuid)
+    if not await get_file_manager().file_exists(file_path=filepath):
         raise FileNotFound()
 
+    filepath, file_type = await resolve_media_file(file_path=filepath, file_type=None, size=size)
     return {
-        "file_path": filepath
+        "file_path": filepath,
+        "file_type": file_type
     }
 
 
-async def fetch_users_avatars_paths(users_ids: list[int]) -> list[Path]:
-    avatars_paths = list()
+async def fetch_users_avatars_paths(users_ids: list[int], size: int | None = None) -> dict[str, Path]:
+    avatars_files = list()
     await verify_users_is_existed(users_ids=users_ids)
 
     users_objects = await fetch_private_users(users_ids=users_ids)
@@ -179,31 +218,41 @@ async def fetch_users_avatars_paths(users_ids: list[int]) -> list[Path]:
         if user_obj.avatar_name is None:
             continue
 
-        avatars_paths.append(MediaPatches.USERS_AVATARS_FOLDER.value / user_obj.avatar_name)
+        avatars_files.append((user_obj.id, FileManager.get_blob_path(digest=user_obj.avatar_name), user_obj.avatar_type))
 
-    if not avatars_paths:
+    if not avatars_files:
         raise FileNotFound()
 
-    return avatars_paths
+    return await resolve_archive_files(files=avatars_files, size=size)
 
 
 async def fetch_user_unread_messages(user_id: int) -> list[GetUnreadMessages]:
-    raw_user_data = await select_user(user_id=user_id)
     unread_messages_objs = await many_sqlalchemy_to_pydantic(
-        sqlalchemy_models=raw_user_data.unread_messages,
+        sqlalchemy_models=await select_unread_messages(filter_conditions=FilterUnreadMessages(user_id=user_id)),
         pydantic_model=GetUnreadMessages
     )
-    for unread_message_obj in unread_messages_objs:
-        await mark_message_delivered(message_id=unread_message_obj.message_id)
+    await mark_messages_delivered(
+        messages_ids=[unread_message_obj.message_id for unread_message_obj in unread_messages_objs]
+    )
     return unread_messages_objs
 
 
+async def fetch_user_unread_summary(user_id: int) -> GetUnreadSummary:
+    unread_counters_objs = await many_sqlalchemy_to_pydantic(
+        sqlalchemy_models=await select_unread_counters(user_id=user_id),
+        pydantic_model=GetUnreadCounter
+    )
+    return GetUnreadSummary(
+        total_count=sum(unread_counter.unread_count for unread_counter in unread_counters_objs),
+        conversations=unread_counters_objs
+    )
+
+
 async def remove_user_avatar(user_id: int) -> None:
     user_data = await fetch_private_user(user_id=user_id)
-    metadata = await fetch_user_avatar_metadata(avatar_uuid=user_data.avatar_name)
+    await fetch_user_avatar_metadata(avatar_uuid=user_data.avatar_name)
 
     await delete_user_avatar(user_id=user_id)
-    await FileManager().delete_file(file_path=metadata["file_path"])
 
 
 async def fetch_user_recipients_last_online(user_id: int) -> list[int]:
@@ -242,48 +291,97 @@ async def remove_user_account(user_id: int) -> None:
             await leave_group(user_id=user_id, group_id=conversation_obj.id, delete_messages=True)
 
     await delete_user(user_id=user_id)
-
-
-async def unread_messages_listener(current_user_id: int, websocket: WebSocket) -> None:
-    async def send_user_unread_messages():
-        result = list()
-        for unread_message_obj in unread_messages_objs:
-            result.append(
-                {
-                    **unread_message_obj.model_dump()
+    await membership_cache.invalidate(users_ids=[user_id])
+
+
+async def unread_messages_listener(current_user_id: int, websocket: WebSocket, sequence: int | None = None) -> None:
+    async def send_unread_messages_snapshot() -> int:
+        snapshot_sequence = await unread_events_log.current_sequence(user_id=current_user_id)
+        unread_messages_objs = await fetch_user_unread_messages(user_id=current_user_id)
+        await websocket.send_json(
+            {
+                "type": "snapshot",
+                "sequence": snapshot_sequence,
+                "unread_messages": [unread_message_obj.model_dump() for unread_message_obj in unread_messages_objs]
+            }
+        )
+        return snapshot_sequence
+
+    async def send_unread_messages_event(event_sequence: int, event: dict) -> None:
+        await websocket.send_json(
+            {
+                "type": event["op"],
+                "sequence": event_sequence,
+                "unread_message": {
+                    "id": event["id"],
+                    "user_id": current_user_id,
+                    "conversation_id": event["conversation_id"],
+                    "message_id": event["message_id"],
+                    "call_id": event["call_id"]
                 }
-            )
-        for unread_message_obj in unread_messages_objs:
-            await mark_message_delivered(message_id=unread_message_obj.message_id)
-        await websocket.send_json(result)
+            }
+        )
+        if event["op"] == "added" and event["message_id"] is not None:
+            await mark_message_delivered(message_id=event["message_id"])
 
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe("user:unread_messages_events")
+    connection = await connection_hub.register(
+        user_id=current_user_id,
+        channels=[f"user:{current_user_id}:unread_messages_events"]
+    )
 
-    unread_messages_objs = await fetch_user_unread_messages(user_id=current_user_id)
-    await send_user_unread_messages()
+    missed_events = None
+    if sequence is not None:
+        missed_events = await unread_events_log.fetch_since(user_id=current_user_id, sequence=sequence)
 
     try:
-        async for message in pubsub.listen():
-            if message["type"] != "message":
+        if missed_events is None:
+            last_sequence = await send_unread_messages_snapshot()
+        else:
+            last_sequence = sequence
+            for missed_event in missed_events:
+                await send_unread_messages_event(event_sequence=missed_event["sequence"], event=missed_event["event"])
+                last_sequence = missed_event["sequence"]
+
+        while True:
+            _, data = await connection.receive()
+            payload = json.loads(data)
+            if payload["sequence"] <= last_sequence:
                 continue
 
-            payload = message["data"].decode()
-            event_id = int(payload)
-            if event_id != current_user_id:
+            if payload["sequence"] != last_sequence + 1:
+                last_sequence = await send_unread_messages_snapshot()
                 continue
 
-            if not (await is_user_exists(user_id=current_user_id)):
-                await websocket.close(code=1008)
-                break
+            await send_unread_messages_event(event_sequence=payload["sequence"], event=payload["event"])
+            last_sequence = payload["sequence"]
+    except WebsocketConnectionClosed as exc:
+        await websocket.close(code=exc.code, reason=exc.reason)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        await connection_hub.unregister(connection=connection)
+
 
-            unread_messages_objs = await fetch_user_unread_messages(user_id=current_user_id)
+async def unread_summary_listener(current_user_id: int, websocket: WebSocket) -> None:
+    connection = await connection_hub.register(
+        user_id=current_user_id,
+        channels=[f"user:{current_user_id}:unread_messages_events"]
+    )
 
-            await send_user_unread_messages()
+    try:
+        unread_summary_obj = await fetch_user_unread_summary(user_id=current_user_id)
+        await websocket.send_json(unread_summary_obj.model_dump())
+
+        while True:
+            await connection.receive()
+            unread_summary_obj = await fetch_user_unread_summary(user_id=current_user_id)
+            await websocket.send_json(unread_summary_obj.model_dump())
+    except WebsocketConnectionClosed as exc:
+        await websocket.close(code=exc.code, reason=exc.reason)
     except WebSocketDisconnect:
         pass
     finally:
-        await pubsub.unsubscribe("user:unread_messages")
+        await connection_hub.unregister(connection=connection)
 
 
 async def user_last_online_listener(current_user_id: int, websocket: WebSocket) -> None:
@@ -304,70 +402,67 @@ async def user_last_online_listener(current_user_id: int, websocket: WebSocket)
 
         await websocket.send_json(result)
 
-    pubsub = redis_client.pubsub()
-    await pubsub.subscribe("user:last_online_events", "user:recipients_change_events")
+    def get_channels() -> set[str]:
+        return {
+            f"user:{current_user_id}:recipients_change_events",
+            *[f"conversation:{conversation_id}:recipients_change_events" for conversation_id in user_conversations_ids],
+            *[f"user:{recipient_id}:last_online_events" for recipient_id in user_recipients_ids]
+        }
 
     user_conversations_ids = await fetch_user_conversations_ids(user_id=current_user_id)
     user_recipients_ids = await fetch_user_recipients_last_online(user_id=current_user_id)
-    recipients_last_online_objs = await fetch_users_online_status(users_ids=user_recipients_ids)
-    await send_recipients_last_online()
+
+    channels = get_channels()
+    connection = await connection_hub.register(user_id=current_user_id, channels=channels)
 
     try:
-        async for message in pubsub.listen():
-            if message["type"] != "message":
-                continue
-            channel = message["channel"].decode()
-            payload = message["data"].decode()
-
-            match channel:
-                case "user:recipients_change_events":
-                    event_data = json.loads(payload)
-                    event_user_id = int(event_data.get("user_id"))
-                    event_conversation_id = int(event_data.get("conversation_id"))
-                    if event_conversation_id not in user_conversations_ids and event_user_id != current_user_id:
-                        continue
-
-                    if not (await is_user_exists(user_id=current_user_id)):
-                        await websocket.close(code=1008)
-                        break
-
-                    temp_user_conversations_ids = await fetch_user_conversations_ids(user_id=current_user_id)
-                    temp_user_recipients_ids = await fetch_user_recipients_last_online(user_id=current_user_id)
-                    new_recipients_ids = list(set(temp_user_recipients_ids)-set(user_recipients_ids))
-                    deleted_recipients_ids = list(set(user_recipients_ids)-set(temp_user_recipients_ids))
-                    if new_recipients_ids:
-                        recipients_last_online_objs.extend(
-                            await fetch_users_online_status(users_ids=new_recipients_ids)
-                        )
-                    if deleted_recipients_ids:
-                        for recipient_last_online_obj in recipients_last_online_objs:
-                            if recipient_last_online_obj.user_id not in deleted_recipients_ids:
-                                continue
-                            recipients_last_online_objs.remove(recipient_last_online_obj)
-
-                    user_conversations_ids = temp_user_conversations_ids.copy()
-                    user_recipients_ids = temp_user_recipients_ids.copy()
-                    await send_recipients_last_online()
-
-                case "user:last_online_events":
-                    event_user_id = int(payload)
-                    if event_user_id not in user_recipients_ids:
-                        continue
-
-                    if not (await is_user_exists(user_id=current_user_id)):
-                        await websocket.close(code=1008)
-                        break
-
-                    for recipient_last_online_obj in recipients_last_online_objs:
-                        if recipient_last_online_obj.user_id != event_user_id:
-                            continue
-                        recipients_last_online_objs.remove(recipient_last_online_obj)
-                        recipients_last_online_objs.extend(
-                            await fetch_users_online_status(users_ids=[event_user_id])
-                        )
-
-                    await send_recipients_last_online()
+        recipients_last_online_objs = await fetch_users_online_status(users_ids=user_recipients_ids)
+        await send_recipients_last_online()
+
+        while True:
+            channel, data = await connection.receive()
+            payload = data.decode()
+
+            if channel.endswith(":recipients_change_events"):
+                temp_user_conversations_ids = await fetch_user_conversations_ids(user_id=current_user_id)
+                temp_user_recipients_ids = await fetch_user_recipients_last_online(user_id=current_user_id)
+                new_recipients_ids = list(set(temp_user_recipients_ids)-set(user_recipients_ids))
+                deleted_recipients_ids = list(set(user_recipients_ids)-set(temp_user_recipients_ids))
+                if new_recipients_ids:
+                    recipients_last_online_objs.extend(
+                        await fetch_users_online_status(users_ids=new_recipients_ids)
+                    )
+                if deleted_recipients_ids:
+                    recipients_last_online_objs = [
+                        recipient_last_online_obj for recipient_last_online_obj in recipients_last_online_objs
+                        if recipient_last_online_obj.user_id not in deleted_recipients_ids
+                    ]
+
+                user_conversations_ids = temp_user_conversations_ids.copy()
+                user_recipients_ids = temp_user_recipients_ids.copy()
+                new_channels = get_channels()
+                await connection_hub.subscribe(connection=connection, channels=new_channels - channels)
+                await connection_hub.unsubscribe(connection=connection, channels=channels - new_channels)
+                channels = new_channels
+                await send_recipients_last_online()
+
+            elif channel.endswith(":last_online_events"):
+                event_user_id = int(payload)
+                if event_user_id not in user_recipients_ids:
+                    continue
+
+                recipients_last_online_objs = [
+                    recipient_last_online_obj for recipient_last_online_obj in recipients_last_online_objs
+                    if recipient_last_online_obj.user_id != event_user_id
+                ]
+                recipients_last_online_objs.extend(
+                    await fetch_users_online_status(users_ids=[event_user_id])
+                )
+
+                await send_recipients_last_online()
+    except WebsocketConnectionClosed as exc:
+        await websocket.close(code=exc.code, reason=exc.reason)
     except WebSocketDisconnect:
         pass
     finally:
-        await pubsub.unsubscribe("user:last_online_events", "user:recipients_change_events")
+        await connection_hub.unregister(connection=connection)
@@ -1 +1,8 @@
 from .local import FileManager
+from .executor import FileIOExecutor, file_io_executor
+from .utils import StorageUtils
+from .images import ImageProcessor, image_processor
+from .responses import MediaFileResponse, AccelRedirectResponse
+from .s3_client import S3Client, S3Signer, s3_client
+from .s3 import S3Storage
+from .backends import get_file_manager
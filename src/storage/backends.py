@@ -0,0 +1,11 @@
+from utilities import StorageBackends, generic_settings
+from .local import FileManager
+from .s3 import S3Storage
+from .s3_client import s3_client
+
+
+def get_file_manager() -> FileManager:
+    if generic_settings.STORAGE_BACKEND == StorageBackends.S3.value:
+        return S3Storage(client=s3_client, multipart_chunk_size=generic_settings.s3_multipart_chunk_size_bytes)
+
+    return FileManager()
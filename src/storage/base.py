@@ -1,12 +1,27 @@
 from abc import ABC, abstractmethod
-from io import BytesIO
 from pathlib import Path
+from typing import AsyncIterator
 
 from utilities import MessagesTypes
+from schemas import StoredFile, FileMetadata
 
 
 class BaseStorage(ABC):
 
+    @staticmethod
+    @abstractmethod
+    def get_blob_path(digest: str) -> Path:
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def get_thumbnail_path(digest: str, size: int) -> Path:
+        pass
+
+    @abstractmethod
+    def is_remote_file(self, file_path: Path) -> bool:
+        pass
+
     @abstractmethod
     async def file_exists(self, file_path: Path) -> bool:
         pass
@@ -15,6 +30,51 @@ class BaseStorage(ABC):
     async def write_file(self, file_path: Path, file_data: bytes) -> None:
         pass
 
+    @abstractmethod
+    async def write_file_stream(
+            self,
+            file_path: Path,
+            file_stream: AsyncIterator[bytes],
+            file_type: str,
+            file_type_filter
+    ) -> StoredFile:
+        pass
+
+    @abstractmethod
+    async def create_empty_file(self, file_path: Path) -> None:
+        pass
+
+    @abstractmethod
+    async def append_file_stream(
+            self,
+            file_path: Path,
+            offset: int,
+            file_stream: AsyncIterator[bytes],
+            max_file_size: int
+    ) -> int:
+        pass
+
+    @abstractmethod
+    async def validate_stored_file(
+            self,
+            file_path: Path,
+            file_type: str,
+            file_type_filter
+    ) -> StoredFile:
+        pass
+
+    @abstractmethod
+    async def store_blob(self, source_path: Path, digest: str) -> Path:
+        pass
+
+    @abstractmethod
+    async def write_blob_file(self, file_path: Path, file_data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    async def list_files(self, folder: Path) -> list[tuple[Path, float]]:
+        pass
+
     @abstractmethod
     async def read_file(self, file_path: Path) -> None:
         pass
@@ -24,7 +84,7 @@ class BaseStorage(ABC):
         pass
 
     @abstractmethod
-    async def archive_files(self, files_paths: list[Path]) -> BytesIO:
+    async def archive_files(self, files: dict[str, Path]) -> AsyncIterator[bytes]:
         pass
 
     @abstractmethod
@@ -36,7 +96,21 @@ class BaseStorage(ABC):
         pass
 
     @abstractmethod
-    async def range_file_chunk_generator(self, file_path: Path, start_byte: int, end_byte: int):
+    async def fetch_file_metadata(self, file_path: Path) -> FileMetadata:
+        pass
+
+    @abstractmethod
+    async def range_file_chunk_generator(
+            self,
+            file_path: Path,
+            start_byte: int,
+            end_byte: int,
+            chunk_size: int | None = None
+    ):
+        pass
+
+    @abstractmethod
+    async def get_presigned_url(self, file_path: Path, media_type: str | None = None) -> str | None:
         pass
 
     @abstractmethod
@@ -45,7 +119,11 @@ class BaseStorage(ABC):
             file_content: bytes,
             file_type: str,
             file_type_filter
-    ) -> None:
+    ) -> bytes:
+        pass
+
+    @abstractmethod
+    async def validate_file_length(self, file_size: int, file_type: str) -> None:
         pass
 
     @abstractmethod
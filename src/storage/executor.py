@@ -0,0 +1,60 @@
+import time
+import asyncio
+from typing import Callable, TypeVar
+from concurrent.futures import ThreadPoolExecutor
+
+from utilities import generic_settings
+
+
+T = TypeVar("T")
+
+
+class FileIOExecutor:
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="file-io")
+        self._in_flight = 0
+        self._operations: dict[str, dict[str, float]] = dict()
+
+    async def run(self, operation: str, func: Callable[..., T], *args) -> T:
+        loop = asyncio.get_running_loop()
+        self._in_flight += 1
+        started_at = time.perf_counter()
+        failed = False
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._in_flight -= 1
+            self._record(operation=operation, duration=time.perf_counter() - started_at, failed=failed)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self._max_workers,
+            "in_flight": self._in_flight,
+            "operations": {
+                operation: {
+                    "count": int(metrics["count"]),
+                    "errors": int(metrics["errors"]),
+                    "total_seconds": metrics["total_seconds"],
+                    "avg_seconds": metrics["total_seconds"] / metrics["count"],
+                    "max_seconds": metrics["max_seconds"]
+                }
+                for operation, metrics in self._operations.items()
+            }
+        }
+
+    def _record(self, operation: str, duration: float, failed: bool) -> None:
+        metrics = self._operations.setdefault(
+            operation,
+            {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        metrics["count"] += 1
+        metrics["errors"] += int(failed)
+        metrics["total_seconds"] += duration
+        metrics["max_seconds"] = max(metrics["max_seconds"], duration)
+
+
+file_io_executor = FileIOExecutor(max_workers=generic_settings.FILE_IO_THREADS)
@@ -0,0 +1,277 @@
+import os
+import time
+import signal
+import struct
+import asyncio
+import tempfile
+import multiprocessing
+from io import BytesIO
+from pathlib import Path
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from PIL import Image
+
+from schemas import ImageInspection
+from utilities import ImageInspectionStatus, generic_settings
+
+
+class ImageBudgetExceeded(Exception):
+    pass
+
+
+def _raise_budget_exceeded(*_) -> None:
+    raise ImageBudgetExceeded()
+
+
+def _build_orientation_segment(orientation: int) -> bytes:
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    payload = exif.tobytes()
+    return b"\xff\xe1" + struct.pack(">H", len(payload) + 2) + payload
+
+
+def _strip_jpeg_metadata(file_data: bytes, orientation: int | None) -> bytes | None:
+    segments = [file_data[:2]]
+    metadata_removed = False
+    position = 2
+    while position + 4 <= len(file_data):
+        if file_data[position] != 0xFF:
+            return None
+
+        marker = file_data[position + 1]
+        if marker in (0xDA, 0xD9):
+            segments.append(file_data[position:])
+            break
+        if marker == 0x01 or 0xD0 <= marker <= 0xD7:
+            segments.append(file_data[position:position + 2])
+            position += 2
+            continue
+
+        segment_length = struct.unpack(">H", file_data[position + 2:position + 4])[0]
+        segment = file_data[position:position + 2 + segment_length]
+        if marker == 0xE1 and (segment[4:10] == b"Exif\x00\x00" or segment[4:33] == b"http://ns.adobe.com/xap/1.0/\x00"):
+            metadata_removed = True
+        else:
+            segments.append(segment)
+        position += 2 + segment_length
+    else:
+        return None
+
+    if not metadata_removed:
+        return None
+    if orientation not in (None, 1):
+        insert_position = 2 if len(segments) > 1 and segments[1][:2] == b"\xff\xe0" else 1
+        segments.insert(insert_position, _build_orientation_segment(orientation))
+
+    return b"".join(segments)
+
+
+def _strip_png_metadata(file_data: bytes) -> bytes | None:
+    chunks = [file_data[:8]]
+    metadata_removed = False
+    position = 8
+    while position + 12 <= len(file_data):
+        chunk_length = struct.unpack(">I", file_data[position:position + 4])[0]
+        chunk_type = file_data[position + 4:position + 8]
+        if chunk_type == b"eXIf":
+            metadata_removed = True
+        else:
+            chunks.append(file_data[position:position + 12 + chunk_length])
+        position += 12 + chunk_length
+        if chunk_type == b"IEND":
+            break
+
+    return b"".join(chunks) if metadata_removed else None
+
+
+def _replace_file(file_path: Path, file_data: bytes) -> None:
+    with tempfile.NamedTemporaryFile(
+            dir=file_path.parent,
+            prefix=f".{file_path.name}.",
+            suffix=".part",
+            delete=False
+    ) as file:
+        file.write(file_data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(file.name, file_path)
+
+
+def inspect_image(
+        source: bytes | str,
+        max_pixels: int,
+        cpu_time_limit: float,
+        strip_metadata: bool
+) -> tuple[ImageInspection, bytes | None]:
+    started_at = time.perf_counter()
+    budget_enforced = hasattr(signal, "setitimer")
+    if budget_enforced:
+        previous_handler = signal.signal(signal.SIGPROF, _raise_budget_exceeded)
+        signal.setitimer(signal.ITIMER_PROF, cpu_time_limit)
+
+    stripped_data = None
+    try:
+        file_data = source if isinstance(source, bytes) else Path(source).read_bytes()
+        Image.MAX_IMAGE_PIXELS = max_pixels
+        with Image.open(BytesIO(file_data)) as image:
+            width, height = image.size
+            image_format = image.format
+            if width * height * getattr(image, "n_frames", 1) > max_pixels:
+                raise Image.DecompressionBombError()
+            orientation = image.getexif().get(0x0112)
+            image.verify()
+        with Image.open(BytesIO(file_data)) as image:
+            image.load()
+
+        if strip_metadata and image_format == "JPEG":
+            stripped_data = _strip_jpeg_metadata(file_data, orientation=orientation)
+        elif strip_metadata and image_format == "PNG":
+            stripped_data = _strip_png_metadata(file_data)
+        if stripped_data is not None and not isinstance(source, bytes):
+            _replace_file(Path(source), stripped_data)
+
+        status = ImageInspectionStatus.OK
+    except ImageBudgetExceeded:
+        status = ImageInspectionStatus.TIMEOUT
+    except Image.DecompressionBombError:
+        status = ImageInspectionStatus.TOO_MANY_PIXELS
+    except Exception:
+        status = ImageInspectionStatus.CORRUPTED
+    finally:
+        if budget_enforced:
+            signal.setitimer(signal.ITIMER_PROF, 0)
+            signal.signal(signal.SIGPROF, previous_handler)
+
+    if status != ImageInspectionStatus.OK:
+        return ImageInspection(status=status, decode_seconds=time.perf_counter() - started_at), None
+
+    inspection = ImageInspection(
+        status=status,
+        width=width,
+        height=height,
+        format=image_format,
+        metadata_stripped=stripped_data is not None,
+        decode_seconds=time.perf_counter() - started_at
+    )
+    return inspection, stripped_data if isinstance(source, bytes) else None
+
+
+class ImageProcessor:
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._executor: ProcessPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_workers)
+        self._in_flight = 0
+        self._queued = 0
+        self._statuses = {status: 0 for status in ImageInspectionStatus}
+        self._queue_wait = {"total": 0.0, "max": 0.0}
+        self._decode = {"total": 0.0, "max": 0.0}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self._max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def inspect(
+            self,
+            source: bytes | Path,
+            max_pixels: int,
+            cpu_time_limit: float,
+            strip_metadata: bool
+    ) -> tuple[ImageInspection, bytes | None]:
+        queued_at = time.perf_counter()
+        for attempt in range(2):
+            executor, future = await self._submit(
+                source if isinstance(source, bytes) else str(source),
+                max_pixels,
+                cpu_time_limit,
+                strip_metadata
+            )
+            try:
+                inspection, stripped_data = await asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(future)),
+                    timeout=cpu_time_limit * 2
+                )
+            except asyncio.TimeoutError:
+                self._recycle(executor)
+                inspection, stripped_data = ImageInspection(status=ImageInspectionStatus.TIMEOUT), None
+            except BrokenProcessPool:
+                recycled_by_other_inspection = executor is not self._executor
+                self._recycle(executor)
+                if recycled_by_other_inspection and not attempt:
+                    continue
+                raise
+            break
+
+        self._record(inspection=inspection, queue_wait=time.perf_counter() - queued_at - inspection.decode_seconds)
+        return inspection, stripped_data
+
+    async def _submit(self, *args) -> tuple[ProcessPoolExecutor, Future]:
+        self._queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._queued -= 1
+
+        self._in_flight += 1
+        executor = self.executor
+        try:
+            future = executor.submit(inspect_image, *args)
+        except BrokenProcessPool:
+            self._recycle(executor)
+            self._release_slot()
+            raise
+
+        loop = asyncio.get_running_loop()
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release_slot))
+        return executor, future
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        if self._executor is executor:
+            self._executor = None
+
+        for process in list((executor._processes or dict()).values()):
+            process.kill()
+        executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        processed = sum(self._statuses.values())
+        return {
+            "workers": self._max_workers,
+            "in_flight": self._in_flight,
+            "queued": self._queued,
+            "processed": processed,
+            "corrupted": self._statuses[ImageInspectionStatus.CORRUPTED],
+            "rejected": self._statuses[ImageInspectionStatus.TOO_MANY_PIXELS],
+            "timeouts": self._statuses[ImageInspectionStatus.TIMEOUT],
+            "queue_wait_total_seconds": self._queue_wait["total"],
+            "queue_wait_avg_seconds": self._queue_wait["total"] / processed if processed else 0.0,
+            "queue_wait_max_seconds": self._queue_wait["max"],
+            "decode_total_seconds": self._decode["total"],
+            "decode_avg_seconds": self._decode["total"] / processed if processed else 0.0,
+            "decode_max_seconds": self._decode["max"]
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _release_slot(self) -> None:
+        self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, inspection: ImageInspection, queue_wait: float) -> None:
+        self._statuses[inspection.status] += 1
+        queue_wait = max(queue_wait, 0.0)
+        self._queue_wait["total"] += queue_wait
+        self._queue_wait["max"] = max(self._queue_wait["max"], queue_wait)
+        self._decode["total"] += inspection.decode_seconds
+        self._decode["max"] = max(self._decode["max"], inspection.decode_seconds)
+
+
+image_processor = ImageProcessor(max_workers=generic_settings.IMAGE_PROCESS_WORKERS)
@@ -1,8 +1,9 @@
-from io import BytesIO
 from pathlib import Path
+from typing import AsyncIterator
 
 from .base import BaseStorage
-from utilities import MessagesTypes, MediaPatches
+from utilities import MessagesTypes, MediaPatches, UploadLengthExceeded
+from schemas import StoredFile, FileMetadata
 from .utils import StorageUtils
 
 
@@ -15,15 +16,89 @@ class FileManager(BaseStorage):
         users_avatar_folder = MediaPatches.USERS_AVATARS_FOLDER.value
         groups_avatar_folder = MediaPatches.GROUPS_AVATARS_FOLDER.value
         media_messages_folder = MediaPatches.MEDIA_MESSAGES_FOLDER.value
-        for folder in [users_avatar_folder, groups_avatar_folder, media_messages_folder]:
+        media_uploads_folder = MediaPatches.MEDIA_UPLOADS_FOLDER.value
+        media_blobs_folder = MediaPatches.MEDIA_BLOBS_FOLDER.value
+        for folder in [
+            users_avatar_folder,
+            groups_avatar_folder,
+            media_messages_folder,
+            media_uploads_folder,
+            media_blobs_folder
+        ]:
             StorageUtils.create_directory(path=folder)
 
+    @staticmethod
+    def get_blob_path(digest: str) -> Path:
+        return MediaPatches.MEDIA_BLOBS_FOLDER.value / digest[:2] / digest
+
+    @staticmethod
+    def get_thumbnail_path(digest: str, size: int) -> Path:
+        return MediaPatches.MEDIA_BLOBS_FOLDER.value / digest[:2] / f"{size}px" / digest
+
+    def is_remote_file(self, file_path: Path) -> bool:
+        return False
+
     async def file_exists(self, file_path: Path) -> bool:
         return await StorageUtils.file_exists(file_path=file_path)
 
     async def write_file(self, file_path: Path, file_data: bytes) -> None:
         await StorageUtils.write_file(file_path=file_path, file_data=file_data)
 
+    async def write_file_stream(
+            self,
+            file_path: Path,
+            file_stream: AsyncIterator[bytes],
+            file_type: str,
+            file_type_filter
+    ) -> StoredFile:
+        return await StorageUtils().write_validated_file_stream(
+            file_path=file_path,
+            file_stream=file_stream,
+            file_type=file_type,
+            file_type_filter=file_type_filter
+        )
+
+    async def create_empty_file(self, file_path: Path) -> None:
+        await StorageUtils.create_empty_file(file_path=file_path)
+
+    async def append_file_stream(
+            self,
+            file_path: Path,
+            offset: int,
+            file_stream: AsyncIterator[bytes],
+            max_file_size: int
+    ) -> int:
+        return await StorageUtils.append_file_stream(
+            file_path=file_path,
+            offset=offset,
+            file_stream=file_stream,
+            max_file_size=max_file_size,
+            size_exception=UploadLengthExceeded(file_size=max_file_size)
+        )
+
+    async def validate_stored_file(
+            self,
+            file_path: Path,
+            file_type: str,
+            file_type_filter
+    ) -> StoredFile:
+        return await StorageUtils().validate_stored_file(
+            file_path=file_path,
+            file_type=file_type,
+            file_type_filter=file_type_filter
+        )
+
+    async def store_blob(self, source_path: Path, digest: str) -> Path:
+        blob_path = self.get_blob_path(digest=digest)
+        await StorageUtils.store_file(source_path=source_path, file_path=blob_path)
+        return blob_path
+
+    async def write_blob_file(self, file_path: Path, file_data: bytes) -> None:
+        await StorageUtils.write_file_atomically(file_path=file_path, file_data=file_data)
+
+    async def list_files(self, folder: Path) -> list[tuple[Path, float]]:
+        return await StorageUtils.list_files(folder=folder)
+
     async def read_file(self, file_path: Path) -> bytes:
         return await StorageUtils.read_file(file_path=file_path)
 
@@ -33,26 +108,46 @@ class FileManager(BaseStorage):
     async def check_file_size(self, file_path: Path) -> int:
         return await StorageUtils.check_file_size(file_path=file_path)
 
-    async def archive_files(self, files_paths: list[Path]) -> BytesIO:
-        return await StorageUtils().archive_files(files_paths=files_paths)
+    async def archive_files(self, files: dict[str, Path]) -> AsyncIterator[bytes]:
+        return StorageUtils.archive_files(files=files)
 
     async def file_chunk_generator(self, file_paths: list[Path]):
         return StorageUtils.file_chunk_generator(file_paths=file_paths)
 
-    async def range_file_chunk_generator(self, file_path: Path, start_byte: int, end_byte: int):
-        return StorageUtils.range_file_chunk_generator(file_path=file_path, start_byte=start_byte, end_byte=end_byte)
+    async def fetch_file_metadata(self, file_path: Path) -> FileMetadata:
+        return await StorageUtils.fetch_file_metadata(file_path=file_path)
+
+    async def range_file_chunk_generator(
+            self,
+            file_path: Path,
+            start_byte: int,
+            end_byte: int,
+            chunk_size: int | None = None
+    ):
+        return StorageUtils.range_file_chunk_generator(
+            file_path=file_path,
+            start_byte=start_byte,
+            end_byte=end_byte,
+            chunk_size=chunk_size
+        )
+
+    async def get_presigned_url(self, file_path: Path, media_type: str | None = None) -> str | None:
+        return None
 
     async def validate_file(
             self,
             file_content: bytes,
             file_type: str,
             file_type_filter
-    ) -> None:
-        await StorageUtils().validate_file(
+    ) -> bytes:
+        return await StorageUtils().validate_file(
             file_content=file_content,
             file_type=file_type,
             file_type_filter=file_type_filter
         )
 
+    async def validate_file_length(self, file_size: int, file_type: str) -> None:
+        await StorageUtils().validate_file_length(file_size=file_size, file_type=file_type)
+
     async def detect_file_type(self, file_type: str) -> MessagesTypes:
         return await StorageUtils().detect_file_type(file_type=file_type)
@@ -0,0 +1,111 @@
+import secrets
+from urllib.parse import quote
+from email.utils import format_datetime
+from pathlib import Path
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+from schemas import FileMetadata
+from utilities import generic_settings
+from .base import BaseStorage
+from .executor import file_io_executor
+from .local import FileManager
+
+
+class MediaFileResponse(Response):
+    def __init__(
+            self,
+            file_path: Path,
+            media_type: str | None,
+            file_metadata: FileMetadata,
+            ranges: list[tuple[int, int]] | None = None,
+            chunk_size: int | None = None,
+            file_manager: BaseStorage | None = None
+    ):
+        self.file_path = file_path
+        self.file_manager = file_manager or FileManager()
+        self.chunk_size = chunk_size or generic_settings.chunk_size_bytes
+        self.background = None
+        self.status_code = 206 if ranges else 200
+        self.media_type = media_type
+        self.parts: list[tuple[bytes, int, int]] = list()
+        self.epilogue = b""
+
+        file_size = file_metadata.size
+        headers = {
+            "Accept-Ranges": "bytes",
+            "ETag": file_metadata.etag,
+            "Last-Modified": format_datetime(file_metadata.modified_at, usegmt=True)
+        }
+        if not ranges:
+            if file_size:
+                self.parts.append((b"", 0, file_size - 1))
+        elif len(ranges) == 1:
+            start_byte, end_byte = ranges[0]
+            headers["Content-Range"] = f"bytes {start_byte}-{end_byte}/{file_size}"
+            self.parts.append((b"", start_byte, end_byte))
+        else:
+            boundary = secrets.token_hex(16)
+            self.media_type = f"multipart/byteranges; boundary={boundary}"
+            for index, (start_byte, end_byte) in enumerate(ranges):
+                part_header = (
+                    f"--{boundary}\r\n"
+                    f"Content-Type: {media_type or 'application/octet-stream'}\r\n"
+                    f"Content-Range: bytes {start_byte}-{end_byte}/{file_size}\r\n\r\n"
+                ).encode("latin-1")
+                self.parts.append((part_header if index == 0 else b"\r\n" + part_header, start_byte, end_byte))
+            self.epilogue = f"\r\n--{boundary}--\r\n".encode("latin-1")
+
+        headers["Content-Length"] = str(
+            sum(len(part_header) + end_byte - start_byte + 1 for part_header, start_byte, end_byte in self.parts)
+            + len(self.epilogue)
+        )
+        self.init_headers(headers)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if (
+                "http.response.zerocopysend" in scope.get("extensions", {})
+                and not self.file_manager.is_remote_file(self.file_path)
+        ):
+            await self._send_zero_copy(send)
+        else:
+            await self._send_chunks(send)
+        await send({"type": "http.response.body", "body": self.epilogue, "more_body": False})
+
+    async def _send_chunks(self, send: Send) -> None:
+        for part_header, start_byte, end_byte in self.parts:
+            if part_header:
+                await send({"type": "http.response.body", "body": part_header, "more_body": True})
+            async for chunk in await self.file_manager.range_file_chunk_generator(
+                    file_path=self.file_path,
+                    start_byte=start_byte,
+                    end_byte=end_byte,
+                    chunk_size=self.chunk_size
+            ):
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+
+    async def _send_zero_copy(self, send: Send) -> None:
+        file = await file_io_executor.run("open", open, self.file_path, "rb")
+        try:
+            for part_header, start_byte, end_byte in self.parts:
+                if part_header:
+                    await send({"type": "http.response.body", "body": part_header, "more_body": True})
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": start_byte,
+                    "count": end_byte - start_byte + 1,
+                    "more_body": True
+                })
+        finally:
+            await file_io_executor.run("close", file.close)
+
+
+class AccelRedirectResponse(Response):
+    def __init__(self, file_path: Path, media_type: str | None = None):
+        redirect_path = file_path.relative_to(generic_settings.MEDIA_FOLDER).as_posix()
+        super().__init__(
+            media_type=media_type,
+            headers={"X-Accel-Redirect": f"{generic_settings.X_ACCEL_REDIRECT_PREFIX.rstrip('/')}/{quote(redirect_path)}"}
+        )
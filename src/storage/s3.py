@@ -0,0 +1,189 @@
+import zipfile
+import hashlib
+from pathlib import Path
+from typing import AsyncIterator
+
+from schemas import FileMetadata
+from utilities import MediaPatches, generic_settings
+from .executor import file_io_executor
+from .local import FileManager
+from .s3_client import S3Client
+from .utils import StorageUtils, ArchiveStreamBuffer
+
+
+class S3Storage(FileManager):
+    def __init__(self, client: S3Client, multipart_chunk_size: int):
+        super().__init__()
+        self._client = client
+        self._multipart_chunk_size = multipart_chunk_size
+
+    def is_remote_file(self, file_path: Path) -> bool:
+        return file_path.is_relative_to(MediaPatches.MEDIA_BLOBS_FOLDER.value)
+
+    @staticmethod
+    def get_object_key(file_path: Path) -> str:
+        return file_path.relative_to(generic_settings.MEDIA_FOLDER).as_posix()
+
+    async def file_exists(self, file_path: Path) -> bool:
+        if not self.is_remote_file(file_path):
+            return await super().file_exists(file_path=file_path)
+
+        return await self._client.head_object(key=self.get_object_key(file_path)) is not None
+
+    async def store_blob(self, source_path: Path, digest: str) -> Path:
+        blob_path = self.get_blob_path(digest=digest)
+        object_key = self.get_object_key(blob_path)
+        if await self._client.head_object(key=object_key) is None:
+            await self._upload_file(source_path=source_path, object_key=object_key)
+        await StorageUtils.delete_file(file_path=source_path)
+
+        return blob_path
+
+    async def write_blob_file(self, file_path: Path, file_data: bytes) -> None:
+        if not self.is_remote_file(file_path):
+            return await super().write_blob_file(file_path=file_path, file_data=file_data)
+
+        await self._client.put_object(
+            key=self.get_object_key(file_path),
+            data=file_data,
+            payload_hash=hashlib.sha256(file_data).hexdigest()
+        )
+
+    async def read_file(self, file_path: Path) -> bytes:
+        if not self.is_remote_file(file_path):
+            return await super().read_file(file_path=file_path)
+
+        return await self._client.get_object(key=self.get_object_key(file_path))
+
+    async def delete_file(self, file_path: Path) -> None:
+        if not self.is_remote_file(file_path):
+            return await super().delete_file(file_path=file_path)
+
+        await self._client.delete_object(key=self.get_object_key(file_path))
+
+    async def check_file_size(self, file_path: Path) -> int:
+        return (await self.fetch_file_metadata(file_path=file_path)).size
+
+    async def fetch_file_metadata(self, file_path: Path) -> FileMetadata:
+        if not self.is_remote_file(file_path):
+            return await super().fetch_file_metadata(file_path=file_path)
+
+        file_metadata = await self._client.head_object(key=self.get_object_key(file_path))
+        if file_metadata is None:
+            raise FileNotFoundError(file_path)
+
+        return file_metadata
+
+    async def range_file_chunk_generator(
+            self,
+            file_path: Path,
+            start_byte: int,
+            end_byte: int,
+            chunk_size: int | None = None
+    ):
+        if not self.is_remote_file(file_path):
+            return await super().range_file_chunk_generator(
+                file_path=file_path,
+                start_byte=start_byte,
+                end_byte=end_byte,
+                chunk_size=chunk_size
+            )
+
+        return self._client.iterate_object(
+            key=self.get_object_key(file_path),
+            start_byte=start_byte,
+            end_byte=end_byte,
+            chunk_size=chunk_size
+        )
+
+    async def file_chunk_generator(self, file_paths: list[Path]):
+        return self._iterate_files(file_paths=file_paths)
+
+    async def archive_files(self, files: dict[str, Path]) -> AsyncIterator[bytes]:
+        return self._iterate_archive(files=files, chunk_size=generic_settings.chunk_size_bytes)
+
+    async def get_presigned_url(self, file_path: Path, media_type: str | None = None) -> str | None:
+        if not self.is_remote_file(file_path):
+            return None
+
+        return self._client.presign_get_object(
+            key=self.get_object_key(file_path),
+            expires_in=generic_settings.S3_PRESIGNED_URL_TTL,
+            media_type=media_type
+        )
+
+    async def _upload_file(self, source_path: Path, object_key: str) -> None:
+        file_size = await StorageUtils.check_file_size(file_path=source_path)
+        if file_size <= self._multipart_chunk_size:
+            data, payload_hash = await StorageUtils.read_file_part(file_path=source_path, offset=0, size=file_size)
+            await self._client.put_object(key=object_key, data=data, payload_hash=payload_hash)
+            return None
+
+        upload_id = await self._client.create_multipart_upload(key=object_key)
+        try:
+            parts_etags = list()
+            for offset in range(0, file_size, self._multipart_chunk_size):
+                data, payload_hash = await StorageUtils.read_file_part(
+                    file_path=source_path,
+                    offset=offset,
+                    size=self._multipart_chunk_size
+                )
+                parts_etags.append(
+                    await self._client.upload_part(
+                        key=object_key,
+                        upload_id=upload_id,
+                        part_number=len(parts_etags) + 1,
+                        data=data,
+                        payload_hash=payload_hash
+                    )
+                )
+            await self._client.complete_multipart_upload(key=object_key, upload_id=upload_id, parts_etags=parts_etags)
+        except Exception:
+            await self._client.abort_multipart_upload(key=object_key, upload_id=upload_id)
+            raise
+
+    async def _iterate_file(self, file_path: Path, chunk_size: int | None = None) -> AsyncIterator[bytes]:
+        if not self.is_remote_file(file_path):
+            return await super().range_file_chunk_generator(
+                file_path=file_path,
+                start_byte=0,
+                end_byte=await super().check_file_size(file_path=file_path) - 1,
+                chunk_size=chunk_size
+            )
+
+        return self._client.iterate_object(key=self.get_object_key(file_path), chunk_size=chunk_size)
+
+    async def _iterate_files(self, file_paths: list[Path]) -> AsyncIterator[bytes]:
+        for file_path in file_paths:
+            async for chunk in await self._iterate_file(file_path=file_path):
+                yield chunk
+
+    async def _iterate_archive(self, files: dict[str, Path], chunk_size: int) -> AsyncIterator[bytes]:
+        archive_buffer = ArchiveStreamBuffer()
+        zip_file = zipfile.ZipFile(archive_buffer, "w")
+        for file_name, file_path in files.items():
+            try:
+                file_metadata = await self.fetch_file_metadata(file_path=file_path)
+            except FileNotFoundError:
+                continue
+
+            file_chunks = await self._iterate_file(file_path=file_path, chunk_size=chunk_size)
+            first_chunk = await anext(file_chunks, b"")
+            zip_info = zipfile.ZipInfo(
+                filename=file_name,
+                date_time=file_metadata.modified_at.timetuple()[:6]
+            )
+            zip_info.compress_type = (
+                zipfile.ZIP_STORED if StorageUtils.is_compressed_file(first_chunk[:16]) else zipfile.ZIP_DEFLATED
+            )
+            archive_entry = zip_file.open(zip_info, "w", force_zip64=True)
+            await file_io_executor.run("archive", archive_entry.write, first_chunk)
+            async for chunk in file_chunks:
+                await file_io_executor.run("archive", archive_entry.write, chunk)
+                if archive_buffer.size >= chunk_size:
+                    yield archive_buffer.pop()
+            await file_io_executor.run("archive", archive_entry.close)
+
+        await file_io_executor.run("archive", zip_file.close)
+        if archive_buffer.size:
+            yield archive_buffer.pop()
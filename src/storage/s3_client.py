@@ -0,0 +1,304 @@
+import hmac
+import hashlib
+import httpx
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator
+from urllib.parse import quote
+from xml.etree import ElementTree
+
+from schemas import FileMetadata
+from utilities import ObjectStorageError, generic_settings
+
+
+EMPTY_PAYLOAD_HASH = hashlib.sha256(b"").hexdigest()
+
+
+class S3Signer:
+    _ALGORITHM = "AWS4-HMAC-SHA256"
+
+    def __init__(self, access_key: str, secret_key: str, region: str, service: str = "s3"):
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._region = region
+        self._service = service
+
+    def sign_headers(
+            self,
+            method: str,
+            url: str,
+            headers: dict[str, str],
+            payload_hash: str,
+            signed_at: datetime | None = None
+    ) -> dict[str, str]:
+        signed_at = signed_at or datetime.now(timezone.utc)
+        request_url = httpx.URL(url)
+        headers = {
+            **headers,
+            "host": request_url.netloc.decode("ascii"),
+            "x-amz-content-sha256": payload_hash,
+            "x-amz-date": signed_at.strftime("%Y%m%dT%H%M%SZ")
+        }
+        canonical_headers = {name.lower(): " ".join(str(value).split()) for name, value in headers.items()}
+        signed_headers = ";".join(sorted(canonical_headers))
+        signature = self._signature(
+            method=method,
+            request_url=request_url,
+            query=self._query_items(request_url),
+            canonical_headers=canonical_headers,
+            signed_headers=signed_headers,
+            payload_hash=payload_hash,
+            signed_at=signed_at
+        )
+        headers["Authorization"] = (
+            f"{self._ALGORITHM} Credential={self._access_key}/{self._scope(signed_at)}, "
+            f"SignedHeaders={signed_headers}, Signature={signature}"
+        )
+
+        return headers
+
+    def presign_url(self, method: str, url: str, expires_in: int, signed_at: datetime | None = None) -> str:
+        signed_at = signed_at or datetime.now(timezone.utc)
+        request_url = httpx.URL(url)
+        query = self._query_items(request_url) + [
+            ("X-Amz-Algorithm", self._ALGORITHM),
+            ("X-Amz-Credential", f"{self._access_key}/{self._scope(signed_at)}"),
+            ("X-Amz-Date", signed_at.strftime("%Y%m%dT%H%M%SZ")),
+            ("X-Amz-Expires", str(expires_in)),
+            ("X-Amz-SignedHeaders", "host")
+        ]
+        signature = self._signature(
+            method=method,
+            request_url=request_url,
+            query=query,
+            canonical_headers={"host": request_url.netloc.decode("ascii")},
+            signed_headers="host",
+            payload_hash="UNSIGNED-PAYLOAD",
+            signed_at=signed_at
+        )
+        query.append(("X-Amz-Signature", signature))
+
+        return str(request_url.copy_with(query=self.encode_query(query).encode("ascii")))
+
+    def _signature(
+            self,
+            method: str,
+            request_url: httpx.URL,
+            query: list[tuple[str, str]],
+            canonical_headers: dict[str, str],
+            signed_headers: str,
+            payload_hash: str,
+            signed_at: datetime
+    ) -> str:
+        canonical_request = "\n".join([
+            method,
+            request_url.raw_path.split(b"?")[0].decode("ascii") or "/",
+            self.encode_query(query),
+            "".join(f"{name}:{canonical_headers[name]}\n" for name in sorted(canonical_headers)),
+            signed_headers,
+            payload_hash
+        ])
+        string_to_sign = "\n".join([
+            self._ALGORITHM,
+            signed_at.strftime("%Y%m%dT%H%M%SZ"),
+            self._scope(signed_at),
+            hashlib.sha256(canonical_request.encode("utf-8")).hexdigest()
+        ])
+        signing_key = f"AWS4{self._secret_key}".encode("utf-8")
+        for scope_part in (signed_at.strftime("%Y%m%d"), self._region, self._service, "aws4_request"):
+            signing_key = hmac.new(signing_key, scope_part.encode("utf-8"), hashlib.sha256).digest()
+
+        return hmac.new(signing_key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+
+    def _scope(self, signed_at: datetime) -> str:
+        return f"{signed_at.strftime('%Y%m%d')}/{self._region}/{self._service}/aws4_request"
+
+    @staticmethod
+    def _query_items(request_url: httpx.URL) -> list[tuple[str, str]]:
+        return list(request_url.params.multi_items())
+
+    @staticmethod
+    def encode_query(query: list[tuple[str, str]]) -> str:
+        return "&".join(
+            f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+            for name, value in sorted(query)
+        )
+
+
+class S3Client:
+    def __init__(
+            self,
+            endpoint_url: str,
+            region: str,
+            bucket: str,
+            access_key: str,
+            secret_key: str,
+            public_endpoint_url: str | None = None,
+            transport: httpx.AsyncBaseTransport | None = None
+    ):
+        self._endpoint_url = endpoint_url.rstrip("/")
+        self._public_endpoint_url = (public_endpoint_url or endpoint_url).rstrip("/")
+        self._bucket = bucket
+        self._signer = S3Signer(access_key=access_key, secret_key=secret_key, region=region)
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(transport=self._transport, timeout=httpx.Timeout(60, connect=10))
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+
+    async def head_object(self, key: str) -> FileMetadata | None:
+        response = await self._request("HEAD", key, expected_statuses=(200, 404))
+        if response.status_code == 404:
+            return None
+
+        return FileMetadata(
+            size=int(response.headers["Content-Length"]),
+            modified_at=parsedate_to_datetime(response.headers["Last-Modified"]),
+            etag=response.headers["ETag"]
+        )
+
+    async def get_object(self, key: str) -> bytes:
+        response = await self._request("GET", key, expected_statuses=(200, 404))
+        if response.status_code == 404:
+            raise FileNotFoundError(key)
+
+        return response.content
+
+    async def iterate_object(
+            self,
+            key: str,
+            start_byte: int | None = None,
+            end_byte: int | None = None,
+            chunk_size: int | None = None
+    ) -> AsyncIterator[bytes]:
+        headers = dict()
+        if start_byte is not None:
+            headers["Range"] = f"bytes={start_byte}-{'' if end_byte is None else end_byte}"
+        url = self._object_url(self._endpoint_url, key)
+        request_headers = self._signer.sign_headers("GET", url, headers, EMPTY_PAYLOAD_HASH)
+
+        try:
+            async with self.client.stream("GET", url, headers=request_headers) as response:
+                if response.status_code == 404:
+                    raise FileNotFoundError(key)
+                if response.status_code not in (200, 206):
+                    await response.aread()
+                    raise self._error(response)
+
+                async for chunk in response.aiter_bytes(chunk_size or generic_settings.chunk_size_bytes):
+                    yield chunk
+        except httpx.HTTPError as exc:
+            raise ObjectStorageError(status_code=502, code=type(exc).__name__) from exc
+
+    async def put_object(self, key: str, data: bytes, payload_hash: str) -> None:
+        await self._request("PUT", key, content=data, payload_hash=payload_hash)
+
+    async def delete_object(self, key: str) -> None:
+        await self._request("DELETE", key, expected_statuses=(200, 204, 404))
+
+    async def create_multipart_upload(self, key: str) -> str:
+        response = await self._request("POST", key, params={"uploads": ""})
+        return self._xml_value(response.content, "UploadId")
+
+    async def upload_part(
+            self,
+            key: str,
+            upload_id: str,
+            part_number: int,
+            data: bytes,
+            payload_hash: str
+    ) -> str:
+        response = await self._request(
+            "PUT",
+            key,
+            params={"partNumber": str(part_number), "uploadId": upload_id},
+            content=data,
+            payload_hash=payload_hash
+        )
+        return response.headers["ETag"]
+
+    async def complete_multipart_upload(self, key: str, upload_id: str, parts_etags: list[str]) -> None:
+        parts = "".join(
+            f"<Part><PartNumber>{part_number}</PartNumber><ETag>{etag}</ETag></Part>"
+            for part_number, etag in enumerate(parts_etags, start=1)
+        )
+        data = f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode("utf-8")
+        response = await self._request(
+            "POST",
+            key,
+            params={"uploadId": upload_id},
+            content=data,
+            payload_hash=hashlib.sha256(data).hexdigest()
+        )
+        if b"<Error>" in response.content:
+            raise self._error(response)
+
+    async def abort_multipart_upload(self, key: str, upload_id: str) -> None:
+        await self._request("DELETE", key, params={"uploadId": upload_id}, expected_statuses=(200, 204, 404))
+
+    def presign_get_object(self, key: str, expires_in: int, media_type: str | None = None) -> str:
+        url = self._object_url(self._public_endpoint_url, key)
+        if media_type is not None:
+            url = f"{url}?response-content-type={quote(media_type, safe='-_.~')}"
+
+        return self._signer.presign_url("GET", url, expires_in=expires_in)
+
+    async def _request(
+            self,
+            method: str,
+            key: str,
+            params: dict[str, str] | None = None,
+            content: bytes = b"",
+            payload_hash: str = EMPTY_PAYLOAD_HASH,
+            expected_statuses: tuple[int, ...] = (200, 204)
+    ) -> httpx.Response:
+        url = self._object_url(self._endpoint_url, key)
+        if params:
+            url = f"{url}?{S3Signer.encode_query(list(params.items()))}"
+        headers = self._signer.sign_headers(method, url, {}, payload_hash)
+
+        try:
+            response = await self.client.request(method, url, headers=headers, content=content)
+        except httpx.HTTPError as exc:
+            raise ObjectStorageError(status_code=502, code=type(exc).__name__) from exc
+        if response.status_code not in expected_statuses:
+            raise self._error(response)
+
+        return response
+
+    def _object_url(self, endpoint_url: str, key: str) -> str:
+        return f"{endpoint_url}/{quote(self._bucket, safe='')}/{quote(key, safe='/-_.~')}"
+
+    @staticmethod
+    def _xml_value(content: bytes, tag: str) -> str | None:
+        element = ElementTree.fromstring(content).find(f".//{{*}}{tag}")
+        return None if element is None else element.text
+
+    @classmethod
+    def _error(cls, response: httpx.Response) -> ObjectStorageError:
+        code = None
+        if response.content:
+            try:
+                code = cls._xml_value(response.content, "Code")
+            except ElementTree.ParseError:
+                pass
+
+        return ObjectStorageError(status_code=response.status_code, code=code)
+
+
+s3_client = S3Client(
+    endpoint_url=generic_settings.S3_ENDPOINT_URL,
+    public_endpoint_url=generic_settings.S3_PUBLIC_ENDPOINT_URL,
+    region=generic_settings.S3_REGION,
+    bucket=generic_settings.S3_BUCKET,
+    access_key=generic_settings.S3_ACCESS_KEY,
+    secret_key=generic_settings.S3_SECRET_KEY
+)
@@ -1,13 +1,71 @@
+import os
+import hashlib
 import zipfile
-from PIL import Image
-from typing import Union, Literal
+import tempfile
+from PIL import Image, ImageOps
+from typing import Union, Literal, AsyncIterator, Awaitable, Callable, Iterator
 from pathlib import Path
-from io import BytesIO
+from io import BytesIO, RawIOBase
+from datetime import datetime, timezone
 
-from utilities import generic_settings, MessagesTypes, ImageCorrupted, InvalidFileType, FIleToBig
+from utilities import (
+    generic_settings,
+    MessagesTypes,
+    ImageInspectionStatus,
+    ImageCorrupted,
+    ImageDimensionsExceeded,
+    InvalidFileType,
+    FIleToBig
+)
+from schemas import StoredFile, FileMetadata, ImageInspection
+from .executor import file_io_executor
+from .images import image_processor
+
+
+class ArchiveStreamBuffer(RawIOBase):
+    def __init__(self):
+        super().__init__()
+        self._chunks: list[bytes] = list()
+        self.size = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def pop(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
 
 
 class StorageUtils:
+    _COMPRESSED_FILES_SIGNATURES = (
+        (0, b"\xff\xd8\xff"),
+        (0, b"\x89PNG"),
+        (0, b"GIF8"),
+        (8, b"WEBP"),
+        (4, b"ftyp"),
+        (0, b"\x1a\x45\xdf\xa3"),
+        (0, b"OggS"),
+        (0, b"ID3"),
+        (0, b"\xff\xfb"),
+        (0, b"\xff\xf3"),
+        (0, b"\xff\xf1"),
+        (0, b"fLaC"),
+        (0, b"PK\x03\x04"),
+        (0, b"\x1f\x8b"),
+        (0, b"7z\xbc\xaf"),
+        (0, b"Rar!"),
+        (0, b"BZh"),
+        (0, b"\xfd7zXZ"),
+        (0, b"(\xb5/\xfd")
+    )
+
     def __init__(self):
         pass
 
@@ -17,48 +75,302 @@ class StorageUtils:
 
     @staticmethod
     async def write_file(file_path: Path, file_data: bytes):
-        with open(str(file_path), "wb") as f:
-            f.write(file_data)
+        await file_io_executor.run("write", file_path.write_bytes, file_data)
 
     @staticmethod
     async def read_file(file_path: Path):
-        with open(str(file_path), "rb") as f:
-            return f.read()
+        return await file_io_executor.run("read", file_path.read_bytes)
 
     @staticmethod
     async def delete_file(file_path: Path) -> None:
-        file_path.unlink()
+        await file_io_executor.run("delete", file_path.unlink)
 
     @staticmethod
     async def file_exists(file_path: Path) -> bool:
-        return file_path.exists() and file_path.is_file()
+        return await file_io_executor.run("exists", file_path.is_file)
 
     @staticmethod
     async def check_file_size(file_path: Path) -> int:
-        return file_path.stat().st_size
+        return (await file_io_executor.run("stat", file_path.stat)).st_size
+
+    @staticmethod
+    async def fetch_file_metadata(file_path: Path) -> FileMetadata:
+        file_stat = await file_io_executor.run("stat", file_path.stat)
+        return FileMetadata(
+            size=file_stat.st_size,
+            modified_at=datetime.fromtimestamp(file_stat.st_mtime, tz=timezone.utc),
+            etag=f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+        )
+
+    @staticmethod
+    async def iterate_upload_file(upload_file, chunk_size: int) -> AsyncIterator[bytes]:
+        while chunk := await upload_file.read(chunk_size):
+            yield chunk
+
+    @staticmethod
+    def _create_temp_file(file_path: Path):
+        return tempfile.NamedTemporaryFile(
+            dir=file_path.parent,
+            prefix=f".{file_path.name}.",
+            suffix=".part",
+            delete=False
+        )
+
+    @staticmethod
+    def _write_chunk(file, hasher, chunk: bytes) -> None:
+        file.write(chunk)
+        hasher.update(chunk)
+
+    @staticmethod
+    def _flush_temp_file(file) -> None:
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+
+    @staticmethod
+    def _commit_temp_file(file, file_path: Path) -> None:
+        os.replace(file.name, file_path)
+
+    @staticmethod
+    def _discard_temp_file(file) -> None:
+        file.close()
+        Path(file.name).unlink(missing_ok=True)
+
+    @staticmethod
+    async def write_file_stream(
+            file_path: Path,
+            file_stream: AsyncIterator[bytes],
+            max_file_size: int,
+            size_exception: Exception,
+            process_file: Callable[[Path], Awaitable[bool]] | None = None
+    ) -> StoredFile:
+        temp_file = await file_io_executor.run("open", StorageUtils._create_temp_file, file_path)
+        hasher = hashlib.sha256()
+        file_size = 0
+        try:
+            async for chunk in file_stream:
+                file_size += len(chunk)
+                if file_size > max_file_size:
+                    raise size_exception
+                await file_io_executor.run("write_chunk", StorageUtils._write_chunk, temp_file, hasher, chunk)
+
+            await file_io_executor.run("flush", StorageUtils._flush_temp_file, temp_file)
+            stored_file = StoredFile(size=file_size, sha256=hasher.hexdigest())
+            if process_file is not None and await process_file(Path(temp_file.name)):
+                stored_file = await StorageUtils.hash_file(file_path=Path(temp_file.name))
+
+            await file_io_executor.run("commit", StorageUtils._commit_temp_file, temp_file, file_path)
+        except BaseException:
+            await file_io_executor.run("discard", StorageUtils._discard_temp_file, temp_file)
+            raise
+
+        return stored_file
+
+    @staticmethod
+    def _create_empty_file(file_path: Path) -> None:
+        file_path.touch(exist_ok=False)
+
+    @staticmethod
+    async def create_empty_file(file_path: Path) -> None:
+        await file_io_executor.run("create", StorageUtils._create_empty_file, file_path)
+
+    @staticmethod
+    def _open_at_offset(file_path: Path, offset: int):
+        file = open(file_path, "r+b")
+        file.truncate(offset)
+        file.seek(offset)
+        return file
 
-    async def archive_files(self, files_paths: list[Path]) -> BytesIO:
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path in files_paths:
-                if await self.file_exists(file_path=file_path):
-                    zip_file.write(file_path, arcname=file_path.name)
+    @staticmethod
+    def _sync_file(file) -> None:
+        file.flush()
+        os.fsync(file.fileno())
+        file.close()
+
+    @staticmethod
+    async def append_file_stream(
+            file_path: Path,
+            offset: int,
+            file_stream: AsyncIterator[bytes],
+            max_file_size: int,
+            size_exception: Exception
+    ) -> int:
+        file = await file_io_executor.run("open", StorageUtils._open_at_offset, file_path, offset)
+        file_size = offset
+        try:
+            async for chunk in file_stream:
+                if file_size + len(chunk) > max_file_size:
+                    raise size_exception
+                await file_io_executor.run("write_chunk", file.write, chunk)
+                file_size += len(chunk)
+        finally:
+            await file_io_executor.run("sync", StorageUtils._sync_file, file)
+
+        return file_size
+
+    @staticmethod
+    def _hash_file(file_path: Path, chunk_size: int) -> StoredFile:
+        hasher = hashlib.sha256()
+        file_size = 0
+        with open(file_path, "rb") as file:
+            while chunk := file.read(chunk_size):
+                hasher.update(chunk)
+                file_size += len(chunk)
+
+        return StoredFile(size=file_size, sha256=hasher.hexdigest())
+
+    @staticmethod
+    async def hash_file(file_path: Path) -> StoredFile:
+        return await file_io_executor.run("hash", StorageUtils._hash_file, file_path, generic_settings.chunk_size_bytes)
 
-        zip_buffer.seek(0)
-        return zip_buffer
+    @staticmethod
+    def _read_file_part(file_path: Path, offset: int, size: int) -> tuple[bytes, str]:
+        file_descriptor = os.open(file_path, os.O_RDONLY)
+        try:
+            data = os.pread(file_descriptor, size, offset)
+        finally:
+            os.close(file_descriptor)
+
+        return data, hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    async def read_file_part(file_path: Path, offset: int, size: int) -> tuple[bytes, str]:
+        return await file_io_executor.run("read_part", StorageUtils._read_file_part, file_path, offset, size)
+
+    @staticmethod
+    def _write_file_atomically(file_path: Path, file_data: bytes) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file = StorageUtils._create_temp_file(file_path=file_path)
+        try:
+            file.write(file_data)
+            StorageUtils._flush_temp_file(file)
+            StorageUtils._commit_temp_file(file, file_path)
+        except Exception:
+            StorageUtils._discard_temp_file(file)
+            raise
+
+    @staticmethod
+    async def write_file_atomically(file_path: Path, file_data: bytes) -> None:
+        await file_io_executor.run("write", StorageUtils._write_file_atomically, file_path, file_data)
+
+    @staticmethod
+    def is_thumbnail_supported(file_type: str | None) -> bool:
+        Image.init()
+        return file_type in generic_settings.ALLOWED_IMAGE_TYPES and file_type in Image.MIME.values()
+
+    @staticmethod
+    def create_thumbnails(file_data: bytes, sizes: list[int], image_format: str, quality: int) -> dict[int, bytes]:
+        thumbnails = dict()
+        with Image.open(BytesIO(file_data)) as image:
+            original_size = max(image.size)
+            image.draft("RGB", (max(sizes), max(sizes)))
+            source_image = ImageOps.exif_transpose(image)
+            has_alpha = "A" in source_image.getbands() or "transparency" in source_image.info
+            source_image = source_image.convert("RGBA" if has_alpha else "RGB")
+
+            for size in sorted(sizes, reverse=True):
+                if size >= original_size:
+                    continue
+
+                source_image.thumbnail((size, size), Image.Resampling.LANCZOS)
+                thumbnail_buffer = BytesIO()
+                source_image.save(thumbnail_buffer, format=image_format.upper(), quality=quality)
+                thumbnails[size] = thumbnail_buffer.getvalue()
+
+        return thumbnails
+
+    @staticmethod
+    def _store_file(source_path: Path, file_path: Path) -> None:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(source_path, file_path)
+
+    @staticmethod
+    async def store_file(source_path: Path, file_path: Path) -> None:
+        await file_io_executor.run("store", StorageUtils._store_file, source_path, file_path)
+
+    @staticmethod
+    def _list_files(folder: Path) -> list[tuple[Path, float]]:
+        return [(file_path, file_path.stat().st_mtime) for file_path in folder.iterdir() if file_path.is_file()]
+
+    @staticmethod
+    async def list_files(folder: Path) -> list[tuple[Path, float]]:
+        return await file_io_executor.run("list", StorageUtils._list_files, folder)
+
+    @staticmethod
+    def is_compressed_file(file_header: bytes) -> bool:
+        return any(
+            file_header[offset:offset + len(signature)] == signature
+            for offset, signature in StorageUtils._COMPRESSED_FILES_SIGNATURES
+        )
+
+    @staticmethod
+    def _iterate_archive(files: dict[str, Path], chunk_size: int) -> Iterator[bytes]:
+        archive_buffer = ArchiveStreamBuffer()
+        with zipfile.ZipFile(archive_buffer, "w") as zip_file:
+            for file_name, file_path in files.items():
+                if not file_path.is_file():
+                    continue
+
+                with open(file_path, "rb") as file:
+                    file_header = file.read(16)
+                    file.seek(0)
+                    zip_info = zipfile.ZipInfo.from_file(file_path, arcname=file_name)
+                    zip_info.compress_type = (
+                        zipfile.ZIP_STORED if StorageUtils.is_compressed_file(file_header) else zipfile.ZIP_DEFLATED
+                    )
+                    with zip_file.open(zip_info, "w", force_zip64=True) as archive_entry:
+                        while chunk := file.read(chunk_size):
+                            archive_entry.write(chunk)
+                            if archive_buffer.size >= chunk_size:
+                                yield archive_buffer.pop()
+
+        if archive_buffer.size:
+            yield archive_buffer.pop()
+
+    @staticmethod
+    async def archive_files(files: dict[str, Path]) -> AsyncIterator[bytes]:
+        archive = StorageUtils._iterate_archive(files, generic_settings.chunk_size_bytes)
+        try:
+            while (chunk := await file_io_executor.run("archive", next, archive, None)) is not None:
+                yield chunk
+        finally:
+            await file_io_executor.run("archive", archive.close)
 
     @staticmethod
     async def file_chunk_generator(file_paths: list[Path]):
         for file_path in file_paths:
-            with open(file_path, "rb") as f:
-                while chunk := f.read(generic_settings.CHUNK_SIZE):
+            file = await file_io_executor.run("open", open, file_path, "rb")
+            try:
+                while chunk := await file_io_executor.run("read_chunk", file.read, generic_settings.chunk_size_bytes):
                     yield chunk
+            finally:
+                await file_io_executor.run("close", file.close)
 
     @staticmethod
-    async def range_file_chunk_generator(file_path: Path, start_byte: int, end_byte: int):
-        with open(file_path, "rb") as f:
-            f.seek(start_byte)
-            yield f.read(end_byte - start_byte + 1)
+    async def range_file_chunk_generator(
+            file_path: Path,
+            start_byte: int,
+            end_byte: int,
+            chunk_size: int | None = None
+    ) -> AsyncIterator[bytes]:
+        chunk_size = chunk_size or generic_settings.chunk_size_bytes
+        file_descriptor = await file_io_executor.run("open", os.open, file_path, os.O_RDONLY)
+        try:
+            offset = start_byte
+            while offset <= end_byte:
+                chunk = await file_io_executor.run(
+                    "read_chunk",
+                    os.pread,
+                    file_descriptor,
+                    min(chunk_size, end_byte - offset + 1),
+                    offset
+                )
+                if not chunk:
+                    break
+                offset += len(chunk)
+                yield chunk
+        finally:
+            await file_io_executor.run("close", os.close, file_descriptor)
 
     @staticmethod
     async def calculate_file_size(file: bytes) -> float:
@@ -82,9 +394,18 @@ class StorageUtils:
         return True
 
     @staticmethod
-    async def validate_file_integrity(
-            file: bytes,
-            file_type:
+    async def inspect_image(source: bytes | Path) -> tuple[ImageInspection, bytes | None]:
+        return await image_processor.inspect(
+            source=source,
+            max_pixels=generic_settings.IMAGE_MAX_PIXELS,
+            cpu_time_limit=generic_settings.IMAGE_PROCESS_TIMEOUT,
+            strip_metadata=generic_settings.IMAGE_STRIP_METADATA
+        )
+
+    async def validate_image(
+            self,
+            source: bytes | Path,
+            file_type_filter:
             Union[
                 Literal[
                     MessagesTypes.IMAGE,
@@ -93,23 +414,15 @@ class StorageUtils:
                     MessagesTypes.FILE
                 ]
             ]
-    ) -> bool:
-        match file_type:
-            case MessagesTypes.IMAGE:
-                try:
-                    image = Image.open(BytesIO(file))
-                    image.verify()
-                except Exception as e:
-                    print(e)
-                    return False
-            case MessagesTypes.VIDEO:
-                pass
-            case MessagesTypes.AUDIO:
-                pass
-            case MessagesTypes.FILE:
-                pass
-
-        return True
+    ) -> tuple[ImageInspection, bytes | None]:
+        inspection, stripped_file = await self.inspect_image(source=source)
+        match inspection.status:
+            case ImageInspectionStatus.OK:
+                return inspection, stripped_file
+            case ImageInspectionStatus.TOO_MANY_PIXELS:
+                raise ImageDimensionsExceeded(max_pixels=generic_settings.IMAGE_MAX_PIXELS)
+            case _:
+                raise await self._get_integrity_exception(file_type_filter)
 
     @staticmethod
     async def validate_file_type(
@@ -197,7 +510,7 @@ class StorageUtils:
                     MessagesTypes.FILE
                 ]
             ]
-    ) -> None:
+    ) -> bytes:
 
         actual_file_type = await self.detect_file_type(file_type=file_type)
         if actual_file_type != file_type_filter:
@@ -214,8 +527,83 @@ class StorageUtils:
                 size_limit=await self._get_max_upload_size(file_type_filter)
             )
 
-        if not (await self.validate_file_integrity(file=file_content, file_type=actual_file_type)):
-            raise await self._get_integrity_exception(file_type_filter)
+        if actual_file_type != MessagesTypes.IMAGE:
+            return file_content
+
+        _, stripped_file = await self.validate_image(source=file_content, file_type_filter=file_type_filter)
+        return file_content if stripped_file is None else stripped_file
+
+    async def write_validated_file_stream(
+            self,
+            file_path: Path,
+            file_stream: AsyncIterator[bytes],
+            file_type: str,
+            file_type_filter:
+            Union[
+                Literal[
+                    MessagesTypes.IMAGE,
+                    MessagesTypes.VIDEO,
+                    MessagesTypes.AUDIO,
+                    MessagesTypes.FILE
+                ]
+            ]
+    ) -> StoredFile:
+        actual_file_type = await self.detect_file_type(file_type=file_type)
+        if actual_file_type != file_type_filter:
+            raise InvalidFileType(
+                file_type_name=file_type_filter.value,
+                file_types=', '.join(await self._get_allowed_types(file_type_filter))
+            )
+
+        async def process_image(temp_file_path: Path) -> bool:
+            inspection, _ = await self.validate_image(source=temp_file_path, file_type_filter=file_type_filter)
+            return inspection.metadata_stripped
+
+        max_upload_size = await self._get_max_upload_size(file_type_filter)
+        return await self.write_file_stream(
+            file_path=file_path,
+            file_stream=file_stream,
+            max_file_size=max_upload_size * 1024 * 1024,
+            size_exception=FIleToBig(file_type_name=file_type_filter.value, size_limit=max_upload_size),
+            process_file=process_image if actual_file_type == MessagesTypes.IMAGE else None
+        )
+
+    async def validate_file_length(
+            self,
+            file_size: int,
+            file_type: str
+    ) -> None:
+        file_type_filter = await self.detect_file_type(file_type=file_type)
+        max_upload_size = await self._get_max_upload_size(file_type_filter)
+        if file_size > max_upload_size * 1024 * 1024:
+            raise FIleToBig(file_type_name=file_type_filter.value, size_limit=max_upload_size)
+
+    async def validate_stored_file(
+            self,
+            file_path: Path,
+            file_type: str,
+            file_type_filter:
+            Union[
+                Literal[
+                    MessagesTypes.IMAGE,
+                    MessagesTypes.VIDEO,
+                    MessagesTypes.AUDIO,
+                    MessagesTypes.FILE
+                ]
+            ]
+    ) -> StoredFile:
+        actual_file_type = await self.detect_file_type(file_type=file_type)
+        if actual_file_type != file_type_filter:
+            raise InvalidFileType(
+                file_type_name=file_type_filter.value,
+                file_types=', '.join(await self._get_allowed_types(file_type_filter))
+            )
+
+        await self.validate_file_length(file_size=await self.check_file_size(file_path=file_path), file_type=file_type)
+        if actual_file_type == MessagesTypes.IMAGE:
+            await self.validate_image(source=file_path, file_type_filter=file_type_filter)
+
+        return await self.hash_file(file_path=file_path)
 
     async def detect_file_type(
             self,
@@ -0,0 +1 @@
+from .tasks import generate_thumbnails, derive_thumbnails
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+from dependencies import celery_client
+from storage import StorageUtils, get_file_manager, s3_client
+from utilities import generic_settings
+
+
+logger = logging.getLogger(__name__)
+
+
+async def derive_thumbnails(digest: str) -> list[int]:
+    file_manager = get_file_manager()
+    blob_path = file_manager.get_blob_path(digest=digest)
+    try:
+        file_data = await file_manager.read_file(file_path=blob_path)
+    except FileNotFoundError:
+        return list()
+
+    thumbnails = StorageUtils.create_thumbnails(
+        file_data=file_data,
+        sizes=generic_settings.THUMBNAIL_SIZES,
+        image_format=generic_settings.THUMBNAIL_FORMAT,
+        quality=generic_settings.THUMBNAIL_QUALITY
+    )
+    for size, thumbnail_data in thumbnails.items():
+        await file_manager.write_blob_file(
+            file_path=file_manager.get_thumbnail_path(digest=digest, size=size),
+            file_data=thumbnail_data
+        )
+
+    if not await file_manager.file_exists(file_path=blob_path):
+        for size in thumbnails:
+            await file_manager.delete_file(file_path=file_manager.get_thumbnail_path(digest=digest, size=size))
+        return list()
+
+    return list(thumbnails)
+
+
+async def run_thumbnails_derivation(digest: str) -> list[int]:
+    try:
+        return await derive_thumbnails(digest=digest)
+    finally:
+        await s3_client.close()
+
+
+@celery_client.task(name="generate_thumbnails", ignore_result=True)
+def generate_thumbnails(digest: str) -> None:
+    sizes = asyncio.run(run_thumbnails_derivation(digest=digest))
+    logger.info("Generated %s thumbnails for blob %s", len(sizes), digest)
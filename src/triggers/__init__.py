@@ -3,12 +3,7 @@ from .triggers import (
     setup_recipients_change_trigger,
     setup_user_delete_trigger,
     setup_conversation_delete_trigger,
-    setup_messages_delete_trigger
-)
-from .listeners import (
-    setup_unread_messages_changes_listener,
-    setup_recipients_change_listener,
-    setup_user_delete_listener,
-    setup_conversation_delete_listener,
-    setup_messages_delete_listener
+    setup_messages_delete_trigger,
+    setup_media_blobs_trigger
 )
+from .listeners import NotificationsListener, notifications_listener
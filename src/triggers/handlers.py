@@ -1,56 +1,56 @@
 import json
 
 from dependencies import redis_client
-from storage import FileManager
-from utilities import MediaPatches
-
-
-async def handle_unread_messages_changes(user_id: str):
-    await redis_client.publish("user:unread_messages_events", user_id)
+from cache import membership_cache, unread_events_log
+from storage import get_file_manager
+from repository import delete_unreferenced_media_blob
+from utilities import generic_settings
+
+
+async def handle_unread_messages_changes(payload: str):
+    event = json.loads(payload)
+    user_id = event.pop("user_id")
+    sequence = await unread_events_log.append(user_id=user_id, event=event)
+    if sequence is None:
+        return
+    data = json.dumps(
+        {
+            "user_id": user_id,
+            "sequence": sequence,
+            "event": event
+        }
+    )
+    await redis_client.publish(f"user:{user_id}:unread_messages_events", data)
 
 
 async def handle_recipients_change(payload: str):
     row_data = json.loads(payload)
+    await membership_cache.invalidate(users_ids=[row_data.get("user_id")])
     data = json.dumps(
         {
             "user_id": row_data.get("user_id"),
             "conversation_id": row_data.get("conversation_id"),
         }
     )
-    await redis_client.publish("user:recipients_change_events", data)
-
+    await redis_client.publish(f"user:{row_data.get('user_id')}:recipients_change_events", data)
+    await redis_client.publish(f"conversation:{row_data.get('conversation_id')}:recipients_change_events", data)
 
-async def handle_user_delete_changes(avatar_name: str):
-    file_manager = FileManager()
-    filepath = MediaPatches.USERS_AVATARS_FOLDER.value / avatar_name
 
-    if avatar_name is None:
-        return None
-    if not (await file_manager.file_exists(file_path=filepath)):
-        return None
-
-    await file_manager.delete_file(file_path=filepath)
-
-
-async def handle_conversation_delete_changes(avatar_name: str):
-    file_manager = FileManager()
-    filepath = MediaPatches.GROUPS_AVATARS_FOLDER.value / avatar_name
-
-    if avatar_name is None:
-        return None
-    if not (await file_manager.file_exists(file_path=filepath)):
-        return None
-
-    await file_manager.delete_file(file_path=filepath)
+async def handle_user_delete_changes(payload: str):
+    row_data = json.loads(payload)
+    await redis_client.publish(f"user:{row_data.get('id')}:delete_events", "")
 
 
-async def handle_messages_delete_changes(file_content_name: str):
-    file_manager = FileManager()
-    filepath = MediaPatches.MEDIA_MESSAGES_FOLDER.value / file_content_name
+async def handle_media_blobs_release(digest: str):
+    file_manager = get_file_manager()
+    blob_path = file_manager.get_blob_path(digest=digest)
 
-    if file_content_name is None:
-        return None
-    if not (await file_manager.file_exists(file_path=filepath)):
-        return None
+    async def delete_blob_file():
+        for file_path in [
+            blob_path,
+            *(file_manager.get_thumbnail_path(digest=digest, size=size) for size in generic_settings.THUMBNAIL_SIZES)
+        ]:
+            if await file_manager.file_exists(file_path=file_path):
+                await file_manager.delete_file(file_path=file_path)
 
-    await file_manager.delete_file(file_path=filepath)
+    await delete_unreferenced_media_blob(digest=digest, delete_file=delete_blob_file)
@@ -1,61 +1,184 @@
+import os
+import sys
+import json
+import random
 import asyncio
+import logging
 import asyncpg
+from typing import Awaitable, Callable
 
 from .handlers import (
     handle_unread_messages_changes,
     handle_recipients_change,
-    handle_messages_delete_changes,
-    handle_conversation_delete_changes,
-    handle_user_delete_changes
+    handle_user_delete_changes,
+    handle_media_blobs_release
 )
-from utilities import db_settings
+from utilities import db_settings, generic_settings
 
 
-async def setup_unread_messages_changes_listener():
-    asyncpg_engine = await asyncpg.connect(db_settings.asyncpg_postgresql_url)
-    await asyncpg_engine.add_listener(
-        "unread_messages_changes",
-        lambda _, __, ___, payload: asyncio.create_task(handle_unread_messages_changes(payload))
-    )
-    while True:
-        await asyncio.sleep(1)
+logger = logging.getLogger(__name__)
 
 
-async def setup_recipients_change_listener():
-    asyncpg_engine = await asyncpg.connect(db_settings.asyncpg_postgresql_url)
-    await asyncpg_engine.add_listener(
-        "recipients_change",
-        lambda _, __, ___, payload: asyncio.create_task(handle_recipients_change(payload))
-    )
-    while True:
-        await asyncio.sleep(1)
+class NotificationsListener:
+    _LEADER_LOCK_KEY = 0x63686174776176
 
+    def __init__(
+            self,
+            handlers: dict[str, Callable[[str], Awaitable[None]]],
+            workers: int,
+            queue_size: int,
+            reconnect_max_delay: float,
+            leader_retry_interval: float
+    ):
+        self._handlers = handlers
+        self._workers = workers
+        self._queue_size = queue_size
+        self._reconnect_max_delay = reconnect_max_delay
+        self._leader_retry_interval = leader_retry_interval
+        self._queues: list[asyncio.Queue[tuple[str, str]]] = list()
+        self._tasks: list[asyncio.Task] = list()
+        self._connection: asyncpg.Connection | None = None
+        self._paused = False
+        self._is_leader = False
+        self._received_notifications = 0
+        self._handled_notifications = 0
+        self._failed_notifications = 0
+        self._reconnects = 0
+        self._pauses = 0
 
-async def setup_user_delete_listener():
-    asyncpg_engine = await asyncpg.connect(db_settings.asyncpg_postgresql_url)
-    await asyncpg_engine.add_listener(
-        "user_delete",
-        lambda _, __, ___, payload: asyncio.create_task(handle_user_delete_changes(payload))
-    )
-    while True:
-        await asyncio.sleep(1)
+    def start(self) -> None:
+        self._queues = [asyncio.Queue() for _ in range(self._workers)]
+        self._tasks = [asyncio.create_task(self._work(queue)) for queue in self._queues]
+        self._tasks.append(asyncio.create_task(self._run()))
 
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        if self._connection is not None and not self._connection.is_closed():
+            await self._connection.close()
+        self._connection = None
+        self._is_leader = False
 
-async def setup_conversation_delete_listener():
-    asyncpg_engine = await asyncpg.connect(db_settings.asyncpg_postgresql_url)
-    await asyncpg_engine.add_listener(
-        "conversation_delete",
-        lambda _, __, ___, payload: asyncio.create_task(handle_conversation_delete_changes(payload))
-    )
-    while True:
-        await asyncio.sleep(1)
+    def stats(self) -> dict[str, int | bool]:
+        queues_depths = [queue.qsize() for queue in self._queues]
+        return {
+            "pid": os.getpid(),
+            "is_leader": self._is_leader,
+            "paused": self._paused,
+            "workers": self._workers,
+            "queues_depth_total": sum(queues_depths),
+            "queues_depth_max": max(queues_depths, default=0),
+            "queue_size": self._queue_size,
+            "received_notifications": self._received_notifications,
+            "handled_notifications": self._handled_notifications,
+            "failed_notifications": self._failed_notifications,
+            "reconnects": self._reconnects,
+            "pauses": self._pauses
+        }
+
+    async def _run(self) -> None:
+        delay = 1
+        while True:
+            try:
+                await self._listen()
+                delay = 1
+            except (OSError, asyncpg.PostgresError, asyncpg.InterfaceError) as exc:
+                logger.warning("Notifications listener connection lost: %s", exc)
+                self._reconnects += 1
+                await asyncio.sleep(delay + random.uniform(0, delay))
+                delay = min(delay * 2, self._reconnect_max_delay)
+            finally:
+                self._is_leader = False
+                self._paused = False
+                if self._connection is not None and not self._connection.is_closed():
+                    self._connection.terminate()
+                self._connection = None
+
+    async def _listen(self) -> None:
+        terminated = asyncio.Event()
+        self._connection = await asyncpg.connect(db_settings.listener_postgresql_url)
+        self._connection.add_termination_listener(lambda _: terminated.set())
+
+        while not await self._connection.fetchval("SELECT pg_try_advisory_lock($1)", self._LEADER_LOCK_KEY):
+            await asyncio.sleep(self._leader_retry_interval)
+
+        self._is_leader = True
+        for channel in self._handlers:
+            await self._connection.add_listener(channel, self._enqueue)
+
+        while not terminated.is_set():
+            try:
+                await asyncio.wait_for(terminated.wait(), timeout=self._leader_retry_interval)
+            except asyncio.TimeoutError:
+                if not self._paused:
+                    await self._connection.fetchval("SELECT 1")
+
+        raise ConnectionResetError("Notifications listener connection terminated")
 
+    def _enqueue(self, _, __, channel: str, payload: str) -> None:
+        self._received_notifications += 1
+        queue = self._queues[hash(self._shard_key(payload)) % self._workers]
+        queue.put_nowait((channel, payload))
+        if queue.qsize() >= self._queue_size:
+            self._pause_reading()
 
-async def setup_messages_delete_listener():
-    asyncpg_engine = await asyncpg.connect(db_settings.asyncpg_postgresql_url)
-    await asyncpg_engine.add_listener(
-        "messages_delete",
-        lambda _, __, ___, payload: asyncio.create_task(handle_messages_delete_changes(payload))
+    async def _work(self, queue: asyncio.Queue[tuple[str, str]]) -> None:
+        while True:
+            channel, payload = await queue.get()
+            if self._paused and all(worker_queue.qsize() <= self._queue_size // 2 for worker_queue in self._queues):
+                self._resume_reading()
+
+            try:
+                await self._handlers[channel](payload)
+                self._handled_notifications += 1
+            except Exception:
+                self._failed_notifications += 1
+                logger.exception("Failed to handle %s notification", channel)
+
+    def _pause_reading(self) -> None:
+        transport = getattr(self._connection, "_transport", None)
+        if transport is None or self._paused:
+            return None
+
+        transport.pause_reading()
+        self._paused = True
+        self._pauses += 1
+
+    def _resume_reading(self) -> None:
+        transport = getattr(self._connection, "_transport", None)
+        self._paused = False
+        if transport is not None:
+            transport.resume_reading()
+
+    @staticmethod
+    def _shard_key(payload: str) -> str:
+        try:
+            row_data = json.loads(payload)
+        except ValueError:
+            return payload
+        if not isinstance(row_data, dict):
+            return payload
+
+        return str(row_data.get("user_id", row_data.get("id", payload)))
+
+
+if db_settings.DB_PGBOUNCER_MODE and db_settings.DB_LISTENER_HOST is None:
+    sys.exit(
+        "DB_PGBOUNCER_MODE requires DB_LISTENER_HOST pointing directly at PostgreSQL! "
+        "LISTEN and the leader advisory lock do not work through PgBouncer in transaction pooling mode."
     )
-    while True:
-        await asyncio.sleep(1)
+
+notifications_listener = NotificationsListener(
+    handlers={
+        "unread_messages_changes": handle_unread_messages_changes,
+        "recipients_change": handle_recipients_change,
+        "user_delete": handle_user_delete_changes,
+        "media_blobs_release": handle_media_blobs_release
+    },
+    workers=generic_settings.NOTIFICATIONS_WORKERS,
+    queue_size=generic_settings.NOTIFICATIONS_QUEUE_SIZE,
+    reconnect_max_delay=generic_settings.NOTIFICATIONS_RECONNECT_MAX_DELAY,
+    leader_retry_interval=generic_settings.NOTIFICATIONS_LEADER_RETRY_INTERVAL
+)
@@ -7,20 +7,62 @@ from utilities import db_settings
 async def setup_unread_messages_changes_trigger():
     async with session() as cursor:
         await cursor.execute(
-            text("""
+            text(f"""
                 CREATE OR REPLACE FUNCTION unread_messages_changes()
                 RETURNS TRIGGER AS $$
-                DECLARE
-                    user_id INTEGER;
                 BEGIN
                     IF TG_OP = 'INSERT' THEN
-                        user_id := NEW.user_id;
-                        PERFORM pg_notify('unread_messages_changes', user_id::text);
+                        INSERT INTO {db_settings.DB_SCHEMA}.unread_counters AS counters
+                            (user_id, conversation_id, unread_count, last_unread_message_id)
+                        VALUES (NEW.user_id, NEW.conversation_id, 1, NEW.message_id)
+                        ON CONFLICT (user_id, conversation_id) DO UPDATE
+                        SET unread_count = counters.unread_count + 1,
+                            last_unread_message_id = GREATEST(
+                                counters.last_unread_message_id,
+                                EXCLUDED.last_unread_message_id
+                            );
+                        PERFORM pg_notify(
+                            'unread_messages_changes',
+                            json_build_object(
+                                'op', 'added',
+                                'id', NEW.id,
+                                'user_id', NEW.user_id,
+                                'conversation_id', NEW.conversation_id,
+                                'message_id', NEW.message_id,
+                                'call_id', NEW.call_id
+                            )::text
+                        );
                     END IF;
 
                     IF TG_OP = 'DELETE' THEN
-                        user_id := OLD.user_id;
-                        PERFORM pg_notify('unread_messages_changes', user_id::text);
+                        UPDATE {db_settings.DB_SCHEMA}.unread_counters AS counters
+                        SET unread_count = counters.unread_count - 1,
+                            last_unread_message_id = CASE
+                                WHEN counters.last_unread_message_id = OLD.message_id THEN (
+                                    SELECT max(unread.message_id)
+                                    FROM {db_settings.DB_SCHEMA}.unread_messages AS unread
+                                    WHERE unread.user_id = OLD.user_id
+                                      AND unread.conversation_id = OLD.conversation_id
+                                )
+                                ELSE counters.last_unread_message_id
+                            END
+                        WHERE counters.user_id = OLD.user_id
+                          AND counters.conversation_id = OLD.conversation_id;
+                        DELETE FROM {db_settings.DB_SCHEMA}.unread_counters AS counters
+                        WHERE counters.user_id = OLD.user_id
+                          AND counters.conversation_id = OLD.conversation_id
+                          AND counters.unread_count <= 0;
+                        PERFORM pg_notify(
+                            'unread_messages_changes',
+                            json_build_object(
+                                'op', 'removed',
+                                'id', OLD.id,
+                                'user_id', OLD.user_id,
+                                'conversation_id', OLD.conversation_id,
+                                'message_id', OLD.message_id,
+                                'call_id', OLD.call_id
+                            )::text
+                        );
                     END IF;
 
                     RETURN NULL;
@@ -58,6 +100,14 @@ async def setup_recipients_change_trigger():
                                 'conversation_id', NEW.conversation_id
                             )::text
                         );
+                    ELSIF TG_OP = 'UPDATE' THEN
+                        PERFORM pg_notify(
+                            'recipients_change',
+                            json_build_object(
+                                'user_id', NEW.user_id,
+                                'conversation_id', NEW.conversation_id
+                            )::text
+                        );
                     ELSIF TG_OP = 'DELETE' THEN
                         PERFORM pg_notify(
                             'recipients_change',
@@ -79,7 +129,7 @@ async def setup_recipients_change_trigger():
         await cursor.execute(
             text(f"""
                 CREATE TRIGGER recipients_change_trigger
-                AFTER INSERT OR DELETE ON {db_settings.DB_SCHEMA}.conversations_members
+                AFTER INSERT OR UPDATE OF role OR DELETE ON {db_settings.DB_SCHEMA}.conversations_members
                 FOR EACH ROW
                 EXECUTE FUNCTION recipients_change()
             """)
@@ -88,18 +138,79 @@ async def setup_recipients_change_trigger():
         await cursor.commit()
 
 
+async def setup_media_blobs_trigger():
+    async with session() as cursor:
+        await cursor.execute(
+            text(f"""
+                CREATE OR REPLACE FUNCTION release_media_blob(blob_digest TEXT)
+                RETURNS VOID AS $$
+                BEGIN
+                    IF blob_digest IS NULL THEN
+                        RETURN;
+                    END IF;
+
+                    UPDATE {db_settings.DB_SCHEMA}.media_blobs AS blobs
+                    SET refcount = blobs.refcount - 1
+                    WHERE blobs.digest = blob_digest;
+                    DELETE FROM {db_settings.DB_SCHEMA}.media_blobs AS blobs
+                    WHERE blobs.digest = blob_digest
+                      AND blobs.refcount <= 0;
+                    IF FOUND THEN
+                        PERFORM pg_notify('media_blobs_release', blob_digest);
+                    END IF;
+                END;
+                $$ LANGUAGE plpgsql;
+            """)
+        )
+        await cursor.execute(
+            text("""
+                CREATE OR REPLACE FUNCTION media_reference_change()
+                RETURNS TRIGGER AS $$
+                DECLARE
+                    old_digest TEXT := to_jsonb(OLD) ->> TG_ARGV[0];
+                BEGIN
+                    IF old_digest IS DISTINCT FROM to_jsonb(NEW) ->> TG_ARGV[0] THEN
+                        PERFORM release_media_blob(old_digest);
+                    END IF;
+
+                    RETURN NULL;
+                END;
+                $$ LANGUAGE plpgsql;
+            """)
+        )
+        for table_name, column_name in (
+                ("messages", "file_content_name"),
+                ("users", "avatar_name"),
+                ("conversations", "avatar_name")
+        ):
+            await cursor.execute(
+                text(f"DROP TRIGGER IF EXISTS {table_name}_media_change_trigger ON {db_settings.DB_SCHEMA}.{table_name}")
+            )
+            await cursor.execute(
+                text(f"""
+                    CREATE TRIGGER {table_name}_media_change_trigger
+                    AFTER UPDATE OF {column_name} ON {db_settings.DB_SCHEMA}.{table_name}
+                    FOR EACH ROW
+                    EXECUTE FUNCTION media_reference_change('{column_name}')
+                """)
+            )
+
+        await cursor.commit()
+
+
 async def setup_user_delete_trigger():
     async with session() as cursor:
         await cursor.execute(
             text("""
                 CREATE OR REPLACE FUNCTION user_delete()
                 RETURNS TRIGGER AS $$
-                DECLARE
-                    avatar_name TEXT;
                 BEGIN
                     IF TG_OP = 'DELETE' THEN
-                        avatar_name := OLD.avatar_name;
-                        PERFORM pg_notify('user_delete', avatar_name::text);
+                        PERFORM release_media_blob(OLD.avatar_name);
+                        PERFORM pg_notify(
+                            'user_delete',
+                            json_build_object('id', OLD.id)::text
+                        );
                     END IF;
 
                     RETURN NULL;
@@ -128,12 +239,9 @@ async def setup_conversation_delete_trigger():
             text("""
                 CREATE OR REPLACE FUNCTION conversation_delete()
                 RETURNS TRIGGER AS $$
-                DECLARE
-                    avatar_name TEXT;
                 BEGIN
                     IF TG_OP = 'DELETE' THEN
-                        avatar_name := OLD.avatar_name;
-                        PERFORM pg_notify('conversation_delete', avatar_name::text);
+                        PERFORM release_media_blob(OLD.avatar_name);
                     END IF;
 
                     RETURN NULL;
@@ -162,12 +270,9 @@ async def setup_messages_delete_trigger():
             text("""
                 CREATE OR REPLACE FUNCTION messages_delete()
                 RETURNS TRIGGER AS $$
-                DECLARE
-                    file_content_name TEXT;
                 BEGIN
                     IF TG_OP = 'DELETE' THEN
-                        file_content_name := OLD.file_content_name;
-                        PERFORM pg_notify('messages_delete', file_content_name::text);
+                        PERFORM release_media_blob(OLD.file_content_name);
                     END IF;
 
                     RETURN NULL;
@@ -16,7 +16,13 @@ from .types_storage import (
     datetime_auto_update,
     MediaPatches,
     EntitiesTypes,
-    AppModes
+    AppModes,
+    MediaDeliveryModes,
+    StorageBackends,
+    ImageInspectionStatus,
+    PaginationDirections,
+    SearchModes,
+    SnippetMarkers
 )
 from .hashing import Hash, JWT, oauth2_scheme
 from .types_converters import sqlalchemy_to_pydantic, many_sqlalchemy_to_pydantic
@@ -39,8 +45,17 @@ from .exceptions_storage import (
     MessageNotFound,
     UserNotInConversation,
     FileRangeError,
-    UnreadMessageAlreadyExists
+    InvalidCursorError,
+    WebsocketConnectionClosed,
+    UploadSessionNotFound,
+    UploadOffsetMismatch,
+    UploadSessionLocked,
+    UploadLengthExceeded,
+    UploadIncomplete,
+    ObjectStorageError,
+    ImageDimensionsExceeded
 )
+from .cursors import encode_cursor, decode_cursor
 from .models_validators import (
     validate_password,
     validate_nicknames,
@@ -0,0 +1,23 @@
+import json
+import base64
+import binascii
+
+from .exceptions_storage import InvalidCursorError
+
+
+def encode_cursor(payload: dict[str, any]) -> str:
+    raw_data = json.dumps(payload, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw_data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> dict[str, any]:
+    padding = "=" * (-len(cursor) % 4)
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        raise InvalidCursorError()
+
+    if not isinstance(payload, dict):
+        raise InvalidCursorError()
+
+    return payload
@@ -10,8 +10,10 @@ class InvalidCredentials(Exception):
 
 
 class UserNotFoundError(Exception):
-    def __init__(self, user_id: int | None = None):
-        if user_id is None:
+    def __init__(self, user_id: int | None = None, users_ids: list[int] | None = None):
+        if users_ids:
+            detail = f"Users with ids ({', '.join(map(str, users_ids))}) not found"
+        elif user_id is None:
             detail = "User not found"
         else:
             detail = f"User with id ({user_id}) not found"
@@ -19,8 +21,10 @@ class UserNotFoundError(Exception):
 
 
 class ConversationNotFoundError(Exception):
-    def __init__(self, conversation_id: int | None = None):
-        if conversation_id is None:
+    def __init__(self, conversation_id: int | None = None, conversations_ids: list[int] | None = None):
+        if conversations_ids:
+            detail = f"Conversations with ids ({', '.join(map(str, conversations_ids))}) not found"
+        elif conversation_id is None:
             detail = "Conversation not found"
         else:
             detail = f"Conversation with id ({conversation_id}) not found"
@@ -108,6 +112,12 @@ class ImageCorrupted(Exception):
         super().__init__(detail)
 
 
+class ImageDimensionsExceeded(Exception):
+    def __init__(self, max_pixels: int):
+        detail = f"Image dimensions exceed the limit of ({max_pixels}) pixels"
+        super().__init__(detail)
+
+
 class ChatAlreadyExists(Exception):
     def __init__(self, chat_id: int | None = None):
         if chat_id is None:
@@ -130,8 +140,15 @@ class FileNotFound(Exception):
 
 
 class UserAlreadyInConversation(Exception):
-    def __init__(self, user_id: int | None = None, conversation_id: int | None = None):
-        if user_id is None:
+    def __init__(
+            self,
+            user_id: int | None = None,
+            conversation_id: int | None = None,
+            users_ids: list[int] | None = None
+    ):
+        if users_ids:
+            detail = f"Users with ids ({', '.join(map(str, users_ids))}) already in conversation with id ({conversation_id})"
+        elif user_id is None:
             detail = "User already in conversation"
         else:
             detail = f"User with id ({user_id}) already in conversation with id ({conversation_id})"
@@ -139,8 +156,20 @@ class UserAlreadyInConversation(Exception):
 
 
 class UserNotInConversation(Exception):
-    def __init__(self, user_id: int | None = None, conversation_id: int | None = None):
-        if user_id is None:
+    def __init__(
+            self,
+            user_id: int | None = None,
+            conversation_id: int | None = None,
+            users_ids: list[int] | None = None,
+            conversations_ids: list[int] | None = None
+    ):
+        if users_ids:
+            detail = f"Users with ids ({', '.join(map(str, users_ids))}) not in conversation with id ({conversation_id})"
+        elif conversations_ids:
+            detail = (
+                f"User with id ({user_id}) not in conversations with ids ({', '.join(map(str, conversations_ids))})"
+            )
+        elif user_id is None:
             detail = "User not in conversation"
         else:
             detail = f"User with id ({user_id}) not in conversation with id ({conversation_id})"
@@ -148,8 +177,10 @@ class UserNotInConversation(Exception):
 
 
 class MessageNotFound(Exception):
-    def __init__(self, message_id: int | None = None):
-        if message_id is None:
+    def __init__(self, message_id: int | None = None, messages_ids: list[int] | None = None):
+        if messages_ids:
+            detail = f"Messages with ids ({', '.join(map(str, messages_ids))}) not found"
+        elif message_id is None:
             detail = "Message not found"
         else:
             detail = f"Message with id ({message_id}) not found"
@@ -157,15 +188,64 @@ class MessageNotFound(Exception):
 
 
 class FileRangeError(Exception):
-    def __init__(self):
+    def __init__(self, file_size: int | None = None):
+        self.file_size = file_size
         detail = "File range error"
         super().__init__(detail)
 
 
-class UnreadMessageAlreadyExists(Exception):
-    def __init__(self, user_id: int | None = None):
-        if user_id is None:
-            detail = "Unread message already exists"
+class InvalidCursorError(Exception):
+    def __init__(self):
+        detail = "Invalid pagination cursor"
+        super().__init__(detail)
+
+
+class WebsocketConnectionClosed(Exception):
+    def __init__(self, code: int, reason: str):
+        self.code = code
+        self.reason = reason
+        super().__init__(reason)
+
+
+class UploadSessionNotFound(Exception):
+    def __init__(self, upload_id: str | None = None):
+        if upload_id is None:
+            detail = "Upload session not found"
         else:
-            detail = f"Unread message already exists for user with id ({user_id})"
+            detail = f"Upload session with id ({upload_id}) not found"
+        super().__init__(detail)
+
+
+class UploadOffsetMismatch(Exception):
+    def __init__(self, offset: int):
+        self.offset = offset
+        detail = f"Upload offset mismatch, expected offset ({offset})"
+        super().__init__(detail)
+
+
+class UploadSessionLocked(Exception):
+    def __init__(self):
+        detail = "Upload session is being written by another request"
+        super().__init__(detail)
+
+
+class UploadLengthExceeded(Exception):
+    def __init__(self, file_size: int):
+        detail = f"Upload data exceeds declared file size ({file_size} bytes)"
+        super().__init__(detail)
+
+
+class UploadIncomplete(Exception):
+    def __init__(self, offset: int, file_size: int):
+        detail = f"Upload is incomplete, received ({offset}) of ({file_size}) bytes"
+        super().__init__(detail)
+
+
+class ObjectStorageError(Exception):
+    def __init__(self, status_code: int, code: str | None = None):
+        self.status_code = status_code
+        self.code = code
+        detail = f"Object storage request failed with status ({status_code})"
+        if code is not None:
+            detail = f"{detail} and code ({code})"
         super().__init__(detail)
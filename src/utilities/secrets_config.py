@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from pydantic import ConfigDict
+from pydantic import ConfigDict, Field, AliasChoices
 from pathlib import Path
 
 from .random_generators import generate_jwt_token
@@ -18,6 +18,14 @@ class DBSettings(BaseSettings):
     TEST_DB_HOST: str = "localhost"
     TEST_DB_PORT: int = 5432
     DB_SCHEMA: str = "chatwave"
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_PGBOUNCER_MODE: bool = False
+    DB_LISTENER_HOST: str | None = None
+    DB_LISTENER_PORT: int | None = None
 
     @property
     def sqlalchemy_postgresql_url(self):
@@ -31,6 +39,12 @@ class DBSettings(BaseSettings):
     def asyncpg_postgresql_url(self):
         return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{self.DB_HOST}:{self.DB_PORT}/{self.DB_DATABASE}"
 
+    @property
+    def listener_postgresql_url(self):
+        listener_host = self.DB_LISTENER_HOST or self.DB_HOST
+        listener_port = self.DB_LISTENER_PORT or self.DB_PORT
+        return f"postgresql://{self.DB_USER}:{self.DB_PASSWORD}@{listener_host}:{listener_port}/{self.DB_DATABASE}"
+
     model_config = ConfigDict(extra="allow", env_file=".env")
 
 
@@ -110,8 +124,58 @@ class GenericSettings(BaseSettings):
     MAX_UPLOAD_VIDEO_SIZE: int = 8192
     MAX_UPLOAD_AUDIO_SIZE: int = 512
     MAX_UPLOAD_FILE_SIZE: int = 16384
-    CHUNK_SIZE: int = 16
+    CHUNK_SIZE_MB: int = Field(16, validation_alias=AliasChoices("CHUNK_SIZE_MB", "CHUNK_SIZE"))
+    UPLOAD_CHUNK_SIZE_KB: int = Field(1024, validation_alias=AliasChoices("UPLOAD_CHUNK_SIZE_KB", "UPLOAD_CHUNK_SIZE"))
     MAX_ITEMS_PER_REQUEST: int = 100
+    MEMBERSHIP_CACHE_TTL: int = 300
+    MEMBERSHIP_CACHE_MAX_USERS: int = 10000
+    UNREAD_EVENTS_HISTORY_SIZE: int = 1000
+    UNREAD_EVENTS_HISTORY_TTL: int = 86400
+    WEBSOCKET_QUEUE_SIZE: int = 256
+    NOTIFICATIONS_WORKERS: int = 4
+    NOTIFICATIONS_QUEUE_SIZE: int = 1000
+    NOTIFICATIONS_RECONNECT_MAX_DELAY: int = 30
+    NOTIFICATIONS_LEADER_RETRY_INTERVAL: int = 5
+    FILE_IO_THREADS: int = 16
+    UPLOAD_SESSION_TTL: int = 86400
+    UPLOAD_SESSIONS_GC_INTERVAL: int = 3600
+    MAX_BYTE_RANGES: int = 16
+    MEDIA_DELIVERY_MODE: str = "stream"
+    X_ACCEL_REDIRECT_PREFIX: str = "/protected-media"
+    STORAGE_BACKEND: str = "local"
+    S3_ENDPOINT_URL: str = "http://localhost:9000"
+    S3_PUBLIC_ENDPOINT_URL: str | None = None
+    S3_REGION: str = "us-east-1"
+    S3_BUCKET: str = "chatwave"
+    S3_ACCESS_KEY: str = ""
+    S3_SECRET_KEY: str = ""
+    S3_MULTIPART_CHUNK_SIZE_MB: int = Field(
+        8,
+        validation_alias=AliasChoices("S3_MULTIPART_CHUNK_SIZE_MB", "S3_MULTIPART_CHUNK_SIZE")
+    )
+    S3_PRESIGNED_URL_TTL: int = 300
+    THUMBNAIL_SIZES: list[int] = [64, 256, 1024]
+    THUMBNAIL_FORMAT: str = "webp"
+    THUMBNAIL_QUALITY: int = 80
+    IMAGE_PROCESS_WORKERS: int = 2
+    IMAGE_PROCESS_TIMEOUT: float = 5
+    IMAGE_MAX_PIXELS: int = 50000000
+    IMAGE_STRIP_METADATA: bool = True
+    MESSAGES_SEARCH_LANGUAGE: str = "simple"
+    MESSAGES_SEARCH_SNIPPET_WORDS: int = 20
+    METRICS_TOKEN: str | None = None
+
+    @property
+    def chunk_size_bytes(self) -> int:
+        return self.CHUNK_SIZE_MB * 1024 * 1024
+
+    @property
+    def upload_chunk_size_bytes(self) -> int:
+        return self.UPLOAD_CHUNK_SIZE_KB * 1024
+
+    @property
+    def s3_multipart_chunk_size_bytes(self) -> int:
+        return self.S3_MULTIPART_CHUNK_SIZE_MB * 1024 * 1024
 
     model_config = ConfigDict(extra="allow", env_file=".env")
 
@@ -57,10 +57,45 @@ class CallsStatus(str, Enum):
     MISSED = 'missed'
 
 
+class PaginationDirections(str, Enum):
+    BEFORE = 'before'
+    AFTER = 'after'
+
+
+class SearchModes(str, Enum):
+    WORDS = 'words'
+    SUBSTRING = 'substring'
+
+
+class SnippetMarkers(str, Enum):
+    START = '\x02'
+    STOP = '\x03'
+
+
 class MediaPatches(Enum):
     USERS_AVATARS_FOLDER = generic_settings.MEDIA_FOLDER / "users" / "avatars"
     GROUPS_AVATARS_FOLDER = generic_settings.MEDIA_FOLDER / "groups" / "avatars"
     MEDIA_MESSAGES_FOLDER = generic_settings.MEDIA_FOLDER / "messages" / "media"
+    MEDIA_UPLOADS_FOLDER = generic_settings.MEDIA_FOLDER / "messages" / "uploads"
+    MEDIA_BLOBS_FOLDER = generic_settings.MEDIA_FOLDER / "blobs"
+
+
+class MediaDeliveryModes(Enum):
+    STREAM = "stream"
+    X_ACCEL = "x-accel"
+    PRESIGNED = "presigned"
+
+
+class ImageInspectionStatus(str, Enum):
+    OK = "ok"
+    CORRUPTED = "corrupted"
+    TOO_MANY_PIXELS = "too_many_pixels"
+    TIMEOUT = "timeout"
+
+
+class StorageBackends(Enum):
+    LOCAL = "local"
+    S3 = "s3"
 
 
 class AppModes(Enum):
@@ -1,5 +1,4 @@
 from .conversations import (
-    get_conversations_ids_from_user_obj,
     validate_user_in_group,
     validate_user_in_chat,
     validate_user_in_conversation,
@@ -8,7 +7,9 @@ from .conversations import (
     validate_user_in_groups,
     validate_users_in_same_chat,
     conversation_is_group,
-    validate_users_in_conversation
+    validate_users_in_conversation,
+    validate_users_not_in_conversation,
+    get_user_membership
 )
 from .messages import (
     validate_user_is_message_owner,
@@ -21,4 +22,3 @@ from .users import (
     verify_user_is_existed,
     verify_users_is_existed
 )
-from .unread_messages import validate_unread_message_doesnt_exist
@@ -1,11 +1,10 @@
 from repository import (
     is_conversation_exists,
-    select_user,
+    select_existed_conversations_ids,
     select_conversation_type,
-    select_conversation_by_id,
-    select_conversation_member_role
+    select_conversation_members_ids
 )
-from models import Users
+from cache import membership_cache, Membership
 from utilities import (
     ConversationNotFoundError,
     AccessDeniedError,
@@ -13,35 +12,25 @@ from utilities import (
     IsNotAGroupError,
     IsNotAChatError,
     ConversationMemberRoles,
-    ChatAlreadyExists, UserNotInConversation
+    ChatAlreadyExists,
+    UserNotInConversation,
+    UserAlreadyInConversation
 )
 
 
-async def get_conversations_ids_from_user_obj(user_obj: Users) -> list[int]:
-    temp = list()
-    for conversation_obj in user_obj.conversations:
-        temp.append(conversation_obj.id)
-
-    return temp
-
-
-async def get_chats_ids_from_user_obj(user_obj: Users) -> list[int]:
-    temp = list()
-    for conversation_obj in user_obj.conversations:
-        if conversation_obj.type == ConversationTypes.PRIVATE:
-            temp.append(conversation_obj.id)
-
-    return temp
-
-
 async def conversation_is_existed(conversation_id: int) -> None:
     if not (await is_conversation_exists(conversation_id=conversation_id)):
         raise ConversationNotFoundError(conversation_id=conversation_id)
 
 
 async def conversations_is_existed(conversations_ids: list[int]) -> None:
-    for conversation_id in conversations_ids:
-        await conversation_is_existed(conversation_id=conversation_id)
+    existed_conversations_ids = set(await select_existed_conversations_ids(conversations_ids=conversations_ids))
+    missing_conversations_ids = [
+        conversation_id for conversation_id in dict.fromkeys(conversations_ids)
+        if conversation_id not in existed_conversations_ids
+    ]
+    if missing_conversations_ids:
+        raise ConversationNotFoundError(conversations_ids=missing_conversations_ids)
 
 
 async def conversation_is_group(conversation_id: int) -> None:
@@ -54,92 +43,99 @@ async def conversation_is_chat(conversation_id: int) -> None:
         raise IsNotAChatError(conversation_id=conversation_id)
 
 
-async def validate_user_in_group(user_id: int, group_id: int):
-    await conversation_is_existed(conversation_id=group_id)
-    await conversation_is_group(conversation_id=group_id)
+async def get_user_membership(
+        user_id: int,
+        conversation_id: int,
+        conversation_type: ConversationTypes | None = None
+) -> Membership:
+    membership = await membership_cache.get_membership(user_id=user_id, conversation_id=conversation_id)
+    if membership is None:
+        await conversation_is_existed(conversation_id=conversation_id)
+        if conversation_type == ConversationTypes.GROUP:
+            await conversation_is_group(conversation_id=conversation_id)
+        elif conversation_type == ConversationTypes.PRIVATE:
+            await conversation_is_chat(conversation_id=conversation_id)
+        raise UserNotInConversation(user_id=user_id, conversation_id=conversation_id)
 
-    current_user_obj = await select_user(user_id)
-    current_user_conversations_ids = await get_conversations_ids_from_user_obj(current_user_obj)
-    if group_id not in current_user_conversations_ids:
-        raise UserNotInConversation(user_id=user_id, conversation_id=group_id)
+    if conversation_type == ConversationTypes.GROUP and membership[1] != ConversationTypes.GROUP:
+        raise IsNotAGroupError(conversation_id=conversation_id)
+    if conversation_type == ConversationTypes.PRIVATE and membership[1] != ConversationTypes.PRIVATE:
+        raise IsNotAChatError(conversation_id=conversation_id)
 
+    return membership
 
-async def validate_user_in_groups(user_id: int, groups_ids: list[int]):
-    await conversations_is_existed(conversations_ids=groups_ids)
 
-    user_obj = await select_user(user_id=user_id)
-    user_conversations_ids = await get_conversations_ids_from_user_obj(user_obj)
-    for group_id in groups_ids:
-        await conversation_is_group(conversation_id=group_id)
+async def validate_user_in_group(user_id: int, group_id: int):
+    await get_user_membership(user_id=user_id, conversation_id=group_id, conversation_type=ConversationTypes.GROUP)
+
 
-        if group_id not in user_conversations_ids:
-            raise UserNotInConversation(user_id=user_id, conversation_id=group_id)
+async def validate_user_in_groups(user_id: int, groups_ids: list[int]):
+    await validate_user_in_conversations(
+        user_id=user_id,
+        conversations_ids=groups_ids,
+        conversation_type=ConversationTypes.GROUP
+    )
 
 
 async def validate_user_in_chat(user_id: int, chat_id: int):
-    await conversation_is_existed(conversation_id=chat_id)
-    await conversation_is_chat(conversation_id=chat_id)
-
-    current_user_obj = await select_user(user_id)
-    current_user_conversations_ids = await get_conversations_ids_from_user_obj(current_user_obj)
-    if chat_id not in current_user_conversations_ids:
-        raise UserNotInConversation(user_id=user_id, conversation_id=chat_id)
+    await get_user_membership(user_id=user_id, conversation_id=chat_id, conversation_type=ConversationTypes.PRIVATE)
 
 
 async def validate_users_in_same_chat(user_id: int, recipient_id: int):
-    user_obj = await select_user(user_id=user_id)
-    recipient_obj = await select_user(user_id=recipient_id)
-
-    user_chats_ids = await get_chats_ids_from_user_obj(user_obj)
-    recipient_chats_ids = await get_chats_ids_from_user_obj(recipient_obj)
+    user_memberships = await membership_cache.get_memberships(user_id=user_id)
+    recipient_memberships = await membership_cache.get_memberships(user_id=recipient_id)
 
-    for user_chat_id in user_chats_ids:
-        if user_chat_id in recipient_chats_ids:
-            raise ChatAlreadyExists(chat_id=user_chat_id)
+    for conversation_id, (_, conversation_type) in user_memberships.items():
+        if conversation_type != ConversationTypes.PRIVATE:
+            continue
+        if conversation_id in recipient_memberships:
+            raise ChatAlreadyExists(chat_id=conversation_id)
 
 
 async def validate_user_in_conversation(user_id: int, conversation_id: int) -> None:
-    await conversation_is_existed(conversation_id=conversation_id)
-
-    current_user_obj = await select_user(user_id=user_id)
-    current_user_conversations_ids = await get_conversations_ids_from_user_obj(current_user_obj)
-    if conversation_id not in current_user_conversations_ids:
-        raise UserNotInConversation(user_id=user_id, conversation_id=conversation_id)
+    await get_user_membership(user_id=user_id, conversation_id=conversation_id)
 
 
 async def validate_users_in_conversation(users_ids: list[int], conversation_id: int) -> None:
-    await conversation_is_existed(conversation_id=conversation_id)
-
-    for user_id in users_ids:
-        current_user_obj = await select_user(user_id=user_id)
-        current_user_conversations_ids = await get_conversations_ids_from_user_obj(current_user_obj)
-        if conversation_id not in current_user_conversations_ids:
-            raise UserNotInConversation(user_id=user_id, conversation_id=conversation_id)
-
-
-async def validate_user_in_conversations(user_id: int, conversations_ids: list[int]) -> None:
-    current_user_obj = await select_user(user_id=user_id)
-    current_user_conversations_ids = await get_conversations_ids_from_user_obj(current_user_obj)
-
-    for conversation_id in conversations_ids:
+    members_ids = set(await select_conversation_members_ids(conversation_id=conversation_id, users_ids=users_ids))
+    missing_users_ids = [user_id for user_id in dict.fromkeys(users_ids) if user_id not in members_ids]
+    if missing_users_ids:
         await conversation_is_existed(conversation_id=conversation_id)
-
-        if conversation_id not in current_user_conversations_ids:
-            raise UserNotInConversation(user_id=user_id, conversation_id=conversation_id)
+        raise UserNotInConversation(users_ids=missing_users_ids, conversation_id=conversation_id)
+
+
+async def validate_users_not_in_conversation(users_ids: list[int], conversation_id: int) -> None:
+    members_ids = await select_conversation_members_ids(conversation_id=conversation_id, users_ids=users_ids)
+    if members_ids:
+        raise UserAlreadyInConversation(users_ids=sorted(set(members_ids)), conversation_id=conversation_id)
+
+
+async def validate_user_in_conversations(
+        user_id: int,
+        conversations_ids: list[int],
+        conversation_type: ConversationTypes | None = None
+) -> None:
+    memberships = await membership_cache.get_memberships(user_id=user_id)
+    missing_conversations_ids = [
+        conversation_id for conversation_id in dict.fromkeys(conversations_ids)
+        if conversation_id not in memberships
+    ]
+    if missing_conversations_ids:
+        await conversations_is_existed(conversations_ids=missing_conversations_ids)
+        raise UserNotInConversation(user_id=user_id, conversations_ids=missing_conversations_ids)
+
+    if conversation_type is None:
+        return
+    for conversation_id in conversations_ids:
+        if memberships[conversation_id][1] == conversation_type:
+            continue
+        if conversation_type == ConversationTypes.GROUP:
+            raise IsNotAGroupError(conversation_id=conversation_id)
+        raise IsNotAChatError(conversation_id=conversation_id)
 
 
 async def validate_user_can_manage_conversation(user_id: int, conversation_id: int) -> None:
-    await conversation_is_existed(conversation_id=conversation_id)
-
-    conversation_obj = await select_conversation_by_id(conversation_id=conversation_id)
-    conversation_type = conversation_obj.type
-    user_role = await select_conversation_member_role(
-        user_id=user_id,
-        conversation_id=conversation_id
-    )
-
-    if user_role is None:
-        raise UserNotInConversation(user_id=user_id, conversation_id=conversation_id)
+    user_role, conversation_type = await get_user_membership(user_id=user_id, conversation_id=conversation_id)
 
     if conversation_type == ConversationTypes.GROUP:
         if user_role == ConversationMemberRoles.MEMBER:
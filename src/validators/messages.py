@@ -1,18 +1,16 @@
-from validators.conversations import conversation_is_existed
 from repository import (
     is_message_exists,
+    select_existed_messages_ids,
     select_message,
-    select_messages,
-    select_conversation_member_role
+    select_messages
 )
 from utilities import (
     MessageNotFound,
     AccessDeniedError,
     ConversationTypes,
-    ConversationMemberRoles,
-    UserNotInConversation
+    ConversationMemberRoles
 )
-from validators import validate_user_in_conversation, validate_user_in_conversations
+from validators import validate_user_in_conversation, validate_user_in_conversations, get_user_membership
 
 
 async def get_conversations_ids_from_messages(messages_objs: list) -> list[int]:
@@ -29,8 +27,12 @@ async def message_is_existed(message_id: int) -> None:
 
 
 async def messages_is_existed(messages_ids: list[int]) -> None:
-    for message_id in messages_ids:
-        await message_is_existed(message_id=message_id)
+    existed_messages_ids = set(await select_existed_messages_ids(messages_ids=messages_ids))
+    missing_messages_ids = [
+        message_id for message_id in dict.fromkeys(messages_ids) if message_id not in existed_messages_ids
+    ]
+    if missing_messages_ids:
+        raise MessageNotFound(messages_ids=missing_messages_ids)
 
 
 async def validate_user_is_message_owner(user_id: int, message_id: int) -> None:
@@ -64,17 +66,11 @@ async def validate_user_can_manage_messages(user_id: int, messages_ids: list[int
     messages_objs = await select_messages(messages_ids=messages_ids)
 
     for message_obj in messages_objs:
-        await conversation_is_existed(conversation_id=message_obj.conversation_id)
-
-        conversation_type = message_obj.conversation.type
-        user_role = await select_conversation_member_role(
+        user_role, conversation_type = await get_user_membership(
             user_id=user_id,
             conversation_id=message_obj.conversation_id
         )
 
-        if user_role is None:
-            raise UserNotInConversation(user_id=user_id, conversation_id=message_obj.conversation_id)
-
         if conversation_type == ConversationTypes.GROUP:
             if user_role == ConversationMemberRoles.MEMBER and message_obj.sender_id != user_id:
                 raise AccessDeniedError()
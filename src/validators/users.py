@@ -2,7 +2,7 @@ from fastapi import Depends
 from typing import Annotated
 
 from dependencies import verify_token
-from repository import is_user_exists
+from repository import is_user_exists, select_existed_users_ids
 from utilities import UserNotFoundError
 
 
@@ -12,8 +12,10 @@ async def verify_user_is_existed(user_id: int) -> None:
 
 
 async def verify_users_is_existed(users_ids: list[int]) -> None:
-    for user_id in users_ids:
-        await verify_user_is_existed(user_id=user_id)
+    existed_users_ids = set(await select_existed_users_ids(users_ids=users_ids))
+    missing_users_ids = [user_id for user_id in dict.fromkeys(users_ids) if user_id not in existed_users_ids]
+    if missing_users_ids:
+        raise UserNotFoundError(users_ids=missing_users_ids)
 
 
 async def verify_current_user_is_existed(current_user_id: Annotated[int, Depends(verify_token)]) -> None:
@@ -0,0 +1,602 @@
+import pytest
+import pathlib
+from fastapi.testclient import TestClient
+from sqlalchemy import select, func, delete
+
+from fixtures.authorization_fixtures import authorized_test_client
+from fixtures.conversations_fixtures import create_group, create_group_messages, create_group_member
+from database import session_factory
+from models import Messages, MediaBlobs
+from storage import FileManager
+from utilities import MediaPatches
+
+
+async def count_media_state(conversation_id: int) -> tuple[int, int]:
+    async with session_factory() as session:
+        messages_count = await session.scalar(
+            select(func.count()).select_from(Messages).filter_by(conversation_id=conversation_id)
+        )
+        refcount = await session.scalar(select(func.coalesce(func.sum(MediaBlobs.refcount), 0)))
+        return messages_count, refcount
+
+
+async def test_get_messages_by_offset(client: TestClient, authorized_test_client, create_group, create_group_messages):
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={"limit": 3, "offset": 1}
+    )
+
+    assert response.status_code == 200
+    assert [message["id"] for message in response.json()] == create_group_messages[::-1][1:4]
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_get_messages_by_cursor(client: TestClient, authorized_test_client, create_group, create_group_messages):
+    newest_message = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={"limit": 1}
+    ).json()[0]
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={
+            "limit": 2,
+            "before_id": newest_message["id"],
+            "before_created_at": newest_message["created_at"]
+        }
+    )
+    assert response.status_code == 200
+    assert [message["id"] for message in response.json()] == create_group_messages[::-1][1:3]
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert response.status_code == 200
+    assert [message["id"] for message in response.json()] == create_group_messages[::-1][3:5]
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={"limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert response.status_code == 200
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+
+async def test_get_messages_after_cursor(client: TestClient, authorized_test_client, create_group, create_group_messages):
+    oldest_message = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={"limit": 1, "offset": len(create_group_messages) - 1}
+    ).json()[0]
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={
+            "limit": 2,
+            "after_id": oldest_message["id"],
+            "after_created_at": oldest_message["created_at"]
+        }
+    )
+    assert response.status_code == 200
+    assert [message["id"] for message in response.json()] == create_group_messages[2:0:-1]
+    assert response.headers["X-Next-Cursor"]
+
+
+@pytest.mark.parametrize(
+    "query_params",
+    [
+        {"cursor": "not-a-cursor"},
+        {"before_id": 1},
+        {"before_id": 1, "before_created_at": "2025-01-01T00:00:00", "after_id": 1, "after_created_at": "2025-01-01T00:00:00"},
+    ]
+)
+async def test_get_messages_invalid_cursor(client: TestClient, authorized_test_client, create_group, query_params):
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params=query_params
+    )
+
+    assert response.status_code == 400
+
+
+async def test_get_messages_marks_messages_read(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_messages,
+        create_group_member
+):
+    for message_id in create_group_messages:
+        response = client.post(
+            f"/conversations/{create_group}/entities/{message_id}",
+            headers=authorized_test_client["headers"],
+            params={"entity_type": "message", "users_ids": [create_group_member["user_id"]]}
+        )
+        assert response.status_code == 200
+
+    response = client.get("/users/messages/unread", headers=create_group_member["headers"])
+    assert len(response.json()) == len(create_group_messages)
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=create_group_member["headers"],
+        params={"limit": 3}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/users/messages/unread", headers=create_group_member["headers"])
+    assert len(response.json()) == len(create_group_messages) - 3
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=authorized_test_client["headers"],
+        params={"limit": len(create_group_messages)}
+    )
+    assert [message["status"] for message in response.json()] == ["read"] * 3 + ["delivered"] * 2
+
+
+async def test_group_member_access(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_member
+):
+    response = client.post(
+        f"/conversations/{create_group}/text",
+        headers=create_group_member["headers"],
+        json={"content": "hello"}
+    )
+    assert response.status_code == 200
+
+    response = client.patch(
+        f"/conversations/{create_group}",
+        headers=create_group_member["headers"],
+        json={"name": "renamed"}
+    )
+    assert response.status_code == 403
+
+    response = client.delete(f"/users/conversations/{create_group}", headers=create_group_member["headers"])
+    assert response.status_code == 202
+
+    response = client.post(
+        f"/conversations/{create_group}/text",
+        headers=create_group_member["headers"],
+        json={"content": "hello"}
+    )
+    assert response.status_code == 404
+
+
+async def test_not_existed_conversation_access(client: TestClient, authorized_test_client):
+    response = client.get("/conversations/999999/messages", headers=authorized_test_client["headers"])
+    assert response.status_code == 404
+
+
+async def test_add_group_members_reports_all_invalid_ids(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_member
+):
+    response = client.post(
+        f"/conversations/{create_group}/members",
+        headers=authorized_test_client["headers"],
+        params={"users_ids": [999998, create_group_member["user_id"], 999999]}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Users with ids (999998, 999999) not found"
+
+    response = client.post(
+        f"/conversations/{create_group}/members",
+        headers=authorized_test_client["headers"],
+        params={"users_ids": [create_group_member["user_id"]]}
+    )
+    assert response.status_code == 409
+    assert str(create_group_member["user_id"]) in response.json()["detail"]
+
+
+async def test_groups_access_reports_all_foreign_ids(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_member
+):
+    groups_ids = list()
+    for group_name in ("first", "second"):
+        response = client.post(
+            "/conversations/group",
+            headers=authorized_test_client["headers"],
+            json={"name": group_name, "description": "test"}
+        )
+        groups_ids.append(response.json()["id"])
+
+    response = client.get(
+        "/conversations/avatars",
+        headers=create_group_member["headers"],
+        params={"conversations_ids": [create_group, *groups_ids]}
+    )
+    assert response.status_code == 404
+    assert response.json()["detail"] == (
+        f"User with id ({create_group_member['user_id']}) not in conversations with ids "
+        f"({groups_ids[0]}, {groups_ids[1]})"
+    )
+
+
+async def test_create_unread_messages_is_idempotent(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_messages,
+        create_group_member
+):
+    for _ in range(2):
+        response = client.post(
+            f"/conversations/{create_group}/entities/{create_group_messages[0]}",
+            headers=authorized_test_client["headers"],
+            params={"entity_type": "message", "users_ids": [create_group_member["user_id"]]}
+        )
+        assert response.status_code == 200
+
+    response = client.get("/users/messages/unread", headers=create_group_member["headers"])
+    assert [unread["message_id"] for unread in response.json()] == [create_group_messages[0]]
+
+
+async def test_unread_summary_tracks_unread_messages(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_messages,
+        create_group_member
+):
+    for message_id in create_group_messages:
+        response = client.post(
+            f"/conversations/{create_group}/entities/{message_id}",
+            headers=authorized_test_client["headers"],
+            params={"entity_type": "message", "users_ids": [create_group_member["user_id"]]}
+        )
+        assert response.status_code == 200
+
+    response = client.get("/users/messages/unread/summary", headers=create_group_member["headers"])
+    assert response.status_code == 200
+    assert response.json() == {
+        "total_count": len(create_group_messages),
+        "conversations": [
+            {
+                "conversation_id": create_group,
+                "unread_count": len(create_group_messages),
+                "last_unread_message_id": max(create_group_messages)
+            }
+        ]
+    }
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=create_group_member["headers"],
+        params={"limit": 2}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/users/messages/unread/summary", headers=create_group_member["headers"])
+    assert response.json()["total_count"] == len(create_group_messages) - 2
+    assert response.json()["conversations"][0]["last_unread_message_id"] == sorted(create_group_messages)[-3]
+
+    response = client.get(
+        f"/conversations/{create_group}/messages",
+        headers=create_group_member["headers"],
+        params={"limit": len(create_group_messages)}
+    )
+    assert response.status_code == 200
+
+    response = client.get("/users/messages/unread/summary", headers=create_group_member["headers"])
+    assert response.json() == {"total_count": 0, "conversations": []}
+
+
+async def test_send_media_message_streams_file_to_storage(client: TestClient, authorized_test_client, create_group):
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("valid.jpg", file, "image/jpeg")}
+        )
+    assert response.status_code == 200
+
+    media_path = FileManager.get_blob_path(digest=response.json()["file_content_name"])
+    assert media_path.read_bytes() == pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes()
+
+
+async def test_send_corrupted_media_message(client: TestClient, authorized_test_client, create_group):
+    with open("tests/media/users_avatars/invalid.jpg", "rb") as file:
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("invalid.jpg", file, "image/jpeg")}
+        )
+    assert response.status_code == 400
+    assert not list(MediaPatches.MEDIA_UPLOADS_FOLDER.value.glob(".*.part"))
+
+    response = client.get(f"/conversations/{create_group}/messages", headers=authorized_test_client["headers"])
+    assert response.json() == []
+    assert (await count_media_state(conversation_id=create_group))[0] == 0
+
+
+async def test_failed_media_message_is_compensated(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        monkeypatch
+):
+    async def fail_store_blob(self, source_path, digest):
+        raise OSError("storage is unavailable")
+
+    _, refcount = await count_media_state(conversation_id=create_group)
+    monkeypatch.setattr(FileManager, "store_blob", fail_store_blob)
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        with pytest.raises(OSError):
+            client.post(
+                f"/conversations/{create_group}/media",
+                headers=authorized_test_client["headers"],
+                files={"file": ("valid.jpg", file, "image/jpeg")}
+            )
+
+    assert await count_media_state(conversation_id=create_group) == (0, refcount)
+
+
+async def test_media_message_deleted_during_upload_is_not_found(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        monkeypatch
+):
+    store_blob = FileManager.store_blob
+
+    async def delete_messages_and_store_blob(self, source_path, digest):
+        async with session_factory() as session:
+            await session.execute(delete(Messages).filter_by(conversation_id=create_group))
+            await session.commit()
+        return await store_blob(self, source_path, digest)
+
+    _, refcount = await count_media_state(conversation_id=create_group)
+    monkeypatch.setattr(FileManager, "store_blob", delete_messages_and_store_blob)
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("valid.jpg", file, "image/jpeg")}
+        )
+
+    assert response.status_code == 404
+    assert await count_media_state(conversation_id=create_group) == (0, refcount)
+
+
+async def test_resumable_media_upload(client: TestClient, authorized_test_client, create_group):
+    file_data = pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes()
+    response = client.post(
+        f"/conversations/{create_group}/uploads",
+        headers=authorized_test_client["headers"],
+        json={"file_name": "valid.jpg", "file_type": "image/jpeg", "file_size": len(file_data), "caption": "photo"}
+    )
+    assert response.status_code == 201
+    upload_id = response.json()["id"]
+    upload_url = f"/conversations/{create_group}/uploads/{upload_id}"
+    assert response.headers["Location"] == upload_url
+    assert response.json()["offset"] == 0
+
+    response = client.patch(
+        upload_url,
+        headers={**authorized_test_client["headers"], "Upload-Offset": "0"},
+        content=file_data[:1000]
+    )
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == "1000"
+
+    response = client.patch(
+        upload_url,
+        headers={**authorized_test_client["headers"], "Upload-Offset": "0"},
+        content=file_data[:1000]
+    )
+    assert response.status_code == 409
+    assert response.headers["Upload-Offset"] == "1000"
+
+    response = client.head(upload_url, headers=authorized_test_client["headers"])
+    assert response.status_code == 200
+    assert response.headers["Upload-Offset"] == "1000"
+    assert response.headers["Upload-Length"] == str(len(file_data))
+
+    response = client.patch(
+        upload_url,
+        headers={**authorized_test_client["headers"], "Upload-Offset": "1000"},
+        content=file_data[1000:]
+    )
+    assert response.status_code == 204
+    assert response.headers["Upload-Offset"] == str(len(file_data))
+
+    response = client.post(f"{upload_url}/finalize", headers=authorized_test_client["headers"])
+    assert response.status_code == 200
+    assert response.json()["type"] == "image"
+    assert response.json()["content"] == "photo"
+
+    media_path = FileManager.get_blob_path(digest=response.json()["file_content_name"])
+    assert media_path.read_bytes() == file_data
+    assert not (MediaPatches.MEDIA_UPLOADS_FOLDER.value / upload_id).exists()
+
+    response = client.head(upload_url, headers=authorized_test_client["headers"])
+    assert response.status_code == 404
+
+
+async def test_incomplete_media_upload_cannot_be_finalized(client: TestClient, authorized_test_client, create_group):
+    response = client.post(
+        f"/conversations/{create_group}/uploads",
+        headers=authorized_test_client["headers"],
+        json={"file_name": "video.mp4", "file_type": "video/mp4", "file_size": 10}
+    )
+    upload_id = response.json()["id"]
+    upload_url = f"/conversations/{create_group}/uploads/{upload_id}"
+
+    response = client.patch(
+        upload_url,
+        headers={**authorized_test_client["headers"], "Upload-Offset": "0"},
+        content=b"0123456789abc"
+    )
+    assert response.status_code == 413
+
+    response = client.patch(
+        upload_url,
+        headers={**authorized_test_client["headers"], "Upload-Offset": "0"},
+        content=b"01234"
+    )
+    assert response.headers["Upload-Offset"] == "5"
+
+    response = client.post(f"{upload_url}/finalize", headers=authorized_test_client["headers"])
+    assert response.status_code == 409
+
+    response = client.delete(upload_url, headers=authorized_test_client["headers"])
+    assert response.status_code == 204
+    assert not (MediaPatches.MEDIA_UPLOADS_FOLDER.value / upload_id).exists()
+
+    response = client.get(f"/conversations/{create_group}/messages", headers=authorized_test_client["headers"])
+    assert response.json() == []
+
+
+async def test_media_upload_rejects_oversized_file(client: TestClient, authorized_test_client, create_group):
+    response = client.post(
+        f"/conversations/{create_group}/uploads",
+        headers=authorized_test_client["headers"],
+        json={"file_name": "big.jpg", "file_type": "image/jpeg", "file_size": 1024 ** 3}
+    )
+    assert response.status_code == 400
+
+
+async def test_search_messages_ranked_by_relevance(client: TestClient, authorized_test_client, create_group):
+    for content in ("the quick brown fox", "fox chases fox around the fox den", "nothing to see here"):
+        client.post(
+            f"/conversations/{create_group}/text",
+            headers=authorized_test_client["headers"],
+            json={"content": content}
+        )
+    search_url = f"/conversations/{create_group}/messages/search"
+
+    response = client.get(
+        search_url,
+        headers=authorized_test_client["headers"],
+        params={"search_query": "fox", "limit": 1}
+    )
+    assert response.status_code == 200
+    assert [message["content"] for message in response.json()] == ["fox chases fox around the fox den"]
+    assert "<mark>fox</mark>" in response.json()[0]["snippet"]
+    assert response.json()[0]["rank"] > 0
+
+    response = client.get(
+        search_url,
+        headers=authorized_test_client["headers"],
+        params={"search_query": "fox", "limit": 1, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert [message["content"] for message in response.json()] == ["the quick brown fox"]
+
+    response = client.get(
+        search_url,
+        headers=authorized_test_client["headers"],
+        params={"search_query": "fox", "limit": 1, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get(
+        search_url,
+        headers=authorized_test_client["headers"],
+        params={"search_query": "fox", "mode": "substring", "cursor": "not-a-cursor"}
+    )
+    assert response.status_code == 400
+
+
+async def test_search_messages_snippets_escape_html(client: TestClient, authorized_test_client, create_group):
+    client.post(
+        f"/conversations/{create_group}/text",
+        headers=authorized_test_client["headers"],
+        json={"content": "<img src=x onerror=alert(1)> fox <script>alert(2)</script>"}
+    )
+    search_url = f"/conversations/{create_group}/messages/search"
+
+    for mode in ("words", "substring"):
+        response = client.get(
+            search_url,
+            headers=authorized_test_client["headers"],
+            params={"search_query": "fox", "mode": mode}
+        )
+        snippet = response.json()[0]["snippet"]
+        assert "<mark>fox</mark>" in snippet
+        assert "<img" not in snippet and "<script" not in snippet
+
+    assert snippet == "&lt;img src=x onerror=alert(1)&gt; <mark>fox</mark> &lt;script&gt;alert(2)&lt;/script&gt;"
+
+
+async def test_search_messages_by_substring(client: TestClient, authorized_test_client, create_group):
+    client.post(
+        f"/conversations/{create_group}/text",
+        headers=authorized_test_client["headers"],
+        json={"content": "Unbelievable_100% result"}
+    )
+
+    response = client.get(
+        f"/conversations/{create_group}/messages/search",
+        headers=authorized_test_client["headers"],
+        params={"search_query": "BELIEV", "mode": "substring"}
+    )
+    assert response.status_code == 200
+    assert response.json()[0]["snippet"] == "Un<mark>believ</mark>able_100% result"
+    assert response.json()[0]["rank"] is None
+
+    response = client.get(
+        f"/conversations/{create_group}/messages/search",
+        headers=authorized_test_client["headers"],
+        params={"search_query": "e_1", "mode": "substring"}
+    )
+    assert len(response.json()) == 1
+
+    response = client.get(
+        f"/conversations/{create_group}/messages/search",
+        headers=authorized_test_client["headers"],
+        params={"search_query": "e%r", "mode": "substring"}
+    )
+    assert response.json() == []
+
+
+async def test_search_messages_across_conversations(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_member
+):
+    other_group = client.post(
+        "/conversations/group",
+        headers=authorized_test_client["headers"],
+        json={"name": "other_group", "description": "test"}
+    ).json()["id"]
+    for conversation_id in (create_group, other_group):
+        client.post(
+            f"/conversations/{conversation_id}/text",
+            headers=authorized_test_client["headers"],
+            json={"content": f"crossword puzzle {conversation_id}"}
+        )
+
+    response = client.get(
+        "/messages/search",
+        headers=authorized_test_client["headers"],
+        params={"search_query": "crossword"}
+    )
+    assert response.status_code == 200
+    assert {message["conversation_id"] for message in response.json()} == {create_group, other_group}
+
+    response = client.get(
+        "/messages/search",
+        headers=create_group_member["headers"],
+        params={"search_query": "crossword"}
+    )
+    assert [message["conversation_id"] for message in response.json()] == [create_group]
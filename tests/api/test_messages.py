@@ -0,0 +1,241 @@
+import time
+import hashlib
+import io
+import zipfile
+import pathlib
+from PIL import Image
+from fastapi.testclient import TestClient
+
+from fixtures.authorization_fixtures import authorized_test_client
+from fixtures.conversations_fixtures import create_group
+from fixtures.storage_fixtures import s3_storage
+from repository import select_media_blob_refcount
+from storage import FileManager
+from utilities import MediaDeliveryModes, generic_settings
+
+
+async def test_get_message_media_ranges(client: TestClient, authorized_test_client, create_group):
+    file_data = pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes()
+    file_size = len(file_data)
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("valid.jpg", file, "image/jpeg")}
+        )
+    message = response.json()
+    media_url = f"/messages/{message['id']}/media"
+    headers = authorized_test_client["headers"]
+
+    response = client.get(media_url, headers=headers)
+    assert response.status_code == 200
+    assert response.content == file_data
+    assert response.headers["Content-Length"] == str(file_size)
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert "Last-Modified" in response.headers
+    etag = response.headers["ETag"]
+
+    response = client.get(media_url, headers={**headers, "Range": "bytes=0-"})
+    assert response.status_code == 206
+    assert response.content == file_data
+    assert response.headers["Content-Range"] == f"bytes 0-{file_size - 1}/{file_size}"
+
+    response = client.get(media_url, headers={**headers, "Range": "bytes=-100"})
+    assert response.status_code == 206
+    assert response.content == file_data[-100:]
+    assert response.headers["Content-Length"] == "100"
+
+    response = client.get(media_url, headers={**headers, "Range": "bytes=0-9,20-29"})
+    assert response.status_code == 206
+    assert response.headers["Content-Type"].startswith("multipart/byteranges; boundary=")
+    assert response.headers["Content-Length"] == str(len(response.content))
+    assert file_data[0:10] in response.content and file_data[20:30] in response.content
+    assert f"Content-Range: bytes 20-29/{file_size}".encode() in response.content
+
+    response = client.get(media_url, headers={**headers, "Range": "bytes=0-9", "If-Range": '"outdated"'})
+    assert response.status_code == 200
+    assert response.content == file_data
+
+    response = client.get(media_url, headers={**headers, "Range": f"bytes={file_size}-"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{file_size}"
+
+    response = client.get(media_url, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 304
+
+
+async def test_get_message_media_with_x_accel_redirect(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        monkeypatch
+):
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("valid.jpg", file, "image/jpeg")}
+        )
+    message = response.json()
+    monkeypatch.setattr(generic_settings, "MEDIA_DELIVERY_MODE", MediaDeliveryModes.X_ACCEL.value)
+
+    response = client.get(f"/messages/{message['id']}/media", headers=authorized_test_client["headers"])
+    assert response.status_code == 200
+    digest = message["file_content_name"]
+    assert response.headers["X-Accel-Redirect"] == f"/protected-media/blobs/{digest[:2]}/{digest}"
+    assert response.headers["Content-Type"] == "image/jpeg"
+    assert response.content == b""
+
+    response = client.get(f"/messages/{message['id'] + 1000}/media", headers=authorized_test_client["headers"])
+    assert "X-Accel-Redirect" not in response.headers
+
+
+async def test_get_messages_media_as_archive(client: TestClient, authorized_test_client, create_group):
+    messages = list()
+    for file_path in ("tests/media/users_avatars/valid.jpg", "tests/media/users_avatars/text.txt"):
+        with open(file_path, "rb") as file:
+            response = client.post(
+                f"/conversations/{create_group}/media",
+                headers=authorized_test_client["headers"],
+                files={"file": (pathlib.Path(file_path).name, file, "application/octet-stream")}
+            )
+        messages.append(response.json())
+
+    response = client.get(
+        "/messages/media",
+        headers=authorized_test_client["headers"],
+        params={"messages_ids": [message["id"] for message in messages]}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "application/zip"
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
+        assert sorted(zip_file.namelist()) == sorted(f"{message['id']}.bin" for message in messages)
+
+
+async def test_media_messages_share_content_addressed_blob(client: TestClient, authorized_test_client, create_group):
+    file_data = b"deduplicated media " * 1024
+    messages = list()
+    for _ in range(2):
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("file.bin", file_data, "application/octet-stream")}
+        )
+        messages.append(response.json())
+
+    digest = hashlib.sha256(file_data).hexdigest()
+    blob_path = FileManager.get_blob_path(digest=digest)
+    assert [message["file_content_name"] for message in messages] == [digest, digest]
+    assert blob_path.read_bytes() == file_data
+    assert await select_media_blob_refcount(digest=digest) == 2
+
+    response = client.get(
+        "/messages/media",
+        headers=authorized_test_client["headers"],
+        params={"messages_ids": [message["id"] for message in messages]}
+    )
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
+        assert sorted(zip_file.namelist()) == sorted(f"{message['id']}.bin" for message in messages)
+        assert all(zip_file.read(file_name) == file_data for file_name in zip_file.namelist())
+
+    client.delete("/messages", headers=authorized_test_client["headers"], params={"messages_ids": [messages[0]["id"]]})
+    assert await select_media_blob_refcount(digest=digest) == 1
+    assert client.get(f"/messages/{messages[1]['id']}/media", headers=authorized_test_client["headers"]).content == file_data
+
+    client.delete("/messages", headers=authorized_test_client["headers"], params={"messages_ids": [messages[1]["id"]]})
+    assert await select_media_blob_refcount(digest=digest) == 0
+    for _ in range(50):
+        if not blob_path.exists():
+            break
+        time.sleep(0.1)
+    assert not blob_path.exists()
+
+
+async def test_media_messages_in_s3_storage(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        s3_storage,
+        monkeypatch
+):
+    file_data = b"media stored in object storage " * 64
+    response = client.post(
+        f"/conversations/{create_group}/media",
+        headers=authorized_test_client["headers"],
+        files={"file": ("file.bin", file_data, "application/octet-stream")}
+    )
+    message = response.json()
+    digest = message["file_content_name"]
+    assert s3_storage.objects[f"blobs/{digest[:2]}/{digest}"][0] == file_data
+    assert not FileManager.get_blob_path(digest=digest).exists()
+
+    response = client.get(
+        f"/messages/{message['id']}/media",
+        headers={**authorized_test_client["headers"], "Range": "bytes=10-19"}
+    )
+    assert response.status_code == 206
+    assert response.content == file_data[10:20]
+
+    monkeypatch.setattr(generic_settings, "MEDIA_DELIVERY_MODE", MediaDeliveryModes.PRESIGNED.value)
+    response = client.get(
+        f"/messages/{message['id']}/media",
+        headers=authorized_test_client["headers"],
+        follow_redirects=False
+    )
+    assert response.status_code == 307
+    assert response.headers["Location"].startswith(f"http://s3.test/chatwave/blobs/{digest[:2]}/{digest}?")
+
+    client.delete("/messages", headers=authorized_test_client["headers"], params={"messages_ids": [message["id"]]})
+    for _ in range(50):
+        if f"blobs/{digest[:2]}/{digest}" not in s3_storage.objects:
+            break
+        time.sleep(0.1)
+    assert f"blobs/{digest[:2]}/{digest}" not in s3_storage.objects
+
+
+async def test_image_media_thumbnails(client: TestClient, authorized_test_client, create_group):
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        response = client.post(
+            f"/conversations/{create_group}/media",
+            headers=authorized_test_client["headers"],
+            files={"file": ("valid.jpg", file, "image/jpeg")}
+        )
+    message = response.json()
+    digest = message["file_content_name"]
+    assert FileManager.get_thumbnail_path(digest=digest, size=64).is_file()
+    assert FileManager.get_thumbnail_path(digest=digest, size=256).is_file()
+    assert FileManager.get_thumbnail_path(digest=digest, size=1024).is_file()
+
+    response = client.get(
+        f"/messages/{message['id']}/media",
+        headers=authorized_test_client["headers"],
+        params={"size": 40}
+    )
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "image/webp"
+    with Image.open(io.BytesIO(response.content)) as thumbnail:
+        assert thumbnail.format == "WEBP"
+        assert max(thumbnail.size) == 64
+
+    response = client.get(
+        f"/messages/{message['id']}/media",
+        headers=authorized_test_client["headers"],
+        params={"size": 4096}
+    )
+    assert response.headers["Content-Type"] == "image/jpeg"
+    assert response.content == pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes()
+
+    response = client.get(
+        "/messages/media",
+        headers=authorized_test_client["headers"],
+        params={"messages_ids": [message["id"]], "size": 256}
+    )
+    with zipfile.ZipFile(io.BytesIO(response.content)) as zip_file:
+        assert zip_file.read(f"{message['id']}.webp") == FileManager.get_thumbnail_path(digest=digest, size=256).read_bytes()
+
+    client.delete("/messages", headers=authorized_test_client["headers"], params={"messages_ids": [message["id"]]})
+    for _ in range(50):
+        if not FileManager.get_thumbnail_path(digest=digest, size=64).exists():
+            break
+        time.sleep(0.1)
+    assert not FileManager.get_thumbnail_path(digest=digest, size=64).exists()
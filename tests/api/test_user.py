@@ -1,11 +1,14 @@
 import pytest
 import io
+from fastapi import WebSocketDisconnect
 from fastapi.testclient import TestClient
 from contextlib import nullcontext as does_not_raise
 
-from fixtures.users_fixtures import create_random_users, create_users, upload_avatar
-from fixtures.authorization_fixtures import authorized_test_client
-from utilities import ImageCorrupted, FIleToBig, InvalidFileType, FileNotFound
+from fixtures.users_fixtures import create_random_users, create_users, create_search_users, upload_avatar
+from fixtures.authorization_fixtures import authorized_test_client, metrics_headers
+from fixtures.conversations_fixtures import create_group, create_group_messages, create_group_member
+from storage import FileManager
+from utilities import ImageCorrupted, FIleToBig, InvalidFileType, FileNotFound, db_settings
 
 
 async def test_get_current_user(client: TestClient, authorized_test_client):
@@ -43,6 +46,28 @@ async def test_search_users(client: TestClient, create_users, search_query, sear
         assert len(response.json()) == expected_quantity
 
 
+async def test_search_users_ranked_with_cursor(client: TestClient, create_search_users):
+    response = client.get("/users/search", params={"search_query": "vexx", "limit": 2})
+    assert response.status_code == 200
+    assert [user["nickname"] for user in response.json()] == ["vexx", "Vexxon"]
+
+    response = client.get(
+        "/users/search",
+        params={"search_query": "vexx", "limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert [user["nickname"] for user in response.json()] == ["Zelda Vexx", "Avexxa"]
+
+    response = client.get(
+        "/users/search",
+        params={"search_query": "vexx", "limit": 2, "cursor": response.headers["X-Next-Cursor"]}
+    )
+    assert response.json() == []
+    assert "X-Next-Cursor" not in response.headers
+
+    response = client.get("/users/search", params={"search_query": "vexx", "limit": 101})
+    assert response.status_code == 422
+
+
 async def test_get_users_last_online(client: TestClient, authorized_test_client):
     response = client.get("/users/online", headers=authorized_test_client["headers"])
 
@@ -130,3 +155,142 @@ async def test_delete_existed_current_user_avatar(client: TestClient, authorized
 async def test_delete_user(client: TestClient, authorized_test_client):
     response = client.delete("/users/me", headers=authorized_test_client["headers"])
     assert response.status_code == 202
+
+
+async def test_unread_messages_ws_sends_deltas_and_resyncs(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_messages,
+        create_group_member
+):
+    token = create_group_member["headers"]["Authorization"].split()[1]
+    with client.websocket_connect(f"/users/ws/messages/unread?token={token}") as websocket:
+        snapshot = websocket.receive_json()
+        assert snapshot == {"type": "snapshot", "sequence": 0, "unread_messages": []}
+
+        response = client.post(
+            f"/conversations/{create_group}/entities/{create_group_messages[0]}",
+            headers=authorized_test_client["headers"],
+            params={"entity_type": "message", "users_ids": [create_group_member["user_id"]]}
+        )
+        assert response.status_code == 200
+
+        event = websocket.receive_json()
+        assert event["type"] == "added"
+        assert event["sequence"] == 1
+        assert event["unread_message"]["message_id"] == create_group_messages[0]
+
+    with client.websocket_connect(f"/users/ws/messages/unread?token={token}&sequence=0") as websocket:
+        assert websocket.receive_json() == event
+
+    with client.websocket_connect(f"/users/ws/messages/unread?token={token}&sequence=42") as websocket:
+        snapshot = websocket.receive_json()
+        assert snapshot["type"] == "snapshot"
+        assert [unread["message_id"] for unread in snapshot["unread_messages"]] == [create_group_messages[0]]
+
+
+async def test_online_ws_follows_recipients_changes(
+        client: TestClient,
+        authorized_test_client,
+        create_group,
+        create_group_member
+):
+    token = authorized_test_client["headers"]["Authorization"].split()[1]
+    with client.websocket_connect(f"/users/ws/online?token={token}") as websocket:
+        assert [recipient["user_id"] for recipient in websocket.receive_json()] == [create_group_member["user_id"]]
+
+        response = client.delete(f"/users/conversations/{create_group}", headers=create_group_member["headers"])
+        assert response.status_code == 202
+
+        recipients = websocket.receive_json()
+        assert recipients[0]["last_online"] is not None
+        assert websocket.receive_json() == []
+
+
+async def test_unread_messages_ws_closed_on_user_delete(client: TestClient, create_group_member):
+    token = create_group_member["headers"]["Authorization"].split()[1]
+    with client.websocket_connect(f"/users/ws/messages/unread?token={token}") as websocket:
+        assert websocket.receive_json()["type"] == "snapshot"
+
+        response = client.delete("/users/me", headers=create_group_member["headers"])
+        assert response.status_code == 202
+
+        with pytest.raises(WebSocketDisconnect) as exc:
+            websocket.receive_json()
+        assert exc.value.code == 1008
+
+
+@pytest.mark.parametrize(
+    "metrics_token, expected_status_code",
+    [
+        (None, 403),
+        ("wrong-token", 403),
+    ]
+)
+async def test_metrics_require_metrics_token(
+        client: TestClient,
+        authorized_test_client,
+        metrics_headers,
+        metrics_token,
+        expected_status_code
+):
+    headers = dict(authorized_test_client["headers"])
+    if metrics_token is not None:
+        headers["X-Metrics-Token"] = metrics_token
+    response = client.get("/metrics/hub", headers=headers)
+    assert response.status_code == expected_status_code
+
+
+async def test_get_hub_stats(client: TestClient, metrics_headers):
+    response = client.get("/metrics/hub", headers=metrics_headers)
+    assert response.status_code == 200
+    assert response.json()["sockets"] == 0
+
+
+async def test_get_notifications_listener_stats(client: TestClient, metrics_headers):
+    response = client.get("/metrics/notifications", headers=metrics_headers)
+    assert response.status_code == 200
+    assert response.json()["is_leader"] is True
+    assert response.json()["failed_notifications"] == 0
+
+
+async def test_get_image_processing_stats(client: TestClient, authorized_test_client, metrics_headers):
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        client.put(
+            "/users/me/avatar",
+            headers=authorized_test_client["headers"],
+            files={"avatar": ("valid.jpg", file, "image/jpeg")}
+        )
+
+    response = client.get("/metrics/images", headers=metrics_headers)
+    assert response.status_code == 200
+    assert response.json()["processed"] >= 1
+    assert response.json()["in_flight"] == 0
+    assert response.json()["decode_max_seconds"] > 0
+
+
+async def test_get_database_pool_stats(client: TestClient, metrics_headers):
+    response = client.get("/metrics/database", headers=metrics_headers)
+    assert response.status_code == 200
+    assert response.json()["checkouts"] > 0
+    assert response.json()["connections"] >= response.json()["checked_out"] + response.json()["checked_in"]
+    assert response.json()["pool_size"] == db_settings.DB_POOL_SIZE
+
+
+async def test_get_user_avatar_thumbnail(client: TestClient, authorized_test_client):
+    with open("tests/media/users_avatars/valid.jpg", "rb") as file:
+        client.put(
+            "/users/me/avatar",
+            headers=authorized_test_client["headers"],
+            files={"avatar": ("valid.jpg", file, "image/jpeg")}
+        )
+    avatar_name = client.get("/users/me", headers=authorized_test_client["headers"]).json()["avatar_name"]
+
+    response = client.get(f"/users/avatar/{avatar_name}", params={"size": 64})
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "image/webp"
+    assert response.content == FileManager.get_thumbnail_path(digest=avatar_name, size=64).read_bytes()
+
+    response = client.get(f"/users/avatar/{avatar_name}", params={"size": 0})
+    assert response.status_code == 422
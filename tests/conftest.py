@@ -4,11 +4,13 @@ import platform
 from fastapi.testclient import TestClient
 
 import models # noqa
+import redis
 from repository import create_schema
-from utilities import generic_settings, AppModes
+from utilities import generic_settings, AppModes, redis_settings
 from database import OrmBase, engine
-from database import session as session_factory
+from database import session_factory
 from main import app
+from dependencies import celery_client
 from factories.users import UserFactory
 
 
@@ -16,10 +18,20 @@ if platform.system() == "Windows":
     asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
 
+def clear_redis_cache():
+    redis_client = redis.Redis.from_url(redis_settings.redis_url)
+    for pattern in ("user:*:memberships", "user:*:unread_*", "upload:*"):
+        for key in redis_client.scan_iter(match=pattern):
+            redis_client.delete(key)
+    redis_client.close()
+
+
 @pytest.fixture(scope='session', autouse=True)
 async def setup_db():
     assert generic_settings.MODE == AppModes.TESTING.value
+    celery_client.conf.task_always_eager = True
     await create_schema()
+    clear_redis_cache()
     async with engine.begin() as connection:
         await connection.run_sync(OrmBase.metadata.create_all)
     yield
@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 from models import Users
 from factories.users import UserFactory
 from conftest import client
-from utilities import JWT
+from utilities import JWT, generate_uuid, generic_settings
 from repository.users import delete_user
 
 
@@ -21,3 +21,10 @@ async def authorized_test_client(client: TestClient):
     yield {"headers": headers, "user_id": user.id}
 
     await delete_user(user.id)
+
+
+@pytest.fixture(scope='function')
+def metrics_headers(monkeypatch):
+    metrics_token = generate_uuid()
+    monkeypatch.setattr(generic_settings, "METRICS_TOKEN", metrics_token)
+    return {"X-Metrics-Token": metrics_token}
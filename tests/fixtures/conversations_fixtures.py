@@ -0,0 +1,56 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from models import Users
+from factories.users import UserFactory
+from repository.users import delete_user
+from utilities import JWT
+from fixtures.authorization_fixtures import authorized_test_client
+
+
+@pytest.fixture(scope='function')
+async def create_group(client: TestClient, authorized_test_client) -> int:
+    response = client.post(
+        "/conversations/group",
+        headers=authorized_test_client["headers"],
+        json={"name": "test_group", "description": "test"}
+    )
+    assert response.status_code == 200
+
+    return response.json()["id"]
+
+
+@pytest.fixture(scope='function')
+async def create_group_messages(client: TestClient, authorized_test_client, create_group) -> list[int]:
+    messages_ids = list()
+    for message_number in range(5):
+        response = client.post(
+            f"/conversations/{create_group}/text",
+            headers=authorized_test_client["headers"],
+            json={"content": f"message {message_number}"}
+        )
+        assert response.status_code == 200
+        messages_ids.append(response.json()["id"])
+
+    return messages_ids
+
+
+@pytest.fixture(scope='function')
+async def create_group_member(client: TestClient, authorized_test_client, create_group):
+    user: Users = await UserFactory()
+    response = client.post(
+        f"/conversations/{create_group}/members",
+        headers=authorized_test_client["headers"],
+        params={"users_ids": [user.id]}
+    )
+    assert response.status_code == 201
+    access_token = JWT.create_token(
+        {
+            "id": user.id,
+        }
+    )
+    headers = {"Authorization": f"Bearer {access_token}"}
+
+    yield {"headers": headers, "user_id": user.id}
+
+    await delete_user(user.id)
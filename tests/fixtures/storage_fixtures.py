@@ -1,9 +1,85 @@
 import pytest
 import os
+import re
 import shutil
+import hashlib
+import httpx
+from datetime import datetime, timezone
+from email.utils import format_datetime
+from xml.etree import ElementTree
 
-from storage import FileManager
-from utilities import generic_settings
+from storage import FileManager, S3Client
+from utilities import StorageBackends, generic_settings
+
+
+class InMemoryS3:
+    def __init__(self):
+        self.objects: dict[str, tuple[bytes, datetime]] = dict()
+        self.multipart_uploads: dict[str, dict[int, bytes]] = dict()
+        self.completed_multipart_uploads = 0
+        self.client = S3Client(
+            endpoint_url="http://s3.test",
+            region="us-east-1",
+            bucket="chatwave",
+            access_key="test",
+            secret_key="test",
+            transport=httpx.MockTransport(self.handle)
+        )
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        assert request.headers["Authorization"].startswith("AWS4-HMAC-SHA256 Credential=test/")
+        bucket, _, key = request.url.path.lstrip("/").partition("/")
+        assert bucket == "chatwave"
+        params = request.url.params
+
+        if request.method == "POST" and "uploads" in params:
+            upload_id = str(len(self.multipart_uploads) + 1)
+            self.multipart_uploads[upload_id] = dict()
+            return httpx.Response(
+                200,
+                content=f"<InitiateMultipartUploadResult><UploadId>{upload_id}</UploadId>"
+                        f"</InitiateMultipartUploadResult>".encode()
+            )
+        if request.method == "PUT" and "uploadId" in params:
+            self.multipart_uploads[params["uploadId"]][int(params["partNumber"])] = request.content
+            return httpx.Response(200, headers={"ETag": f'"{hashlib.md5(request.content).hexdigest()}"'})
+        if request.method == "POST" and "uploadId" in params:
+            parts = self.multipart_uploads.pop(params["uploadId"])
+            parts_numbers = [int(element.text) for element in ElementTree.fromstring(request.content).iter("PartNumber")]
+            self.objects[key] = (b"".join(parts[part_number] for part_number in parts_numbers), datetime.now(timezone.utc))
+            self.completed_multipart_uploads += 1
+            return httpx.Response(200, content=b"<CompleteMultipartUploadResult/>")
+        if request.method == "DELETE" and "uploadId" in params:
+            self.multipart_uploads.pop(params["uploadId"], None)
+            return httpx.Response(204)
+        if request.method == "PUT":
+            assert request.headers["x-amz-content-sha256"] == hashlib.sha256(request.content).hexdigest()
+            self.objects[key] = (request.content, datetime.now(timezone.utc))
+            return httpx.Response(200)
+        if request.method == "DELETE":
+            self.objects.pop(key, None)
+            return httpx.Response(204)
+        if key not in self.objects:
+            return httpx.Response(404, content=b"<Error><Code>NoSuchKey</Code></Error>")
+
+        data, modified_at = self.objects[key]
+        headers = {
+            "ETag": f'"{hashlib.md5(data).hexdigest()}"',
+            "Last-Modified": format_datetime(modified_at, usegmt=True),
+            "Content-Length": str(len(data))
+        }
+        if request.method == "HEAD":
+            return httpx.Response(200, headers=headers)
+
+        bytes_range = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if bytes_range is None:
+            return httpx.Response(200, headers=headers, content=data)
+
+        start_byte = int(bytes_range[1])
+        end_byte = int(bytes_range[2]) if bytes_range[2] else len(data) - 1
+        headers.pop("Content-Length")
+        headers["Content-Range"] = f"bytes {start_byte}-{end_byte}/{len(data)}"
+        return httpx.Response(206, headers=headers, content=data[start_byte:end_byte + 1])
 
 
 @pytest.fixture(scope='module')
@@ -27,3 +103,12 @@ async def garbage_cleaner():
         for f in files:
             if f.startswith("test_"):
                 os.remove(os.path.join(root, f))
+
+
+@pytest.fixture(scope='function')
+def s3_storage(monkeypatch):
+    in_memory_s3 = InMemoryS3()
+    monkeypatch.setattr(generic_settings, "STORAGE_BACKEND", StorageBackends.S3.value)
+    monkeypatch.setattr("storage.backends.s3_client", in_memory_s3.client)
+
+    yield in_memory_s3
@@ -34,6 +34,25 @@ async def create_users():
         await delete_user(user_id["id"])
 
 
+@pytest.fixture(scope='function')
+async def create_search_users():
+    users = list()
+    for user_username, user_nickname in [
+        ("avexxa_user", "Avexxa"),
+        ("zelda_user", "Zelda Vexx"),
+        ("vexxon_user", "Vexxon"),
+        ("vexx_user", "vexx"),
+        ("vexx", "Unrelated Nickname")
+    ]:
+        user: Users = await UserFactory(username=user_username, nickname=user_nickname)
+        users.append({"id": user.id, "nickname": user.nickname})
+
+    yield users
+
+    for user in users:
+        await delete_user(user["id"])
+
+
 @pytest.fixture(scope='function')
 async def upload_avatar(client: TestClient, authorized_test_client, file_name: str = "tests/media/users_avatars/valid.jpg") -> int:
     file_data = io.FileIO(file_name, "rb")
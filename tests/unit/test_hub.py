@@ -0,0 +1,32 @@
+import pytest
+
+from dependencies import ConnectionHub, HubConnection
+from utilities import WebsocketConnectionClosed
+
+
+async def test_hub_drops_slow_consumer():
+    hub = ConnectionHub(queue_size=2)
+    connection = HubConnection(user_id=1, queue_size=2)
+    hub._connections.add(connection)
+    hub._subscribers["user:1:unread_messages_events"] = {connection}
+
+    for _ in range(3):
+        hub._dispatch(channel="user:1:unread_messages_events", data=b"{}")
+
+    assert hub.stats()["dropped_connections"] == 1
+    assert hub.stats()["delivered_events"] == 2
+    with pytest.raises(WebsocketConnectionClosed) as exc:
+        await connection.receive()
+    assert exc.value.code == 1013
+
+
+async def test_hub_closes_deleted_user_connection():
+    hub = ConnectionHub(queue_size=2)
+    connection = HubConnection(user_id=1, queue_size=2)
+    hub._subscribers[connection.delete_channel] = {connection}
+
+    hub._dispatch(channel=connection.delete_channel, data=b"")
+
+    with pytest.raises(WebsocketConnectionClosed) as exc:
+        await connection.receive()
+    assert exc.value.code == 1008
@@ -0,0 +1,31 @@
+import pytest
+from contextlib import nullcontext as does_not_raise
+
+from services import parse_bytes_file_range
+from utilities import FileRangeError
+
+
+@pytest.mark.parametrize(
+    "bytes_range, expected, exception",
+    [
+        ("bytes=0-", [(0, 999)], does_not_raise()),
+        ("bytes=0-0", [(0, 0)], does_not_raise()),
+        ("bytes=100-199", [(100, 199)], does_not_raise()),
+        ("bytes=900-5000", [(900, 999)], does_not_raise()),
+        ("bytes=-100", [(900, 999)], does_not_raise()),
+        ("bytes=-5000", [(0, 999)], does_not_raise()),
+        ("bytes=0-9, 20-29", [(0, 9), (20, 29)], does_not_raise()),
+        ("bytes=20-29,0-9,5-12", [(0, 12), (20, 29)], does_not_raise()),
+        ("bytes=0-9,5000-6000", [(0, 9)], does_not_raise()),
+        ("bytes=10-5", None, does_not_raise()),
+        ("bytes=abc", None, does_not_raise()),
+        ("bytes=-", None, does_not_raise()),
+        ("items=0-9", None, does_not_raise()),
+        ("bytes=" + ",".join(["0-1"] * 17), None, does_not_raise()),
+        ("bytes=1000-", None, pytest.raises(FileRangeError)),
+        ("bytes=-0", None, pytest.raises(FileRangeError)),
+    ]
+)
+async def test_parse_bytes_file_range(bytes_range, expected, exception):
+    with exception:
+        assert await parse_bytes_file_range(bytes_range=bytes_range, file_size=1000) == expected
@@ -1,10 +1,22 @@
+import os
 import pytest
 import pathlib
 import io
+import zipfile
 from contextlib import nullcontext as does_not_raise
 
 from fixtures.storage_fixtures import create_storage_instance, garbage_cleaner
-from utilities import MediaPatches, MessagesTypes, ImageCorrupted, FIleToBig
+from PIL import Image
+from storage import FileIOExecutor, MediaFileResponse, StorageUtils, ImageProcessor
+from utilities import (
+    MediaPatches,
+    MessagesTypes,
+    ImageInspectionStatus,
+    ImageCorrupted,
+    ImageDimensionsExceeded,
+    FIleToBig,
+    generic_settings
+)
 
 
 async def test_create_folders_structure(create_storage_instance):
@@ -72,12 +84,23 @@ async def test_check_file_size(create_storage_instance):
 
 
 async def test_archive_files(create_storage_instance):
-    assert await create_storage_instance.archive_files(
-        files_paths=[
-            pathlib.Path("tests/media/users_avatars/valid.jpg"),
-            pathlib.Path("tests/media/users_avatars/invalid.jpg")
-        ]
+    files_paths = [
+        pathlib.Path("tests/media/users_avatars/valid.jpg"),
+        pathlib.Path("tests/media/users_avatars/text.txt"),
+        pathlib.Path("tests/media/users_avatars/missing.jpg")
+    ]
+    archive_stream = await create_storage_instance.archive_files(
+        files={"1.jpg": files_paths[0], "2.txt": files_paths[1], "3.jpg": files_paths[2]}
     )
+    archive_data = b"".join([chunk async for chunk in archive_stream])
+
+    with zipfile.ZipFile(io.BytesIO(archive_data)) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.namelist() == ["1.jpg", "2.txt"]
+        assert zip_file.getinfo("1.jpg").compress_type == zipfile.ZIP_STORED
+        assert zip_file.getinfo("2.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zip_file.read("1.jpg") == files_paths[0].read_bytes()
+        assert zip_file.read("2.txt") == files_paths[1].read_bytes()
 
 
 async def test_file_chunk_generator(create_storage_instance):
@@ -121,3 +144,131 @@ async def test_validate_file(create_storage_instance, file_content, file_type, f
 )
 async def test_detect_file_type(create_storage_instance, file_type, expected):
     assert await create_storage_instance.detect_file_type(file_type=file_type) == expected
+
+
+async def test_file_io_executor_records_latency_metrics():
+    executor = FileIOExecutor(max_workers=2)
+
+    assert await executor.run("sum", sum, [1, 2, 3]) == 6
+    with pytest.raises(FileNotFoundError):
+        await executor.run("read", pathlib.Path("not_existed_file").read_bytes)
+
+    stats = executor.stats()
+    assert stats["workers"] == 2
+    assert stats["in_flight"] == 0
+    assert stats["operations"]["sum"]["count"] == 1
+    assert stats["operations"]["sum"]["errors"] == 0
+    assert stats["operations"]["read"]["errors"] == 1
+
+
+async def test_media_file_response_uses_zero_copy_send():
+    file_path = pathlib.Path("tests/media/users_avatars/valid.jpg")
+    file_metadata = await StorageUtils.fetch_file_metadata(file_path=file_path)
+    response = MediaFileResponse(
+        file_path=file_path,
+        media_type="image/jpeg",
+        file_metadata=file_metadata,
+        ranges=[(0, 9), (100, 199)]
+    )
+    messages = list()
+
+    async def send(message):
+        messages.append(message)
+
+    await response({"type": "http", "extensions": {"http.response.zerocopysend": {}}}, None, send)
+
+    zero_copy_messages = [message for message in messages if message["type"] == "http.response.zerocopysend"]
+    assert [(message["offset"], message["count"]) for message in zero_copy_messages] == [(0, 10), (100, 100)]
+    assert zero_copy_messages[0]["file"].closed
+    assert messages[0]["status"] == 206
+    assert not messages[-1]["more_body"]
+
+
+def create_jpeg_with_exif() -> bytes:
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    exif[0x8825] = {1: "N", 2: (55.0, 45.0, 0.0)}
+    image_buffer = io.BytesIO()
+    Image.new("RGB", (64, 32), "red").save(image_buffer, format="JPEG", exif=exif)
+    return image_buffer.getvalue()
+
+
+async def test_validate_file_strips_image_metadata(create_storage_instance):
+    file_content = create_jpeg_with_exif()
+
+    stripped_file = await create_storage_instance.validate_file(
+        file_content=file_content,
+        file_type="image/jpeg",
+        file_type_filter=MessagesTypes.IMAGE
+    )
+
+    with Image.open(io.BytesIO(stripped_file)) as image:
+        exif = image.getexif()
+        assert exif[0x0112] == 6
+        assert 0x8825 not in exif
+        assert image.size == (64, 32)
+    with Image.open(io.BytesIO(stripped_file)) as image, Image.open(io.BytesIO(file_content)) as original_image:
+        assert image.tobytes() == original_image.tobytes()
+
+
+async def test_validate_stored_file_strips_image_metadata(create_storage_instance):
+    file_path = MediaPatches.MEDIA_UPLOADS_FOLDER.value / "exif_image.jpg"
+    await create_storage_instance.write_file(file_path=file_path, file_data=create_jpeg_with_exif())
+
+    stored_file = await create_storage_instance.validate_stored_file(
+        file_path=file_path,
+        file_type="image/jpeg",
+        file_type_filter=MessagesTypes.IMAGE
+    )
+
+    assert stored_file.size == file_path.stat().st_size
+    with Image.open(file_path) as image:
+        assert 0x8825 not in image.getexif()
+    file_path.unlink()
+
+
+async def test_validate_file_rejects_too_many_pixels(create_storage_instance, monkeypatch):
+    monkeypatch.setattr(generic_settings, "IMAGE_MAX_PIXELS", 1000)
+
+    with pytest.raises(ImageDimensionsExceeded):
+        await create_storage_instance.validate_file(
+            file_content=pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes(),
+            file_type="image/jpeg",
+            file_type_filter=MessagesTypes.IMAGE
+        )
+
+
+async def test_inspect_image_reports_dimensions():
+    inspection, stripped_file = await StorageUtils.inspect_image(
+        source=pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes()
+    )
+
+    assert inspection.status == ImageInspectionStatus.OK
+    assert (inspection.width, inspection.height, inspection.format) == (1200, 799, "JPEG")
+    assert inspection.decode_seconds > 0
+
+
+async def test_image_processor_recycles_worker_on_timeout(tmp_path):
+    blocking_source = tmp_path / "blocking.jpg"
+    os.mkfifo(blocking_source)
+    image_processor = ImageProcessor(max_workers=1)
+    try:
+        inspection, _ = await image_processor.inspect(
+            source=blocking_source,
+            max_pixels=generic_settings.IMAGE_MAX_PIXELS,
+            cpu_time_limit=0.5,
+            strip_metadata=False
+        )
+        assert inspection.status == ImageInspectionStatus.TIMEOUT
+
+        inspection, _ = await image_processor.inspect(
+            source=pathlib.Path("tests/media/users_avatars/valid.jpg").read_bytes(),
+            max_pixels=generic_settings.IMAGE_MAX_PIXELS,
+            cpu_time_limit=5,
+            strip_metadata=False
+        )
+        assert inspection.status == ImageInspectionStatus.OK
+        assert image_processor.stats()["in_flight"] == 0
+        assert image_processor.stats()["timeouts"] == 1
+    finally:
+        image_processor.shutdown()
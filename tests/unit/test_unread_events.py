@@ -0,0 +1,38 @@
+import pytest
+import redis.asyncio as redis
+
+from cache import UnreadEventsLog
+from utilities import redis_settings
+
+
+@pytest.fixture(scope='function')
+async def redis_client(monkeypatch):
+    client = redis.Redis.from_url(redis_settings.redis_url)
+    monkeypatch.setattr("cache.unread_events.redis_client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture(scope='function')
+async def unread_events(redis_client) -> UnreadEventsLog:
+    user_id = 987654321
+    await redis_client.delete(
+        UnreadEventsLog._sequence_key(user_id),
+        UnreadEventsLog._events_key(user_id),
+        *[key async for key in redis_client.scan_iter(f"user:{user_id}:unread_event:*")]
+    )
+    return UnreadEventsLog(history_size=10, ttl=60)
+
+
+async def test_unread_event_is_logged_once_per_event_id(unread_events):
+    user_id = 987654321
+    added = {"op": "added", "id": 1, "conversation_id": 1, "message_id": 1, "call_id": None}
+    removed = {**added, "op": "removed"}
+
+    assert await unread_events.append(user_id=user_id, event=added) == 1
+    assert await unread_events.append(user_id=user_id, event=added) is None
+    assert await unread_events.append(user_id=user_id, event=removed) == 2
+    assert await unread_events.append(user_id=user_id, event=removed) is None
+
+    events = await unread_events.fetch_since(user_id=user_id, sequence=0)
+    assert [(event["sequence"], event["event"]["op"]) for event in events] == [(1, "added"), (2, "removed")]
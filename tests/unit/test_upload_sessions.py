@@ -0,0 +1,51 @@
+import asyncio
+import pytest
+import redis.asyncio as redis
+
+from cache import UploadSessionsStore
+from utilities import UploadSessionLocked, generate_uuid, redis_settings
+
+
+@pytest.fixture(scope='function')
+async def redis_client(monkeypatch):
+    client = redis.Redis.from_url(redis_settings.redis_url)
+    monkeypatch.setattr("cache.upload_sessions.redis_client", client)
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture(scope='function')
+def short_lock_store(monkeypatch, redis_client) -> UploadSessionsStore:
+    monkeypatch.setattr(UploadSessionsStore, "_LOCK_TIMEOUT", 1)
+    monkeypatch.setattr(UploadSessionsStore, "_LOCK_RENEW_INTERVAL", 0.2)
+    return UploadSessionsStore(ttl=60)
+
+
+async def test_upload_lock_is_renewed_while_held(short_lock_store):
+    upload_id = generate_uuid()
+    async with short_lock_store.locked(upload_id=upload_id) as lock_lost:
+        await asyncio.sleep(1.5)
+        assert not lock_lost.is_set()
+        with pytest.raises(UploadSessionLocked):
+            async with short_lock_store.locked(upload_id=upload_id):
+                pass
+
+    async with short_lock_store.locked(upload_id=upload_id):
+        pass
+
+
+async def test_upload_stream_fails_after_lock_is_lost(short_lock_store, redis_client):
+    async def data_stream():
+        yield b"first"
+        await asyncio.sleep(0.5)
+        yield b"second"
+
+    upload_id = generate_uuid()
+    chunks = list()
+    async with short_lock_store.locked(upload_id=upload_id) as lock_lost:
+        await redis_client.delete(short_lock_store._lock_key(upload_id))
+        with pytest.raises(UploadSessionLocked):
+            async for chunk in short_lock_store.guard_stream(data_stream=data_stream(), lock_lost=lock_lost):
+                chunks.append(chunk)
+
+    assert chunks == [b"first"]